@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-step overhead of the native ReAct agent vs. the LangGraph agent.
+
+Both engines talk to a zero-latency fake gateway that asks for the
+calculator once and then answers, so every turn is two ReAct steps (model
+calls) plus one local tool call, and the measured time is pure client-side
+overhead: message conversion, LangChain callbacks, graph scheduling, tool
+dispatch and response parsing. Reports the median per-step overhead for:
+    - langgraph: TensorZeroLangGraphAgent with a pinned variant
+      (TensorZeroChatModel inside a compiled create_react_agent graph)
+    - native: NativeReActAgent, non-streaming
+    - native-stream: NativeReActAgent, streaming
+
+With --live the same turn is run against a real gateway instead (requires
+`poe gateway` and provider API keys), where provider latency dominates.
+
+Usage:
+    python bench_agent_engines.py [--turns 200] [--variant gpt4_mini] [--live]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero import ChatInferenceResponse, Text, TextChunk, ToolCall, ToolCallChunk, Usage
+from tensorzero.types import ChatChunk
+
+from tensorzero_scratch.langgraph_agent import TensorZeroLangGraphAgent
+from tensorzero_scratch.native_agent import NativeReActAgent
+from tensorzero_scratch.renderers import NullRenderer
+
+GATEWAY_URL = "http://localhost:3000"
+PROMPT = "What's sqrt(144) + 5?"
+STEPS_PER_TURN = 2
+
+
+class FakeGateway:
+    """Zero-latency gateway: one calculator call, then a short answer."""
+
+    def __init__(self, variant_name: str):
+        self.variant_name = variant_name
+        self.episode_id = uuid4()
+
+    def inference(self, input, stream=False, additional_tools=None, **kwargs):
+        answered = isinstance(input["messages"][-1]["content"], list)
+        # The LangGraph agent offers its own tool names as dynamic tools
+        dynamic_names = {tool["name"] for tool in additional_tools or ()}
+        name = "python_calculator" if "python_calculator" in dynamic_names else "calculator"
+        ids = dict(inference_id=uuid4(), episode_id=self.episode_id, variant_name=self.variant_name)
+        usage = Usage(input_tokens=200, output_tokens=10)
+        arguments = '{"expression": "sqrt(144) + 5"}'
+        if stream:
+            if answered:
+                blocks = [[TextChunk(id="0", text=word)] for word in ("The ", "answer ", "is ", "17.")]
+            else:
+                blocks = [[ToolCallChunk(id="call_1", raw_name=name, raw_arguments=arguments)]]
+            return iter([ChatChunk(**ids, content=content) for content in blocks] + [ChatChunk(**ids, content=[], usage=usage)])
+        if answered:
+            content = [Text(text="The answer is 17.")]
+        else:
+            content = [ToolCall(id="call_1", raw_name=name, raw_arguments=arguments, name=name,
+                                arguments={"expression": "sqrt(144) + 5"})]
+        return ChatInferenceResponse(**ids, content=content, usage=usage)
+
+
+def make_agent(engine: str, variant: str, live: bool):
+    """Build one agent session for `engine`, on the fake gateway unless `live`."""
+    gateway = None if live else FakeGateway(variant)
+    if engine == "langgraph":
+        agent = TensorZeroLangGraphAgent(gateway_url=GATEWAY_URL, variant_name=variant, renderer=NullRenderer())
+        if gateway is not None:
+            # The compiled graph shares this (cached) model, so swapping its client is enough
+            agent.llm.gateway = gateway
+        return agent
+    return NativeReActAgent(
+        gateway_url=GATEWAY_URL,
+        variant_name=variant,
+        renderer=NullRenderer(),
+        stream=engine == "native-stream",
+        gateway=gateway,
+    )
+
+
+def run(engine: str, variant: str, turns: int, live: bool) -> list[float]:
+    """Return per-step times in milliseconds, each turn in a fresh session (after one warm-up turn)."""
+    make_agent(engine, variant, live).run_turn(PROMPT)
+    timings = []
+    for _ in range(turns):
+        agent = make_agent(engine, variant, live)
+        start = time.perf_counter()
+        new_messages = agent.run_turn(PROMPT)
+        elapsed = (time.perf_counter() - start) * 1000
+        steps = sum(1 for message in new_messages if message.type == "ai") or STEPS_PER_TURN
+        timings.append(elapsed / steps)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200, help="turns per engine (fewer make sense with --live)")
+    parser.add_argument("--variant", default="gpt4_mini", help="agent_chat variant both engines pin")
+    parser.add_argument("--live", action="store_true", help="use the gateway on localhost:3000 instead of the fake")
+    args = parser.parse_args()
+
+    results = {}
+    for engine in ("langgraph", "native", "native-stream"):
+        try:
+            results[engine] = run(engine, args.variant, args.turns, args.live)
+        except Exception as e:
+            print(f"❌ {engine} failed: {e}")
+
+    target = "live gateway" if args.live else "zero-latency fake gateway"
+    print(f"\n📊 {args.turns} turns per engine on agent_chat/{args.variant} ({target})")
+    print("=" * 50)
+    print(f"{'engine':<15} {'p50/step':>10} {'p95/step':>10}")
+    for engine, timings in results.items():
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"{engine:<15} {statistics.median(ordered):>8.2f}ms {p95:>8.2f}ms")
+
+    if "langgraph" in results and "native" in results:
+        langgraph, native = statistics.median(results["langgraph"]), statistics.median(results["native"])
+        print(f"\nThe native engine saves {langgraph - native:.2f} ms per step ({langgraph / native:.1f}x less overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: standalone HTTP gateway vs. embedded (in-process) gateway.
+
+Sends the same inferences through TensorZeroChatModel in both modes and
+reports client-observed latency. Provider time is identical in both modes,
+so the difference is the loopback hop, HTTP serialization and the separate
+gateway process.
+
+Requires the gateway on localhost:3000 (`poe gateway`) and provider API keys.
+
+Usage:
+    python bench_gateway_modes.py [--requests 20] [--function chat] [--variant gpt4_mini]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+from tensorzero_scratch import TensorZeroChatModel
+
+load_dotenv()
+
+
+def run(model: TensorZeroChatModel, requests: int) -> list[float]:
+    """Return per-request latencies in milliseconds (after one warm-up call)."""
+    prompt = [HumanMessage(content="Reply with the single word: pong")]
+    model.invoke(prompt)
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        model.invoke(prompt)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(name: str, latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "mode": name,
+        "mean_ms": statistics.mean(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--function", default="chat")
+    parser.add_argument("--variant", default="gpt4_mini")
+    args = parser.parse_args()
+
+    results = []
+    for mode in ("http", "embedded"):
+        model = TensorZeroChatModel(function_name=args.function, variant_name=args.variant, gateway_mode=mode)
+        try:
+            results.append(summarize(mode, run(model, args.requests)))
+        except Exception as e:
+            print(f"❌ {mode} mode failed: {e}")
+
+    print(f"\n📊 {args.requests} requests to {args.function}/{args.variant}")
+    print("=" * 50)
+    print(f"{'mode':<10} {'mean':>10} {'p50':>10} {'p95':>10}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['mean_ms']:>8.1f}ms {r['p50_ms']:>8.1f}ms {r['p95_ms']:>8.1f}ms")
+
+    if len(results) == 2:
+        saved = results[0]["mean_ms"] - results[1]["mean_ms"]
+        print(f"\nEmbedded mode saves {saved:.1f} ms per call on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: package import time and agent session startup.
+
+Each measurement runs in a fresh interpreter so nothing is already in
+`sys.modules`. Reports the median over several runs of:
+    - `import tensorzero_scratch` and each submodule on its own
+    - constructing the first agent session in a process (imports LangChain,
+      LangGraph and rich, builds the model and compiles the graph)
+    - constructing a second session (reuses the cached compiled graph)
+
+Agent construction uses HTTP mode, which creates clients but does not
+contact the gateway, so no gateway needs to be running.
+
+Usage:
+    python bench_import_time.py [--runs 5] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+src_path = Path(__file__).parent / "src"
+
+IMPORT_TARGETS = [
+    "tensorzero_scratch",
+    "tensorzero_scratch.usage",
+    "tensorzero_scratch.gateway_pool",
+    "tensorzero_scratch.feedback",
+    "tensorzero_scratch.compact_messages",
+    "tensorzero_scratch.conversation_store",
+    "tensorzero_scratch.docs_search",
+    "tensorzero_scratch.json_stream",
+    "tensorzero_scratch.prompt_cache",
+    "tensorzero_scratch.profiling",
+    "tensorzero_scratch.tensorzero_chat_model",
+    "tensorzero_scratch.clickhouse",
+    "tensorzero_scratch.langgraph_agent",
+]
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+SESSION_SCRIPT = """
+import sys, time
+sys.path.insert(0, {src!r})
+from tensorzero_scratch import TensorZeroLangGraphAgent
+timings = []
+for _ in range(2):
+    start = time.perf_counter()
+    TensorZeroLangGraphAgent()
+    timings.append((time.perf_counter() - start) * 1000)
+print(*timings)
+"""
+
+
+def run(script: str) -> list[float]:
+    """Run `script` in a fresh interpreter and parse the timings it prints."""
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--json", action="store_true", help="print results as JSON for tracking over time")
+    args = parser.parse_args()
+
+    results = {}
+    for module in IMPORT_TARGETS:
+        samples = [run(IMPORT_SCRIPT.format(src=str(src_path), module=module))[0] for _ in range(args.runs)]
+        results[f"import {module}"] = statistics.median(samples)
+
+    sessions = [run(SESSION_SCRIPT.format(src=str(src_path))) for _ in range(args.runs)]
+    results["first session"] = statistics.median(first for first, _ in sessions)
+    results["second session"] = statistics.median(second for _, second in sessions)
+
+    if args.json:
+        print(json.dumps({name: round(ms, 2) for name, ms in results.items()}))
+        return
+
+    print(f"⏱️  Cold-start timings (median of {args.runs} fresh interpreters)")
+    print("=" * 60)
+    for name, ms in results.items():
+        print(f"{name:<48} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: LangChain message lists vs. CompactHistory.
+
+Builds many resident sessions of a typical tool-calling conversation and
+measures the heap each representation holds with tracemalloc.
+
+Usage:
+    python bench_message_memory.py [--sessions 2000] [--turns 10]
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from tensorzero_scratch.compact_messages import CompactHistory
+
+
+def build_turn(session: int, turn: int) -> list:
+    """A realistic ReAct turn: question, tool call, tool result, answer."""
+    call_id = f"call_{session}_{turn}"
+    return [
+        HumanMessage(content=f"Can you calculate sqrt({turn * 12}) + {session}?"),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "python_calculator", "args": {"expression": f"sqrt({turn * 12}) + {session}"}, "id": call_id}],
+            response_metadata={"model_name": "gpt-4o-mini", "finish_reason": "tool_calls"},
+            usage_metadata={"input_tokens": 412, "output_tokens": 18, "total_tokens": 430},
+        ),
+        ToolMessage(content=f"Python Calculator Result: sqrt({turn * 12}) + {session} = {session + 3.46}", name="python_calculator", tool_call_id=call_id),
+        AIMessage(
+            content=f"The result of sqrt({turn * 12}) + {session} is approximately {session + 3.46}.",
+            response_metadata={"model_name": "gpt-4o-mini", "finish_reason": "stop"},
+            usage_metadata={"input_tokens": 460, "output_tokens": 24, "total_tokens": 484},
+        ),
+    ]
+
+
+def measure(build) -> tuple[int, object]:
+    """Return the bytes retained by the object `build()` returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return retained, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    num_messages = args.sessions * args.turns * 4
+
+    def langchain_sessions():
+        return [[m for turn in range(args.turns) for m in build_turn(s, turn)] for s in range(args.sessions)]
+
+    def compact_sessions():
+        sessions = []
+        for s in range(args.sessions):
+            history = CompactHistory()
+            for turn in range(args.turns):
+                history.extend(build_turn(s, turn))
+            sessions.append(history)
+        return sessions
+
+    langchain_bytes, langchain_result = measure(langchain_sessions)
+    del langchain_result
+    compact_bytes, compact_result = measure(compact_sessions)
+    del compact_result
+
+    print(f"📊 {args.sessions} sessions × {args.turns} turns ({num_messages:,} messages)")
+    print("=" * 50)
+    print(f"LangChain messages: {langchain_bytes / 2**20:8.1f} MiB  ({langchain_bytes / num_messages:6.0f} B/message)")
+    print(f"CompactHistory:     {compact_bytes / 2**20:8.1f} MiB  ({compact_bytes / num_messages:6.0f} B/message)")
+    print(f"Savings:            {1 - compact_bytes / langchain_bytes:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
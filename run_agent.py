@@ -4,6 +4,21 @@ Simple runner script for the TensorZero LangGraph Agent.
 
 This script provides an easy way to run the TensorZero LangGraph agent
 with proper setup and error handling.
+
+Flags:
+    --demo                 run the predefined demo conversation
+    --embedded             run the gateway in-process from config/tensorzero.toml
+    --output=RENDERER      rich (panels), live (streaming), jsonl or null
+                           (default: rich on a terminal, jsonl when piped)
+    --engine=ENGINE        langgraph (default) or native (ReAct loop on the
+                           native agent_chat API, see tensorzero_scratch.native_agent)
+    --profile[=DIR]        profile every turn (wall vs. CPU, stack samples,
+                           allocation sites) and write flamegraph-compatible
+                           folded stacks per session to DIR (default: profiles/)
+
+Serve mode (HTTP + SSE/WebSocket, see tensorzero_scratch.server):
+    python run_agent.py serve [--host=0.0.0.0] [--port=8080] [--workers=4]
+        [--max-inflight=16] [--store=conversations.db] [--embedded] [--engine=native]
 """
 
 import asyncio
@@ -14,39 +29,95 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from tensorzero_scratch import TensorZeroLangGraphAgent
+from tensorzero_scratch.langgraph_agent import agent_class
+from tensorzero_scratch.gateway_pool import close_all, warm_up
+from tensorzero_scratch.renderers import RichRenderer, get_renderer
+
+GATEWAY_URL = "http://localhost:3000"
+
+
+def flag_value(name: str) -> str | None:
+    """Value of a `--name=value` command line flag, if given."""
+    prefix = f"--{name}="
+    return next((arg[len(prefix):] for arg in sys.argv if arg.startswith(prefix)), None)
 
 
 async def main():
     """Main function to run the TensorZero LangGraph agent."""
+    # Headless renderers keep stdout machine-readable, so status goes to stderr
+    status = sys.stderr
     try:
-        print("🚀 Starting TensorZero LangGraph Agent...")
-        print("Make sure TensorZero gateway is running on http://localhost:3000")
-        print("Run 'poe gateway' in another terminal if not already running.\n")
+        renderer = get_renderer(flag_value("output"))
+        status = sys.stdout if isinstance(renderer, RichRenderer) else sys.stderr
+
+        print("🚀 Starting TensorZero LangGraph Agent...", file=status)
+        print("Make sure TensorZero gateway is running on http://localhost:3000", file=status)
+        print("Run 'poe gateway' in another terminal if not already running.\n", file=status)
+
+        # --embedded runs the gateway in-process from config/tensorzero.toml
+        gateway_mode = "embedded" if "--embedded" in sys.argv else "http"
 
-        agent = TensorZeroLangGraphAgent()
+        # Open pooled gateway connections before the first turn
+        if gateway_mode == "http" and not warm_up([GATEWAY_URL])[GATEWAY_URL]:
+            print("⚠️  Gateway health check failed; continuing anyway\n", file=status)
+
+        engine = agent_class(flag_value("engine") or "langgraph")
+        agent = engine(gateway_url=GATEWAY_URL, gateway_mode=gateway_mode, renderer=renderer)
+
+        # --profile attaches a per-turn CPU/allocation profiler to the chat loops
+        profile_dir = flag_value("profile") or ("profiles" if "--profile" in sys.argv else None)
+        if profile_dir:
+            from tensorzero_scratch.profiling import SessionProfiler
+
+            agent.profiler = SessionProfiler(profile_dir, session_id=agent.session_id, allocations=True)
+            print(f"🔬 Profiling turns to {agent.profiler.folded_path}", file=status)
 
         # Check command line arguments
-        if len(sys.argv) > 1 and sys.argv[1] == "--demo":
-            print("🎭 Running demo conversation...")
+        if "--demo" in sys.argv:
+            print("🎭 Running demo conversation...", file=status)
             await agent.run_demo_conversation()
         else:
-            print("💬 Starting interactive chat...")
-            print("Type 'demo' to run the demo conversation")
-            print("Type 'quit' to exit\n")
+            print("💬 Starting interactive chat...", file=status)
+            print("Type 'demo' to run the demo conversation", file=status)
+            print("Type 'quit' to exit\n", file=status)
             await agent.interactive_chat()
 
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        print(f"❌ Error: {str(e)}", file=status)
         import traceback
-        print("\nFull traceback:")
-        traceback.print_exc()
-        print("\nTroubleshooting:")
-        print("1. Make sure TensorZero gateway is running: poe gateway")
-        print("2. Check your environment variables: poe env-check")
-        print("3. Verify Docker services are up: poe ps")
+        print("\nFull traceback:", file=status)
+        traceback.print_exc(file=status)
+        print("\nTroubleshooting:", file=status)
+        print("1. Make sure TensorZero gateway is running: poe gateway", file=status)
+        print("2. Check your environment variables: poe env-check", file=status)
+        print("3. Verify Docker services are up: poe ps", file=status)
         sys.exit(1)
+    finally:
+        close_all()
+
+
+def run_server():
+    """Serve the agent over HTTP with multiple worker processes."""
+    from tensorzero_scratch.server import ServeSettings, serve
+
+    settings = ServeSettings(
+        gateway_url=GATEWAY_URL,
+        gateway_mode="embedded" if "--embedded" in sys.argv else "http",
+        store_path=flag_value("store") or "conversations.db",
+        max_inflight=int(flag_value("max-inflight") or 16),
+        engine=flag_value("engine") or "langgraph",
+    )
+    print(f"🌐 Serving TensorZero LangGraph Agent ({settings.gateway_mode} gateway, {settings.max_inflight} turns per worker)")
+    serve(
+        settings,
+        host=flag_value("host") or "0.0.0.0",
+        port=int(flag_value("port") or 8080),
+        workers=int(flag_value("workers") or 1),
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if sys.argv[1:2] == ["serve"]:
+        run_server()
+    else:
+        asyncio.run(main())
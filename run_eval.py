@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Evaluate the TensorZero LangGraph agent on scripted conversations.
+
+Replays every script in a JSONL file concurrently across sessions and
+`agent_chat` variants, then prints per-variant latency, ReAct iterations,
+tool-call accuracy and token usage (see tensorzero_scratch.evaluation).
+
+Requires a running gateway (or --embedded) and provider API keys.
+
+Usage:
+    python run_eval.py [evals/agent_scripts.jsonl] [--variants gpt4_mini,claude3_haiku]
+        [--sessions 3] [--concurrency 8] [--results results.jsonl] [--embedded]
+        [--engine langgraph|native]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero_scratch.evaluation import evaluate, load_scripts, print_summary, summarize
+from tensorzero_scratch.gateway_pool import close_all
+
+GATEWAY_URL = "http://localhost:3000"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="?", default=str(Path(__file__).parent / "evals" / "agent_scripts.jsonl"))
+    parser.add_argument("--variants", default="", help="comma-separated agent_chat variants (default: OpenAI-compatible routing)")
+    parser.add_argument("--sessions", type=int, default=1, help="sessions per script and variant")
+    parser.add_argument("--concurrency", type=int, default=8, help="sessions run at once")
+    parser.add_argument("--results", help="write per-turn results to this JSONL file")
+    parser.add_argument("--embedded", action="store_true", help="run the gateway in-process")
+    parser.add_argument("--engine", choices=["langgraph", "native"], default="langgraph", help="agent engine")
+    args = parser.parse_args()
+
+    scripts = load_scripts(args.scripts)
+    variants = [variant.strip() for variant in args.variants.split(",") if variant.strip()] or [None]
+    num_turns = sum(len(script.turns) for script in scripts) * args.sessions * len(variants)
+    print(f"🏃 Evaluating {len(scripts)} scripts × {args.sessions} sessions × {len(variants)} variants ({num_turns} turns)")
+
+    start = time.perf_counter()
+    try:
+        results = evaluate(
+            scripts,
+            variants=variants,
+            sessions_per_script=args.sessions,
+            concurrency=args.concurrency,
+            engine=args.engine,
+            gateway_url=GATEWAY_URL,
+            gateway_mode="embedded" if args.embedded else "http",
+        )
+    finally:
+        close_all()
+    print(f"⏱️  Finished in {time.perf_counter() - start:.1f}s\n")
+
+    if args.results:
+        with open(args.results, "w") as f:
+            for result in results:
+                f.write(json.dumps(result.to_dict()) + "\n")
+
+    print_summary(summarize(results))
+    for result in results:
+        if result.error:
+            print(f"❌ {result.variant} {result.script}[{result.turn}]: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
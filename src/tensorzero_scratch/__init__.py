@@ -2,14 +2,65 @@
 TensorZero Scratch Package
 
 A collection of examples and experiments with TensorZero.
+
+Submodules are imported lazily (PEP 562) on first attribute access, so
+`import tensorzero_scratch` stays cheap and pulls in LangChain, LangGraph,
+rich or pandas only when something that needs them is used.
 """
 
-from .langgraph_agent import TensorZeroLangGraphAgent
-from .tensorzero_chat_model import TensorZeroChatModel
+import importlib
+from typing import TYPE_CHECKING, Any
 
 __version__ = "0.1.0"
 
-__all__ = [
-    "TensorZeroLangGraphAgent",
-    "TensorZeroChatModel",
-]
\ No newline at end of file
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "AsyncClickHouseClient": "clickhouse",
+    "ClickHouseClient": "clickhouse",
+    "CompactHistory": "compact_messages",
+    "CompactMessage": "compact_messages",
+    "ConversationStore": "conversation_store",
+    "FeedbackQueue": "feedback",
+    "JsonFunctionStream": "json_stream",
+    "Renderer": "renderers",
+    "SessionProfiler": "profiling",
+    "TensorZeroLangGraphAgent": "langgraph_agent",
+    "TensorZeroChatModel": "tensorzero_chat_model",
+    "UsageAccumulator": "usage",
+    "configure_pool": "gateway_pool",
+    "get_embedded_gateway": "gateway_pool",
+    "get_gateway": "gateway_pool",
+    "get_http_client": "gateway_pool",
+    "get_renderer": "renderers",
+    "process_usage": "usage",
+    "stream_json_function": "json_stream",
+    "warm_up": "gateway_pool",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .clickhouse import AsyncClickHouseClient, ClickHouseClient
+    from .compact_messages import CompactHistory, CompactMessage
+    from .conversation_store import ConversationStore
+    from .feedback import FeedbackQueue
+    from .gateway_pool import configure_pool, get_embedded_gateway, get_gateway, get_http_client, warm_up
+    from .json_stream import JsonFunctionStream, stream_json_function
+    from .langgraph_agent import TensorZeroLangGraphAgent
+    from .profiling import SessionProfiler
+    from .renderers import Renderer, get_renderer
+    from .tensorzero_chat_model import TensorZeroChatModel
+    from .usage import UsageAccumulator, process_usage
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
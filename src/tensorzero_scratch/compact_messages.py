@@ -0,0 +1,215 @@
+"""
+Compact In-Memory Message Representation
+
+LangChain's `HumanMessage`/`AIMessage`/`ToolMessage` are pydantic models that
+carry several metadata dicts each, which dominates worker memory once tens of
+thousands of sessions are resident. This module keeps conversation history in
+a compact form and converts to LangChain messages only at the boundary.
+
+- `CompactMessage` is a slotted record for a single message
+- `CompactHistory` is an array-backed container: one byte per message for the
+  role, one list slot for the content, and a sparse side table for the few
+  messages that carry tool calls or tool results
+
+Role and tool names are interned, content strings are shared with the
+message they came from rather than copied, and tool-call arguments are kept
+as compact JSON. Per-message metadata (`response_metadata`, `usage_metadata`,
+`additional_kwargs`) is intentionally dropped; record usage before compacting.
+
+Usage:
+    from tensorzero_scratch.compact_messages import CompactHistory
+
+    history = CompactHistory()
+    history.append(HumanMessage(content="What's 2 ** 8?"))
+
+    agent.invoke({"messages": history.to_messages()})
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from tensorzero import Message, Text, ToolCall, ToolResult
+
+
+# Role codes stored in the history's role array
+HUMAN, AI, TOOL, SYSTEM = range(4)
+
+ROLE_NAMES = (sys.intern("human"), sys.intern("ai"), sys.intern("tool"), sys.intern("system"))
+ROLE_CODES = {name: code for code, name in enumerate(ROLE_NAMES)}
+
+# Message types (and ChatMessage roles) stored under one of the four roles
+ROLE_ALIASES = {
+    "AIMessageChunk": "ai",
+    "HumanMessageChunk": "human",
+    "ToolMessageChunk": "tool",
+    "SystemMessageChunk": "system",
+    "user": "human",
+    "assistant": "ai",
+}
+
+
+def message_role(message: BaseMessage) -> str:
+    """The compact role of a LangChain message; raises ValueError for roles it cannot store."""
+    role = message.type
+    if role in ("chat", "ChatMessageChunk"):
+        role = message.role
+    role = ROLE_ALIASES.get(role, role)
+    if role not in ROLE_CODES:
+        raise ValueError(f"Cannot store a {type(message).__name__} with role {role!r} in a compact history")
+    return role
+
+
+class CompactMessage:
+    """A single message reduced to role, content and tool information."""
+
+    __slots__ = ("role", "content", "tool_calls", "tool_call_id", "name")
+
+    def __init__(
+        self,
+        role: str,
+        content: Any,
+        tool_calls: tuple[tuple[str, str, str], ...] = (),
+        tool_call_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ):
+        self.role = sys.intern(role)
+        self.content = content
+        self.tool_calls = tool_calls  # (name, arguments JSON, id) triples
+        self.tool_call_id = tool_call_id
+        self.name = sys.intern(name) if name else None
+
+    @classmethod
+    def from_langchain(cls, message: BaseMessage) -> "CompactMessage":
+        """Compact a LangChain message."""
+        tool_calls: tuple[tuple[str, str, str], ...] = ()
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tool_calls = tuple(
+                (sys.intern(tc["name"]), json.dumps(tc["args"], separators=(",", ":")), tc["id"] or "")
+                for tc in message.tool_calls
+            )
+        return cls(
+            role=message_role(message),
+            content=message.content,
+            tool_calls=tool_calls,
+            tool_call_id=getattr(message, "tool_call_id", None),
+            name=message.name,
+        )
+
+    def to_langchain(self) -> BaseMessage:
+        """Expand to the equivalent LangChain message."""
+        if self.role == "ai":
+            return AIMessage(
+                content=self.content,
+                tool_calls=[
+                    {"name": name, "args": json.loads(args), "id": call_id}
+                    for name, args, call_id in self.tool_calls
+                ],
+            )
+        if self.role == "tool":
+            return ToolMessage(content=self.content, tool_call_id=self.tool_call_id or "", name=self.name)
+        if self.role == "system":
+            return SystemMessage(content=self.content)
+        return HumanMessage(content=self.content)
+
+    def to_tensorzero(self) -> Optional[Message]:
+        """Convert directly to a TensorZero input message, skipping LangChain entirely."""
+        content = self.content if isinstance(self.content, str) else str(self.content)
+        if self.role == "human":
+            return Message(role="user", content=content)
+        if self.role == "ai":
+            if not self.tool_calls:
+                return Message(role="assistant", content=content)
+            blocks: list[Any] = [Text(text=content)] if content else []
+            blocks.extend(
+                ToolCall(id=call_id, raw_name=name, raw_arguments=args, name=name, arguments=json.loads(args))
+                for name, args, call_id in self.tool_calls
+            )
+            return Message(role="assistant", content=blocks)
+        if self.role == "tool":
+            return Message(
+                role="user",
+                content=[ToolResult(name=self.name or "unknown_tool", result=content, id=self.tool_call_id or "unknown_id")],
+            )
+        return None
+
+    def __repr__(self) -> str:
+        return f"CompactMessage(role={self.role!r}, content={self.content!r})"
+
+
+class CompactHistory:
+    """
+    Array-backed conversation history.
+
+    Behaves like a read-only sequence of `CompactMessage`s plus `append`;
+    LangChain messages are only built when `to_messages()` is called.
+    """
+
+    __slots__ = ("_roles", "_contents", "_extras")
+
+    def __init__(self, messages: Iterable[BaseMessage | CompactMessage] = ()):
+        self._roles = array("B")
+        self._contents: list[Any] = []
+        # index -> (tool_calls, tool_call_id, name), only for messages that need it
+        self._extras: dict[int, tuple[tuple[tuple[str, str, str], ...], Optional[str], Optional[str]]] = {}
+        self.extend(messages)
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[BaseMessage]) -> "CompactHistory":
+        """Build a compact history from LangChain messages."""
+        return cls(messages)
+
+    def append(self, message: BaseMessage | CompactMessage) -> None:
+        """Append a LangChain or compact message."""
+        if isinstance(message, BaseMessage):
+            message = CompactMessage.from_langchain(message)
+        index = len(self._contents)
+        code = ROLE_CODES.get(message.role)
+        if code is None:
+            raise ValueError(f"Cannot store a message with role {message.role!r} in a compact history")
+        self._roles.append(code)
+        self._contents.append(message.content)
+        if message.tool_calls or message.tool_call_id or message.name:
+            self._extras[index] = (message.tool_calls, message.tool_call_id, message.name)
+
+    def extend(self, messages: Iterable[BaseMessage | CompactMessage]) -> None:
+        """Append several messages."""
+        for message in messages:
+            self.append(message)
+
+    def _record(self, index: int) -> CompactMessage:
+        tool_calls, tool_call_id, name = self._extras.get(index, ((), None, None))
+        return CompactMessage(ROLE_NAMES[self._roles[index]], self._contents[index], tool_calls, tool_call_id, name)
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def __getitem__(self, index: int) -> CompactMessage:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactHistory index out of range")
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[CompactMessage]:
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def to_messages(self, start: int = 0) -> list[BaseMessage]:
+        """Expand messages from `start` onward into LangChain messages."""
+        return [self._record(index).to_langchain() for index in range(start, len(self))]
+
+    def to_tensorzero(self) -> list[Message]:
+        """Convert the history directly into TensorZero input messages."""
+        converted = (record.to_tensorzero() for record in self)
+        return [message for message in converted if message is not None]
+
+    def clear(self) -> None:
+        """Remove every message."""
+        self._roles = array("B")
+        self._contents.clear()
+        self._extras.clear()
@@ -0,0 +1,235 @@
+"""
+Durable Conversation Store
+
+This module persists agent conversations to an append-only SQLite table so a
+session survives worker restarts without replaying it through the model.
+
+Each message is written as soon as it is produced. Resuming a session loads
+only the most recent turns through an index on `(session_id, role, seq)`, so
+resume cost is O(window) regardless of history length; older turns are paged
+in lazily on demand.
+
+It is a message log only, not a LangGraph checkpointer: it stores the
+conversation's messages, not graph state, pending writes or interrupts, and
+does not implement `BaseCheckpointSaver`.
+
+Several processes (e.g. server workers) can share one database file:
+sequence numbers are allocated inside the write transaction rather than
+cached per process, and `acquire_lease()` lets one process at a time run a
+session's turns.
+
+Usage:
+    from tensorzero_scratch.conversation_store import ConversationStore
+
+    store = ConversationStore("conversations.db")
+    store.append("session-1", [HumanMessage(content="Hi"), AIMessage(content="Hello!")])
+
+    recent = store.load_recent("session-1", turns=10)
+    for message in store.iter_older("session-1", turns=10):
+        ...
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS messages_by_role ON messages (session_id, role, seq);
+
+CREATE TABLE IF NOT EXISTS session_leases (
+    session_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# How long a session lease lasts unless renewed. Holders renew it while they
+# work (`renew_lease()`), so this only bounds how long a crashed process keeps
+# its sessions locked.
+DEFAULT_LEASE_TTL = 30.0
+
+
+class ConversationStore:
+    """
+    Append-only, SQLite-backed message log keyed by session ID.
+
+    A single connection is shared behind a lock, so one store can serve
+    every session in a worker process; writes take SQLite's write lock
+    up front, so stores in other processes can append to the same file.
+    """
+
+    def __init__(self, path: str | Path = "conversations.db"):
+        """Open (or create) the store at `path`; use ":memory:" for a throwaway store."""
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        """Hold SQLite's write lock for the block, so reads inside it see no concurrent writer."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _seq_for(self, session_id: str) -> int:
+        row = self._conn.execute(
+            "SELECT MAX(seq) FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return (row[0] + 1) if row[0] is not None else 0
+
+    def append(self, session_id: str, messages: list[BaseMessage]) -> int:
+        """Append messages to a session and return the sequence number of the last one."""
+        payloads = [(message.type, json.dumps(message_to_dict(message))) for message in messages]
+        with self._lock, self._write_transaction():
+            # Read the next seq under the write lock: another process may have appended since
+            seq = self._seq_for(session_id)
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, seq, role, payload) VALUES (?, ?, ?, ?)",
+                [(session_id, seq + i, role, payload) for i, (role, payload) in enumerate(payloads)],
+            )
+            return seq + len(payloads) - 1
+
+    def acquire_lease(self, session_id: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """
+        Claim a session for `owner` for up to `ttl` seconds.
+
+        Returns False if another owner holds an unexpired lease. Re-acquiring
+        a lease already held by `owner` renews it.
+        """
+        now = time.time()
+        with self._lock, self._write_transaction():
+            row = self._conn.execute(
+                "SELECT owner, expires_at FROM session_leases WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_leases (session_id, owner, expires_at) VALUES (?, ?, ?)",
+                (session_id, owner, now + ttl),
+            )
+            return True
+
+    def renew_lease(self, session_id: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """
+        Extend `owner`'s lease on a session by `ttl` seconds from now.
+
+        Unlike `acquire_lease()` this never creates a lease, so a renewal
+        racing a release cannot resurrect it. Returns False if `owner` no
+        longer holds the lease.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE session_leases SET expires_at = ? WHERE session_id = ? AND owner = ?",
+                (time.time() + ttl, session_id, owner),
+            )
+            return cursor.rowcount > 0
+
+    def release_lease(self, session_id: str, owner: str) -> None:
+        """Release `owner`'s lease on a session (a no-op if it does not hold one)."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM session_leases WHERE session_id = ? AND owner = ?", (session_id, owner)
+            )
+
+    def _window_start(self, session_id: str, turns: int) -> int:
+        """Sequence number of the human message that starts the last `turns` turns."""
+        row = self._conn.execute(
+            "SELECT seq FROM messages WHERE session_id = ? AND role = 'human' "
+            "ORDER BY seq DESC LIMIT 1 OFFSET ?",
+            (session_id, turns - 1),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def load_recent(self, session_id: str, turns: int = 20) -> list[BaseMessage]:
+        """
+        Load the last `turns` conversation turns of a session.
+
+        The window always starts at a human message, so it never begins with
+        an orphaned tool result.
+        """
+        with self._lock:
+            start = self._window_start(session_id, turns)
+            rows = self._conn.execute(
+                "SELECT payload FROM messages WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, start),
+            ).fetchall()
+        return messages_from_dict([json.loads(payload) for (payload,) in rows])
+
+    def load_before(self, session_id: str, before_seq: int, limit: int = 100) -> list[tuple[int, BaseMessage]]:
+        """Load up to `limit` messages older than `before_seq`, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, payload FROM messages WHERE session_id = ? AND seq < ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (session_id, before_seq, limit),
+            ).fetchall()
+        rows.reverse()
+        messages = messages_from_dict([json.loads(payload) for _, payload in rows])
+        return [(seq, message) for (seq, _), message in zip(rows, messages)]
+
+    def iter_older(self, session_id: str, turns: int = 20, page_size: int = 100) -> Iterator[BaseMessage]:
+        """
+        Lazily yield messages older than the recent window, newest first.
+
+        Each page is only read from disk once the previous one is exhausted.
+        """
+        with self._lock:
+            before_seq = self._window_start(session_id, turns)
+        while before_seq > 0:
+            page = self.load_before(session_id, before_seq, page_size)
+            if not page:
+                return
+            for _, message in reversed(page):
+                yield message
+            before_seq = page[0][0]
+
+    def count(self, session_id: str) -> int:
+        """Number of messages stored for a session."""
+        with self._lock:
+            return self._seq_for(session_id)
+
+    def sessions(self) -> list[str]:
+        """List stored session IDs."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT session_id FROM messages").fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def delete(self, session_id: str) -> None:
+        """Delete every message of a session."""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM session_leases WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ConversationStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,394 @@
+"""
+Local TensorZero Documentation Search
+
+This module answers `search_tensorzero_docs` queries locally instead of
+spending a model round trip. Markdown files under `docs/` are split into
+heading-delimited chunks, indexed into a BM25 inverted index, and persisted
+to a single binary file that is memory-mapped on load, so queries only touch
+the postings of the query terms.
+
+Index file layout (little-endian, every block 4-byte aligned):
+    header    magic, version, doc count, average doc length, block offsets
+    postings  uint32 doc ids, followed by float32 term frequencies
+    norms     float32 BM25 length normalization per chunk
+    terms     JSON {term: [postings offset, document frequency]}
+    chunks    JSON [{source, heading, text}]
+    manifest  JSON {path: {mtime_ns, size, terms: [{term: tf} per chunk]}}
+
+Searches through the `search_tensorzero_docs` tool call `refresh_if_due()`,
+which re-checks the docs' mtimes at most every `REFRESH_INTERVAL` seconds,
+so edits to the docs are picked up without restarting the process.
+
+The docs directory defaults to `docs/` in the repository checkout; set
+TENSORZERO_DOCS_DIR (and optionally TENSORZERO_DOCS_INDEX) when running
+from an installed package. The index defaults to `.cache/docs_index.bin`
+next to the docs directory.
+
+The manifest caches the token counts of each source file's chunks (their
+text lives only in the chunks block), so when docs change only the modified
+files are re-chunked and re-tokenized before the index file is rewritten.
+
+Usage:
+    from tensorzero_scratch.docs_search import get_docs_index
+
+    for hit in get_docs_index().search("embedded gateway clickhouse", k=3):
+        print(hit.score, hit.heading, hit.source)
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DOCS_DIR = REPO_ROOT / "docs"
+
+# Minimum seconds between the docs mtime checks of `refresh_if_due()`
+REFRESH_INTERVAL = 5.0
+
+MAGIC = b"TZDOCIX1"
+VERSION = 2
+# magic, version, num_docs, avgdl, then (offset, length) for 5 blocks
+HEADER = struct.Struct("<8sIIf10Q")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Chunks longer than this (characters) are split on paragraph boundaries
+MAX_CHUNK_CHARS = 1200
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it of on or that the this to "
+    "what when where which with you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed and a light plural strip."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def chunk_markdown(text: str) -> list[tuple[str, str]]:
+    """Split markdown into (heading path, body) chunks, ignoring '#' lines inside code fences."""
+    chunks = []
+    headings: list[str] = []
+    lines: list[str] = []
+    in_fence = False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            heading = " > ".join(headings)
+            for part in _split_long(body):
+                chunks.append((heading, part))
+        lines.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            headings[level - 1:] = [match.group(2).strip()]
+        else:
+            lines.append(line)
+    flush()
+    return chunks
+
+
+def _split_long(body: str) -> list[str]:
+    if len(body) <= MAX_CHUNK_CHARS:
+        return [body]
+    parts, current = [], ""
+    for paragraph in body.split("\n\n"):
+        if current and len(current) + len(paragraph) > MAX_CHUNK_CHARS:
+            parts.append(current.strip())
+            current = ""
+        current += paragraph + "\n\n"
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+@dataclass
+class SearchHit:
+    """A ranked documentation chunk."""
+
+    score: float
+    source: str
+    heading: str
+    text: str
+
+
+def _align(buffer: bytearray) -> None:
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+
+
+def _write_index(path: Path, manifest: dict, chunks_by_source: dict[str, list[dict]]) -> None:
+    """Build the inverted index from the manifest and chunks, and atomically write it to `path`."""
+    chunks = []
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths = []
+    for source in sorted(manifest):
+        for chunk, terms in zip(chunks_by_source[source], manifest[source]["terms"]):
+            doc_id = len(chunks)
+            chunks.append({"source": source, "heading": chunk["heading"], "text": chunk["text"]})
+            lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+    avgdl = sum(lengths) / len(lengths) if lengths else 0.0
+    norms = [K1 * (1 - B + B * length / avgdl) if avgdl else K1 for length in lengths]
+
+    doc_ids, tfs, terms = [], [], {}
+    for term in sorted(postings):
+        terms[term] = [len(doc_ids), len(postings[term])]
+        for doc_id, tf in postings[term]:
+            doc_ids.append(doc_id)
+            tfs.append(float(tf))
+
+    body = bytearray(b"\0" * HEADER.size)
+    blocks = []
+    for payload in (
+        struct.pack(f"<{len(doc_ids)}I", *doc_ids) + struct.pack(f"<{len(tfs)}f", *tfs),
+        struct.pack(f"<{len(norms)}f", *norms),
+        json.dumps(terms, separators=(",", ":")).encode(),
+        json.dumps(chunks, separators=(",", ":")).encode(),
+        json.dumps(manifest, separators=(",", ":")).encode(),
+    ):
+        _align(body)
+        blocks.extend((len(body), len(payload)))
+        body.extend(payload)
+    body[: HEADER.size] = HEADER.pack(MAGIC, VERSION, len(chunks), avgdl, *blocks)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A private temp file per writer, so concurrent builders never interleave writes
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+        f.write(body)
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+class _Snapshot:
+    """One mapped index file. Never mutated; unmapped once no search holds it."""
+
+    def __init__(self, mapped: mmap.mmap):
+        magic, version, num_docs, avgdl, *blocks = HEADER.unpack_from(mapped)
+        (post_off, post_len), (norm_off, norm_len), (term_off, term_len), (chunk_off, chunk_len), (man_off, man_len) = zip(
+            blocks[0::2], blocks[1::2]
+        )
+        view = memoryview(mapped)
+        num_postings = post_len // 8
+        self.mmap = mapped
+        self.num_docs = num_docs
+        self.avgdl = avgdl
+        self.doc_ids = view[post_off:post_off + num_postings * 4].cast("I")
+        self.tfs = view[post_off + num_postings * 4:post_off + post_len].cast("f")
+        self.norms = view[norm_off:norm_off + norm_len].cast("f")
+        self.terms = json.loads(bytes(view[term_off:term_off + term_len]))
+        self.chunks = json.loads(bytes(view[chunk_off:chunk_off + chunk_len]))
+        self.manifest = json.loads(bytes(view[man_off:man_off + man_len]))
+        view.release()
+
+    def chunks_by_source(self) -> dict[str, list[dict]]:
+        grouped: dict[str, list[dict]] = {}
+        for chunk in self.chunks:
+            grouped.setdefault(chunk["source"], []).append(chunk)
+        return grouped
+
+    def release(self) -> None:
+        for view in (self.doc_ids, self.tfs, self.norms):
+            view.release()
+        self.mmap.close()
+
+
+class DocsIndex:
+    """
+    Memory-mapped BM25 index over markdown documentation.
+
+    The index is rebuilt incrementally whenever `refresh()` finds that a
+    markdown file under the docs directory was added, changed or removed.
+    Searches run lock-free against an immutable snapshot of the mapped file;
+    `refresh()` swaps in a new snapshot, and the old mapping is released
+    once the searches still using it finish.
+    """
+
+    def __init__(
+        self,
+        docs_dir: Optional[str | Path] = None,
+        index_path: Optional[str | Path] = None,
+        refresh_interval: float = REFRESH_INTERVAL,
+    ):
+        """
+        Open the index at `index_path`, building or refreshing it from `docs_dir` as needed.
+
+        Both default to `default_docs_dir()` / `default_index_path()`. Raises
+        FileNotFoundError if the docs directory does not exist.
+        """
+        self.docs_dir = Path(docs_dir) if docs_dir is not None else default_docs_dir()
+        if not self.docs_dir.is_dir():
+            raise FileNotFoundError(
+                f"Docs directory {self.docs_dir} does not exist; set TENSORZERO_DOCS_DIR to the TensorZero docs"
+            )
+        self.index_path = Path(index_path) if index_path is not None else default_index_path(self.docs_dir)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self.refresh()
+
+    @property
+    def num_docs(self) -> int:
+        return self._snapshot.num_docs if self._snapshot is not None else 0
+
+    @property
+    def avgdl(self) -> float:
+        return self._snapshot.avgdl if self._snapshot is not None else 0.0
+
+    def _load(self) -> Optional[_Snapshot]:
+        """Map the index file, or return None if it is missing or in a stale format."""
+        if not self.index_path.exists():
+            return None
+        with open(self.index_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < HEADER.size or HEADER.unpack_from(mapped)[:2] != (MAGIC, VERSION):
+            mapped.close()
+            return None
+        return _Snapshot(mapped)
+
+    def refresh(self) -> bool:
+        """
+        Reindex changed markdown files. Returns True if the index was rebuilt.
+
+        Unchanged files reuse their cached token counts from the manifest and
+        their chunks from the mapped index; only new or modified files are
+        re-read and re-tokenized.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            snapshot = self._snapshot or self._load()
+            manifest = snapshot.manifest if snapshot is not None else {}
+            previous_chunks = snapshot.chunks_by_source() if snapshot is not None else {}
+
+            current, chunks_by_source = {}, {}
+            changed = False
+            for path in sorted(self.docs_dir.rglob("*.md")):
+                source = str(path.relative_to(self.docs_dir))
+                stat = path.stat()
+                cached = manifest.get(source)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    current[source] = cached
+                    chunks_by_source[source] = previous_chunks.get(source, [])
+                    continue
+                changed = True
+                chunks = [{"heading": heading, "text": text} for heading, text in chunk_markdown(path.read_text())]
+                chunks_by_source[source] = chunks
+                current[source] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "terms": [dict(Counter(tokenize(f"{chunk['heading']}\n{chunk['text']}"))) for chunk in chunks],
+                }
+            changed = changed or set(current) != set(manifest) or snapshot is None
+
+            if changed:
+                _write_index(self.index_path, current, chunks_by_source)
+                snapshot = self._load()
+            # Searches read this attribute once, so the swap is atomic for them
+            self._snapshot = snapshot
+            return changed
+
+    def refresh_if_due(self) -> bool:
+        """`refresh()` if the docs were last checked over `refresh_interval` seconds ago."""
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return False
+        return self.refresh()
+
+    def search(self, query: str, k: int = 3) -> list[SearchHit]:
+        """Return the top `k` chunks for `query` by BM25 score."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("The docs index is closed")
+        scores: dict[int, float] = {}
+        doc_ids, tfs, norms = snapshot.doc_ids, snapshot.tfs, snapshot.norms
+        for term in set(tokenize(query)):
+            entry = snapshot.terms.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            idf = math.log(1 + (snapshot.num_docs - df + 0.5) / (df + 0.5))
+            for i in range(offset, offset + df):
+                doc_id = doc_ids[i]
+                tf = tfs[i]
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norms[doc_id])
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [SearchHit(score=score, **snapshot.chunks[doc_id]) for doc_id, score in best]
+
+    def close(self) -> None:
+        """Unmap the index file; searches must have finished."""
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.release()
+                self._snapshot = None
+
+
+def default_docs_dir() -> Path:
+    """TENSORZERO_DOCS_DIR, or `docs/` in the repository checkout."""
+    return Path(os.environ.get("TENSORZERO_DOCS_DIR", DEFAULT_DOCS_DIR))
+
+
+def default_index_path(docs_dir: Path) -> Path:
+    """TENSORZERO_DOCS_INDEX, or `.cache/docs_index.bin` next to the docs directory."""
+    index_path = os.environ.get("TENSORZERO_DOCS_INDEX")
+    return Path(index_path) if index_path else docs_dir.resolve().parent / ".cache" / "docs_index.bin"
+
+
+_index: Optional[DocsIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_docs_index() -> DocsIndex:
+    """Get the process-wide docs index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DocsIndex()
+    return _index
+
+
+def format_hits(hits: list[SearchHit], max_chars: int = 600) -> str:
+    """Format search hits as a compact tool result."""
+    if not hits:
+        return "No matching TensorZero documentation found."
+    sections = []
+    for hit in hits:
+        text = hit.text if len(hit.text) <= max_chars else hit.text[:max_chars].rstrip() + "..."
+        sections.append(f"[{hit.source} § {hit.heading}]\n{text}")
+    return "\n\n".join(sections)
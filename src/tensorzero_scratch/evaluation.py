@@ -0,0 +1,256 @@
+"""
+Agent Trajectory Evaluation
+
+Replays scripted conversations through the agent concurrently, across many
+sessions and `agent_chat` variants, and records for every turn:
+
+- wall-clock latency
+- ReAct iterations (model calls, i.e. AI messages produced by the turn)
+- tool calls made vs. the tools the script expects
+- input/output tokens, and input tokens read from the provider's prompt cache
+
+Scripts are JSONL, one conversation per line:
+
+    {"name": "math", "turns": [{"message": "What's sqrt(144) + 5?", "expected_tools": ["python_calculator"]}]}
+
+A turn may also be a bare string when no tools are expected.
+
+Usage:
+    from tensorzero_scratch.evaluation import evaluate, load_scripts, print_summary, summarize
+
+    results = evaluate(load_scripts("evals/agent_scripts.jsonl"), variants=["gpt4_mini", "claude3_haiku"])
+    print_summary(summarize(results))
+"""
+
+import json
+import math
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage
+
+from .renderers import NullRenderer
+
+
+@dataclass
+class ScriptTurn:
+    """One user message and the tools the agent is expected to call for it."""
+
+    message: str
+    expected_tools: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ConversationScript:
+    """A named multi-turn conversation."""
+
+    name: str
+    turns: list[ScriptTurn]
+
+
+def load_scripts(path: str | Path) -> list[ConversationScript]:
+    """Load conversation scripts from a JSONL file (blank lines and `#` comments are skipped)."""
+    scripts = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            data = json.loads(line)
+            turns = [
+                ScriptTurn(turn) if isinstance(turn, str) else ScriptTurn(turn["message"], list(turn.get("expected_tools", [])))
+                for turn in data["turns"]
+            ]
+            scripts.append(ConversationScript(data.get("name", f"script_{line_number}"), turns))
+    return scripts
+
+
+@dataclass
+class TurnResult:
+    """Measurements for one turn of one session."""
+
+    script: str
+    variant: str
+    session_id: str
+    turn: int
+    latency_ms: float
+    iterations: int = 0
+    tool_calls: list[str] = field(default_factory=list)
+    expected_tools: list[str] = field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def matched_tools(self) -> int:
+        """Tool calls that were expected (counting repeats)."""
+        return sum((Counter(self.tool_calls) & Counter(self.expected_tools)).values())
+
+    @property
+    def missing_tools(self) -> list[str]:
+        return list((Counter(self.expected_tools) - Counter(self.tool_calls)).elements())
+
+    @property
+    def unexpected_tools(self) -> list[str]:
+        return list((Counter(self.tool_calls) - Counter(self.expected_tools)).elements())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "missing_tools": self.missing_tools, "unexpected_tools": self.unexpected_tools}
+
+
+DEFAULT_VARIANT = "default"
+
+# The native engine calls agent_chat's configured tools by their configured
+# names; map them to the LangGraph tool names scripts are written against
+TOOL_ALIASES = {
+    "calculator": "python_calculator",
+    "search_tensorzero_docs": "docs_search",
+}
+
+
+def run_session(script: ConversationScript, variant: str, agent_factory: Callable[[Optional[str]], Any]) -> list[TurnResult]:
+    """Play one script through a fresh agent session, turn by turn."""
+    agent = agent_factory(None if variant == DEFAULT_VARIANT else variant)
+    session_id = getattr(agent, "session_id", None) or str(uuid.uuid4())
+    results = []
+    for index, turn in enumerate(script.turns):
+        start = time.perf_counter()
+        try:
+            new_messages = agent.run_turn(turn.message)
+            error = None
+        except Exception as e:
+            new_messages, error = [], str(e)
+        result = TurnResult(
+            script=script.name,
+            variant=variant,
+            session_id=session_id,
+            turn=index,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            expected_tools=list(turn.expected_tools),
+            error=error,
+        )
+        for message in new_messages:
+            if not isinstance(message, AIMessage):
+                continue
+            result.iterations += 1
+            result.tool_calls.extend(TOOL_ALIASES.get(tc["name"], tc["name"]) for tc in message.tool_calls)
+            if message.usage_metadata:
+                result.input_tokens += message.usage_metadata.get("input_tokens", 0)
+                result.output_tokens += message.usage_metadata.get("output_tokens", 0)
+                result.cached_input_tokens += (message.usage_metadata.get("input_token_details") or {}).get("cache_read", 0)
+        results.append(result)
+    return results
+
+
+def evaluate(
+    scripts: Iterable[ConversationScript],
+    variants: Iterable[Optional[str]] = (None,),
+    sessions_per_script: int = 1,
+    concurrency: int = 8,
+    agent_factory: Optional[Callable[[Optional[str]], Any]] = None,
+    engine: str = "langgraph",
+    **agent_kwargs: Any,
+) -> list[TurnResult]:
+    """
+    Run every script `sessions_per_script` times for every variant, `concurrency` sessions at a time.
+
+    A variant of None uses the agent's default routing. Sessions run in
+    threads, each with its own agent of the given `engine` ("langgraph" or
+    "native"); extra keyword arguments are passed to the agent, or
+    `agent_factory(variant)` can supply the agent instead.
+    """
+    if agent_factory is None:
+        from .langgraph_agent import agent_class
+
+        engine_class = agent_class(engine)
+
+        def agent_factory(variant: Optional[str]):
+            return engine_class(variant_name=variant, renderer=NullRenderer(), **agent_kwargs)
+
+    jobs = [
+        (script, variant or DEFAULT_VARIANT)
+        for variant in variants
+        for script in scripts
+        for _ in range(sessions_per_script)
+    ]
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="eval-session") as executor:
+        sessions = executor.map(lambda job: run_session(job[0], job[1], agent_factory), jobs)
+        return [result for session in sessions for result in session]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(results: Iterable[TurnResult]) -> list[dict[str, Any]]:
+    """Aggregate turn results per variant."""
+    by_variant: dict[str, list[TurnResult]] = {}
+    for result in results:
+        by_variant.setdefault(result.variant, []).append(result)
+
+    summary = []
+    for variant, turns in by_variant.items():
+        ok = [turn for turn in turns if turn.error is None]
+        latencies = [turn.latency_ms for turn in ok]
+        expected = sum(len(turn.expected_tools) for turn in ok)
+        made = sum(len(turn.tool_calls) for turn in ok)
+        matched = sum(turn.matched_tools for turn in ok)
+        input_tokens = sum(turn.input_tokens for turn in ok)
+        summary.append({
+            "variant": variant,
+            "sessions": len({turn.session_id for turn in turns}),
+            "turns": len(turns),
+            "errors": len(turns) - len(ok),
+            "p50_ms": _percentile(latencies, 0.5),
+            "p95_ms": _percentile(latencies, 0.95),
+            "iterations_per_turn": sum(turn.iterations for turn in ok) / len(ok) if ok else math.nan,
+            "tool_recall": matched / expected if expected else math.nan,
+            "tool_precision": matched / made if made else math.nan,
+            "exact_tool_turns": sum(1 for turn in ok if Counter(turn.tool_calls) == Counter(turn.expected_tools)) / len(ok) if ok else math.nan,
+            "input_tokens_per_turn": input_tokens / len(ok) if ok else math.nan,
+            "cached_input_share": sum(turn.cached_input_tokens for turn in ok) / input_tokens if input_tokens else math.nan,
+            "output_tokens_per_turn": sum(turn.output_tokens for turn in ok) / len(ok) if ok else math.nan,
+        })
+    return summary
+
+
+def print_summary(summary: list[dict[str, Any]], console: Any = None) -> None:
+    """Print the per-variant summary as a table."""
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Agent trajectory evaluation")
+    columns = [
+        ("Variant", "variant", "{}"),
+        ("Sessions", "sessions", "{}"),
+        ("Turns", "turns", "{}"),
+        ("Errors", "errors", "{}"),
+        ("p50 ms", "p50_ms", "{:.0f}"),
+        ("p95 ms", "p95_ms", "{:.0f}"),
+        ("Iter/turn", "iterations_per_turn", "{:.2f}"),
+        ("Tool recall", "tool_recall", "{:.0%}"),
+        ("Tool precision", "tool_precision", "{:.0%}"),
+        ("Exact tools", "exact_tool_turns", "{:.0%}"),
+        ("In tok/turn", "input_tokens_per_turn", "{:.0f}"),
+        ("Cached in", "cached_input_share", "{:.0%}"),
+        ("Out tok/turn", "output_tokens_per_turn", "{:.0f}"),
+    ]
+    for header, *_ in columns:
+        table.add_column(header, justify="left" if header == "Variant" else "right")
+    for row in summary:
+        table.add_row(*(
+            "–" if isinstance(row[key], float) and math.isnan(row[key]) else fmt.format(row[key])
+            for _, key, fmt in columns
+        ))
+    (console or Console()).print(table)
@@ -0,0 +1,348 @@
+"""
+Background Feedback Submission for TensorZero
+
+This module provides a queue that takes feedback off the user-facing path.
+`submit()` only enqueues; a background thread sends queued feedback to the
+gateway in concurrent batches, retrying transient failures with backoff.
+
+Memory is bounded by `max_queue_size`. Feedback that overflows the queue,
+exhausts its retries, or is still queued at shutdown is appended to a local
+JSONL spool and re-enqueued the next time a queue is started with the same
+spool file. Restored feedback stays on disk (moved aside to
+`<spool>.restoring`) until every restored item has been delivered, rejected
+or spooled again, so a crash after a restart cannot lose it; delivery is
+at-least-once. Without a spool file such feedback is counted as `dropped` and a
+warning is emitted. Feedback submitted after `close()` is spooled (or
+dropped) the same way rather than queued. If the sender thread fails, the failure is kept in
+`error` and everything queued is spooled (or dropped) so `flush()` returns.
+
+Usage:
+    from tensorzero_scratch.feedback import FeedbackQueue
+
+    with FeedbackQueue(spool_path="feedback_spool.jsonl") as feedback:
+        feedback.submit("user_rating", 0.9, inference_id=response.inference_id)
+        feedback.submit("helpful", True, inference_id=response.inference_id)
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import queue
+import threading
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from tensorzero import AsyncTensorZeroGateway
+
+
+@dataclass
+class FeedbackItem:
+    """A single pending feedback submission."""
+
+    metric_name: str
+    value: Any
+    inference_id: Optional[str] = None
+    episode_id: Optional[str] = None
+    tags: Optional[dict[str, str]] = None
+    attempts: int = 0
+
+
+@dataclass
+class FeedbackStats:
+    """Counters describing what happened to submitted feedback."""
+
+    submitted: int = 0
+    delivered: int = 0
+    rejected: int = 0
+    spooled: int = 0
+    restored: int = 0
+    dropped: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Client errors (4xx) are permanent; everything else is worth retrying."""
+    status_code = getattr(error, "status_code", None)
+    return status_code is None or status_code >= 500 or status_code == 429
+
+
+class FeedbackQueue:
+    """
+    Non-blocking, batched feedback submitter backed by a background thread.
+
+    The thread owns its own event loop and `AsyncTensorZeroGateway`, so it
+    can be used from synchronous code, notebooks and async applications alike.
+    """
+
+    def __init__(
+        self,
+        gateway_url: Optional[str] = None,
+        spool_path: Optional[str | Path] = None,
+        max_queue_size: int = 10_000,
+        batch_size: int = 64,
+        flush_interval: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        client: Optional[Any] = None,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            gateway_url: TensorZero gateway URL (defaults to TENSORZERO_GATEWAY_URL)
+            spool_path: JSONL file for undelivered feedback; None disables persistence
+            max_queue_size: Maximum number of feedback items held in memory
+            batch_size: Maximum number of feedback requests sent concurrently
+            flush_interval: Seconds to wait for more items before sending a partial batch
+            max_retries: Retries per item for transient failures
+            retry_backoff: Base delay in seconds for exponential backoff between retries
+            client: Pre-built async gateway client (mainly for testing)
+        """
+        self.gateway_url = gateway_url or os.environ.get("TENSORZERO_GATEWAY_URL", "http://localhost:3000")
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.stats = FeedbackStats()
+        # Why the sender thread stopped, if it failed
+        self.error: Optional[BaseException] = None
+
+        self._client = client
+        self._owns_client = client is None
+        self._queue: queue.Queue[FeedbackItem] = queue.Queue(maxsize=max_queue_size)
+        self._spool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # ids of restored items not yet delivered, rejected or spooled again
+        self._restoring: set[int] = set()
+
+    def start(self) -> "FeedbackQueue":
+        """Restore spooled feedback and start the background sender."""
+        if self._thread is not None:
+            return self
+
+        self._closed = False
+        self._restore_spool()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tensorzero-feedback", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def submit(
+        self,
+        metric_name: str,
+        value: Any,
+        inference_id: Optional[Any] = None,
+        episode_id: Optional[Any] = None,
+        tags: Optional[dict[str, str]] = None,
+    ) -> bool:
+        """
+        Enqueue feedback without blocking.
+
+        Returns True if the item was queued in memory, False if the queue was
+        full and the item was written to the spool instead.
+        """
+        item = FeedbackItem(
+            metric_name=metric_name,
+            value=value,
+            inference_id=str(inference_id) if inference_id is not None else None,
+            episode_id=str(episode_id) if episode_id is not None else None,
+            tags=tags,
+        )
+        self._count("submitted")
+        if self._closed or self.error is not None:
+            self._spool([item])
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._spool([item])
+            return False
+        if self._closed or self.error is not None:
+            # Closed or failed after the check above, and may have drained already
+            self._drain()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued item has been delivered, rejected or spooled."""
+        done = threading.Event()
+
+        def wait():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush pending feedback, stop the sender and spool anything left over."""
+        if self._thread is None:
+            return
+
+        self.flush(timeout)
+        self._closed = True
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        atexit.unregister(self.close)
+        self._drain()
+
+    @property
+    def pending(self) -> int:
+        """Number of feedback items waiting in memory."""
+        return self._queue.qsize()
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + n)
+
+    def _drain(self) -> None:
+        """Spool everything still queued, completing it for `flush()` waiters."""
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        self._spool(leftovers)
+
+    def _next_batch(self) -> list[FeedbackItem]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        asyncio.run(self._run_async())
+
+    async def _run_async(self) -> None:
+        try:
+            if self._owns_client:
+                self._client = await AsyncTensorZeroGateway.build_http(gateway_url=self.gateway_url)
+
+            while not self._stop.is_set():
+                batch = await asyncio.to_thread(self._next_batch)
+                if not batch:
+                    continue
+                try:
+                    await asyncio.gather(*(self._send(item) for item in batch))
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        except Exception as e:
+            self.error = e
+            warnings.warn(f"Feedback sender stopped: {e!r}; queued feedback is spooled from now on", stacklevel=1)
+            self._drain()
+        finally:
+            # The client is bound to this thread's event loop
+            if self._owns_client:
+                self._client = None
+
+    async def _send(self, item: FeedbackItem) -> None:
+        while True:
+            try:
+                await self._client.feedback(
+                    metric_name=item.metric_name,
+                    value=item.value,
+                    inference_id=item.inference_id,
+                    episode_id=item.episode_id,
+                    tags=item.tags,
+                )
+                self._count("delivered")
+                self._settle([item])
+                return
+            except Exception as e:
+                item.attempts += 1
+                if not _is_retryable(e):
+                    self._count("rejected")
+                    self._settle([item])
+                    return
+                if item.attempts > self.max_retries or self._stop.is_set():
+                    self._spool([item])
+                    return
+                await asyncio.sleep(self.retry_backoff * 2 ** (item.attempts - 1))
+
+    def _spool(self, items: list[FeedbackItem]) -> None:
+        if not items:
+            return
+        if self.spool_path is None:
+            self._count("dropped", len(items))
+            warnings.warn(f"Dropped {len(items)} undelivered feedback item(s); set spool_path to keep them", stacklevel=2)
+            return
+        with self._spool_lock, open(self.spool_path, "a") as f:
+            for item in items:
+                item.attempts = 0
+                f.write(json.dumps(asdict(item)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._count("spooled", len(items))
+        self._settle(items)
+
+    @property
+    def _restoring_path(self) -> Path:
+        return self.spool_path.with_name(self.spool_path.name + ".restoring")
+
+    def _settle(self, items: list[FeedbackItem]) -> None:
+        """Mark items as delivered, rejected or spooled; drop the restored spool once all of it is."""
+        if not self._restoring:
+            return
+        with self._spool_lock:
+            if not self._restoring:
+                return
+            self._restoring.difference_update(id(item) for item in items)
+            if not self._restoring:
+                self._restoring_path.unlink(missing_ok=True)
+
+    def _restore_spool(self) -> None:
+        if self.spool_path is None:
+            return
+
+        restoring = self._restoring_path
+        with self._spool_lock:
+            if self.spool_path.exists():
+                if restoring.exists():
+                    # Left over from a run that stopped before finishing its restore
+                    with open(restoring, "a") as f:
+                        f.write(self.spool_path.read_text())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self.spool_path.unlink()
+                else:
+                    os.replace(self.spool_path, restoring)
+            if not restoring.exists():
+                return
+            items = [FeedbackItem(**json.loads(line)) for line in restoring.read_text().splitlines() if line.strip()]
+            self._restoring = {id(item) for item in items}
+            if not items:
+                restoring.unlink()
+
+        overflow = []
+        for item in items:
+            try:
+                self._queue.put_nowait(item)
+                self._count("restored")
+            except queue.Full:
+                overflow.append(item)
+        self._spool(overflow)
+
+    def __enter__(self) -> "FeedbackQueue":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,239 @@
+"""
+Process-Wide Gateway Client Registry
+
+Building a TensorZero client or an `httpx.Client` per model instance gives
+each one its own connection pool, so every new model pays TCP/TLS setup and
+no two sessions share keep-alive connections. This module keeps one client per
+(gateway URL, mode) for the whole process instead.
+
+Modes:
+    - "http": a `TensorZeroGateway` talking to the native gateway API
+    - "openai": an `httpx.Client` for the gateway's OpenAI-compatible endpoint
+    - "embedded": a `TensorZeroGateway` running the gateway in-process from a
+      config file, keyed by config file and ClickHouse URL instead of gateway URL
+
+Pool settings are set once with `configure_pool()` before clients are first
+created. Only the "openai" `httpx.Client` honors all of them: the native
+TensorZero clients manage their own connections and take just the request
+timeout, so building one while connection limits, keep-alive or HTTP/2 are
+changed from their defaults emits a warning. HTTP/2 needs the optional `h2`
+package and silently falls back to HTTP/1.1 without it.
+
+Usage:
+    from tensorzero_scratch.gateway_pool import configure_pool, get_gateway, warm_up
+
+    configure_pool(max_connections=200, http2=True)
+    warm_up(["http://localhost:3000"])
+
+    gateway = get_gateway("http://localhost:3000")  # shared by every caller
+    embedded = get_embedded_gateway()  # in-process, from config/tensorzero.toml
+"""
+
+import atexit
+import os
+import threading
+import warnings
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from tensorzero import TensorZeroError, TensorZeroGateway
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+
+DEFAULT_CONFIG_FILE = str(Path(__file__).resolve().parents[2] / "config" / "tensorzero.toml")
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    Connection pool settings for the clients the registry creates.
+
+    `timeout` applies to every client; the connection settings only to the
+    "openai" `httpx.Client` (see `NATIVE_SETTINGS`).
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+
+    def httpx_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def httpx_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+    def unsupported_by_native(self) -> list[str]:
+        """Changed settings that the native TensorZero clients cannot honor."""
+        default = PoolConfig()
+        return [
+            field.name for field in fields(self)
+            if field.name not in NATIVE_SETTINGS and getattr(self, field.name) != getattr(default, field.name)
+        ]
+
+
+# The only PoolConfig settings the native TensorZero clients accept
+NATIVE_SETTINGS = {"timeout"}
+
+
+_lock = threading.Lock()
+_config = PoolConfig()
+_clients: dict[tuple[str, str], Any] = {}
+
+
+def configure_pool(**settings: Any) -> PoolConfig:
+    """
+    Update the pool configuration used for clients created from now on.
+
+    Accepts any `PoolConfig` field; existing clients keep their settings
+    until `close_all()` is called.
+    """
+    global _config
+    with _lock:
+        _config = replace(_config, **settings)
+        return _config
+
+
+def pool_config() -> PoolConfig:
+    """Get the current pool configuration."""
+    return _config
+
+
+def _normalize(gateway_url: str) -> str:
+    return gateway_url.rstrip("/")
+
+
+def _build(gateway_url: str, mode: str) -> Any:
+    if mode in ("embedded", "http"):
+        unsupported = _config.unsupported_by_native()
+        if unsupported:
+            warnings.warn(
+                f"The native TensorZero client ({mode}) only honors the pool timeout; "
+                f"ignoring {', '.join(unsupported)}",
+                stacklevel=4,
+            )
+    if mode == "embedded":
+        config_file, _, clickhouse_url = gateway_url.partition("|")
+        return TensorZeroGateway.build_embedded(
+            config_file=config_file,
+            clickhouse_url=clickhouse_url or None,
+            timeout=_config.timeout,
+        )
+    if mode == "http":
+        return TensorZeroGateway.build_http(gateway_url=gateway_url, timeout=_config.timeout)
+    if mode == "openai":
+        return httpx.Client(
+            limits=_config.httpx_limits(),
+            timeout=_config.httpx_timeout(),
+            http2=_config.http2 and H2_AVAILABLE,
+        )
+    raise ValueError(f"Unknown gateway client mode: {mode!r}")
+
+
+def _get(gateway_url: str, mode: str) -> Any:
+    key = (_normalize(gateway_url), mode)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build(key[0], mode)
+    return client
+
+
+def get_gateway(gateway_url: str) -> TensorZeroGateway:
+    """Get the shared native TensorZero client for a gateway URL."""
+    return _get(gateway_url, "http")
+
+
+def get_embedded_gateway(
+    config_file: Optional[str] = None,
+    clickhouse_url: Optional[str] = None,
+) -> TensorZeroGateway:
+    """
+    Get the shared in-process TensorZero gateway for a config file.
+
+    Defaults to TENSORZERO_CONFIG_FILE or the repo's `config/tensorzero.toml`.
+    Without a ClickHouse URL the gateway runs with observability disabled.
+    """
+    config_file = config_file or os.environ.get("TENSORZERO_CONFIG_FILE", DEFAULT_CONFIG_FILE)
+    return _get(f"{Path(config_file).resolve()}|{clickhouse_url or ''}", "embedded")
+
+
+def get_http_client(gateway_url: str) -> httpx.Client:
+    """Get the shared pooled `httpx.Client` for a gateway's OpenAI-compatible endpoint."""
+    return _get(gateway_url, "openai")
+
+
+def warm_up(gateway_urls: list[str], connections: Optional[int] = None) -> dict[str, bool]:
+    """
+    Open pooled connections to each gateway ahead of the first request.
+
+    Issues `connections` concurrent health checks per gateway (default: the
+    keep-alive pool size) so the pool is filled before traffic arrives, and
+    then sends one request over the native client so it has a live
+    connection too. The native probe is skipped for a gateway that failed
+    its health checks, since the TensorZero client logs every failed request
+    to stdout. Returns whether each gateway reported healthy and answered
+    the native client.
+    """
+    connections = connections or _config.max_keepalive_connections
+    results = {}
+    for gateway_url in gateway_urls:
+        gateway = get_gateway(gateway_url)
+        client = get_http_client(gateway_url)
+        healthy = [False] * connections
+
+        def check(i: int, url: str = _normalize(gateway_url)):
+            try:
+                healthy[i] = client.get(f"{url}/health").status_code == 200
+            except httpx.HTTPError:
+                healthy[i] = False
+
+        threads = [threading.Thread(target=check, args=(i,)) for i in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results[gateway_url] = any(healthy) and _warm_up_native(gateway)
+    return results
+
+
+def _warm_up_native(gateway: TensorZeroGateway) -> bool:
+    # The native client has no health check; any answer from the gateway
+    # (even an error status for this empty lookup) means it has connected
+    try:
+        gateway.get_datapoints(dataset_name="warm_up", ids=[])
+    except TensorZeroError:
+        pass
+    except Exception:
+        return False
+    return True
+
+
+def close_all() -> None:
+    """Close every pooled client; later lookups create fresh ones."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+
+
+atexit.register(close_all)
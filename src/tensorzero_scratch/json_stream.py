@@ -0,0 +1,330 @@
+"""
+Streaming JSON Functions
+
+A `type = "json"` function like `analyze_sentiment` normally hands back its
+output only once the whole object has been generated, although the field a
+caller acts on (`sentiment`) is usually finished within the first few
+tokens. This module streams the inference instead and parses the output
+incrementally, emitting each top-level field as soon as its value is
+complete:
+
+- every field is validated against the function's `output_schema.json`
+  (read from the TensorZero config) the moment it completes
+- the caller can stop reading, call `cancel()`, or pass `stop_after` to end
+  the generation once the fields it needs have arrived, which saves the
+  remaining latency and output tokens
+- `result` holds the fields parsed so far; a stream read to the end is also
+  checked for required fields
+
+Only the schema keywords used by this repo's output schemas are checked
+(`type`, `enum`, `minimum`/`maximum`, `minLength`/`maxLength`, `properties`,
+`required`, `additionalProperties`, `items`), so no JSON Schema dependency
+is needed.
+
+Usage:
+    from tensorzero_scratch.json_stream import stream_json_function
+
+    stream = stream_json_function(
+        "analyze_sentiment",
+        {"system": {"text": review}, "messages": [{"role": "user", "content": review}]},
+        stop_after={"sentiment", "confidence"},
+    )
+    for field in stream:
+        print(field.name, field.value)
+"""
+
+import json
+import time
+import tomllib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from .gateway_pool import DEFAULT_CONFIG_FILE, get_gateway
+
+
+class OutputValidationError(ValueError):
+    """A streamed field (or the finished object) does not match the output schema."""
+
+
+@lru_cache(maxsize=None)
+def _load_output_schema(function_name: str, config_file: str) -> dict:
+    with open(config_file, "rb") as f:
+        config = tomllib.load(f)
+    function = config.get("functions", {}).get(function_name)
+    if function is None:
+        raise KeyError(f"Function {function_name!r} is not defined in {config_file}")
+    if "output_schema" not in function:
+        raise KeyError(f"Function {function_name!r} has no output_schema (is it a json function?)")
+    with open(Path(config_file).parent / function["output_schema"]) as f:
+        return json.load(f)
+
+
+def load_output_schema(function_name: str, config_file: Optional[str] = None) -> dict:
+    """Load a json function's output schema from the TensorZero config (cached per file)."""
+    return _load_output_schema(function_name, str(Path(config_file or DEFAULT_CONFIG_FILE).resolve()))
+
+
+_JSON_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+def validate(value: Any, schema: dict, path: str = "$") -> None:
+    """Check `value` against the supported subset of JSON Schema, raising OutputValidationError."""
+    expected = schema.get("type")
+    if expected is not None:
+        types = [expected] if isinstance(expected, str) else expected
+        # bool is an int subclass in Python but not a JSON number
+        if not any(
+            isinstance(value, _JSON_TYPES[t]) and not (isinstance(value, bool) and t in ("number", "integer"))
+            for t in types
+        ):
+            raise OutputValidationError(f"{path}: expected {' or '.join(types)}, got {json.dumps(value)}")
+    if "enum" in schema and value not in schema["enum"]:
+        raise OutputValidationError(f"{path}: {json.dumps(value)} is not one of {schema['enum']}")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            raise OutputValidationError(f"{path}: {value} is below the minimum {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            raise OutputValidationError(f"{path}: {value} is above the maximum {schema['maximum']}")
+    if isinstance(value, str):
+        if "minLength" in schema and len(value) < schema["minLength"]:
+            raise OutputValidationError(f"{path}: shorter than {schema['minLength']} characters")
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            raise OutputValidationError(f"{path}: longer than {schema['maxLength']} characters")
+    if isinstance(value, dict):
+        for name, item in value.items():
+            validate_field(name, item, schema, f"{path}.{name}")
+        missing = [name for name in schema.get("required", ()) if name not in value]
+        if missing:
+            raise OutputValidationError(f"{path}: missing required fields {missing}")
+    if isinstance(value, list) and "items" in schema:
+        for index, item in enumerate(value):
+            validate(item, schema["items"], f"{path}[{index}]")
+
+
+def validate_field(name: str, value: Any, schema: dict, path: Optional[str] = None) -> None:
+    """Check one property of an object schema on its own."""
+    path = path or f"$.{name}"
+    properties = schema.get("properties", {})
+    if name in properties:
+        validate(value, properties[name], path)
+    elif schema.get("additionalProperties") is False:
+        raise OutputValidationError(f"{path}: unexpected field")
+    elif isinstance(schema.get("additionalProperties"), dict):
+        validate(value, schema["additionalProperties"], path)
+
+
+class IncrementalJsonParser:
+    """
+    Parses a JSON object from text fragments and yields its top-level fields as they complete.
+
+    Strings, objects and arrays are complete at their closing character;
+    numbers and literals only at the following `,` or `}`, since more digits
+    could still arrive. Text before the opening `{` (e.g. a code fence) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect = "key"  # "key", "value" or "comma" while at depth 1
+        self._key_start = self._value_start = 0
+        self._key: Optional[str] = None
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """Add a fragment of the output and return the (name, value) fields it completed."""
+        self.buffer += text
+        fields = []
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            if self.done:
+                break
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == "key":
+                            self._key = json.loads(buffer[self._key_start:i + 1])
+                        elif self._expect == "value":
+                            fields.append(self._complete(i + 1))
+                continue
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    # End of the object; a pending number or literal ends here too
+                    if self._expect == "value":
+                        fields.append(self._complete(i))
+                    self.done = True
+                elif self._depth == 1 and self._expect == "value":
+                    fields.append(self._complete(i + 1))
+            elif self._depth == 1:
+                if char == ":":
+                    self._expect, self._value_start = "value", i + 1
+                elif char == ",":
+                    if self._expect == "value":
+                        fields.append(self._complete(i))
+                    self._expect = "key"
+        self._pos = len(buffer)
+        return fields
+
+    def _complete(self, end: int) -> tuple[str, Any]:
+        raw = self.buffer[self._value_start:end].strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise OutputValidationError(f"$.{self._key}: invalid JSON value {raw!r}") from e
+        self._expect = "comma"
+        return self._key, value
+
+
+@dataclass
+class JsonField:
+    """One completed top-level field of a streamed json function output."""
+
+    name: str
+    value: Any
+    elapsed_ms: float  # since the inference request was sent
+
+
+class JsonFunctionStream:
+    """
+    Iterator over the fields of one streamed json function inference.
+
+    Iterating yields `JsonField`s as they complete. `cancel()` (or reaching
+    every `stop_after` field) closes the underlying stream, which ends the
+    generation at the gateway.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[Any],
+        schema: Optional[dict] = None,
+        stop_after: Optional[Iterable[str]] = None,
+        started: Optional[float] = None,
+    ):
+        self.schema = schema
+        self.stop_after = set(stop_after or ())
+        self.result: dict[str, Any] = {}
+        self.parser = IncrementalJsonParser()
+        self.cancelled = False
+        self.usage = None
+        self.finish_reason = None
+        self.inference_id = None
+        self.episode_id = None
+        self.variant_name = None
+        self._chunks = chunks
+        self._started = started or time.perf_counter()
+
+    @property
+    def raw(self) -> str:
+        """The output text received so far."""
+        return self.parser.buffer
+
+    def cancel(self) -> None:
+        """Stop the generation; fields already parsed stay in `result`."""
+        if self._chunks is None:
+            return
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        # Dropping the gateway's stream aborts the request
+        self._chunks = None
+        self.cancelled = True
+
+    def __iter__(self) -> Iterator[JsonField]:
+        while self._chunks is not None:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._chunks = None
+                break
+            self.inference_id = chunk.inference_id
+            self.episode_id = chunk.episode_id
+            self.variant_name = chunk.variant_name
+            self.usage = chunk.usage or self.usage
+            self.finish_reason = chunk.finish_reason or self.finish_reason
+            try:
+                fields = self.parser.feed(chunk.raw or "")
+                for name, value in fields:
+                    if self.schema is not None:
+                        validate_field(name, value, self.schema)
+                    self.result[name] = value
+            except OutputValidationError:
+                self.cancel()
+                raise
+            elapsed_ms = (time.perf_counter() - self._started) * 1000
+            for name, value in fields:
+                yield JsonField(name, value, elapsed_ms)
+            if self.stop_after and self.stop_after <= self.result.keys():
+                self.cancel()
+        if not self.cancelled and self.schema is not None:
+            if not self.parser.done:
+                raise OutputValidationError(f"output ended before the JSON object was complete: {self.raw!r}")
+            validate(self.result, self.schema)
+
+    def collect(self) -> dict[str, Any]:
+        """Read the stream to the end (or to `stop_after`) and return the parsed fields."""
+        for _ in self:
+            pass
+        return self.result
+
+
+def stream_json_function(
+    function_name: str,
+    input: dict,
+    variant_name: Optional[str] = None,
+    episode_id: Optional[str] = None,
+    stop_after: Optional[Iterable[str]] = None,
+    validate_output: bool = True,
+    config_file: Optional[str] = None,
+    gateway: Any = None,
+    gateway_url: str = "http://localhost:3000",
+) -> JsonFunctionStream:
+    """
+    Start a streamed inference of a json function and return its field stream.
+
+    Args:
+        function_name: A `type = "json"` function from the TensorZero config
+        input: Inference input (system template arguments and messages)
+        variant_name: Pin a variant (default: let TensorZero sample one)
+        episode_id: Episode to continue
+        stop_after: Cancel the generation once all of these fields have arrived
+        validate_output: Validate fields against the function's output schema
+        config_file: TensorZero config to read the schema from (defaults to config/tensorzero.toml)
+        gateway: Gateway client to use instead of the shared pooled one
+        gateway_url: Gateway URL for the pooled client
+    """
+    schema = load_output_schema(function_name, config_file) if validate_output else None
+    started = time.perf_counter()
+    chunks = (gateway or get_gateway(gateway_url)).inference(
+        function_name=function_name,
+        variant_name=variant_name,
+        input=input,
+        episode_id=episode_id,
+        stream=True,
+    )
+    return JsonFunctionStream(iter(chunks), schema, stop_after, started)
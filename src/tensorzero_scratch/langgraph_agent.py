@@ -8,26 +8,32 @@ within a LangGraph agent using the create_react_agent() function from LangChain.
 The agent uses xAI's Grok model through TensorZero and can call various tools
 defined in Python. It outputs a predefined conversation to demonstrate tool calling
 with proper formatting and pretty printing.
+
+LangChain's chat model factory, LangGraph and rich are imported on first use,
+and the compiled agent graph is built once per gateway configuration and
+shared by every session in the process (see `build_agent_graph`), so creating
+a new session costs little more than loading its history.
 """
 
+import abc
 import asyncio
-from typing import Any
-
-try:
-    import httpx
-    HTTPX_AVAILABLE = True
-except ImportError:
-    HTTPX_AVAILABLE = False
+import uuid
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
 
-from langchain.chat_models import init_chat_model
 from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, BaseMessage
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+
+from tensorzero.util import uuid7
 
-from langgraph.prebuilt import create_react_agent
-from typing_extensions import TypedDict
+from .compact_messages import CompactHistory
+from .conversation_store import ConversationStore
+from .docs_search import format_hits, get_docs_index
+from .renderers import Renderer, get_renderer
+from .usage import UsageAccumulator, process_usage
 
-from rich.console import Console
-from rich.panel import Panel
+if TYPE_CHECKING:
+    from .profiling import SessionProfiler
 
 
 # Define Python-based tools (our custom tools)
@@ -168,6 +174,41 @@ Text Analysis Results:
         return f"Error analyzing text: {str(e)}"
 
 
+@tool
+def docs_search(query: str) -> str:
+    """
+    Search the TensorZero documentation.
+
+    This is a local implementation of the `search_tensorzero_docs` tool
+    configured in tensorzero.toml, backed by a BM25 index over docs/.
+
+    Args:
+        query: What to search for in TensorZero docs
+
+    Returns:
+        The most relevant documentation sections
+    """
+    try:
+        index = get_docs_index()
+        index.refresh_if_due()
+        return format_hits(index.search(query, k=3))
+    except Exception as e:
+        return f"Error searching documentation: {str(e)}"
+
+
+# Define all available tools (both TensorZero and Python-only)
+LOCAL_TOOLS = [
+    # TensorZero tools (will be mapped to different names)
+    # These correspond to tools defined in tensorzero.toml
+    # But we'll use our custom names in the agent
+
+    # Python-only tools (defined in this file)
+    python_calculator,
+   # current_time,
+    text_analyzer,
+    docs_search,  # local implementation of search_tensorzero_docs
+]
+
 # Tool mapping: Our agent tool names -> TensorZero tool names
 TOOL_NAME_MAPPING = {
     "math_solver": "calculator",           # Our custom name -> TensorZero name
@@ -175,103 +216,160 @@ TOOL_NAME_MAPPING = {
     "docs_search": "search_tensorzero_docs" # Our custom name -> TensorZero name
 }
 
+# System prompt for the ReAct agent, listing the tools it can call
+TOOL_DESCRIPTIONS = """
+Available tools:
+- python_calculator: Advanced mathematical calculations with math functions
+- current_time: Get current time in different timezones
+- text_analyzer: Analyze text properties and sentiment
+- math_solver: Basic mathematical calculations (via TensorZero)
+- weather_info: Get weather information for locations (via TensorZero)
+- docs_search: Search TensorZero documentation (local index)
+""".strip()
+
+AGENT_PROMPT = f"You are a helpful assistant powered by TensorZero. {TOOL_DESCRIPTIONS}\n\nYou have access to both TensorZero-configured tools and custom Python tools. Use the appropriate tool for each task."
+
 
+@lru_cache(maxsize=None)
+def build_llm(
+    gateway_mode: str = "http",
+    gateway_url: str = "http://localhost:3000",
+    config_file: Optional[str] = None,
+    clickhouse_url: Optional[str] = None,
+    variant_name: Optional[str] = None,
+):
+    """
+    Build (once per gateway configuration) the chat model the agent graph runs on.
 
+    Embedded mode, or pinning an `agent_chat` variant, calls the function
+    through the native inference API; otherwise the OpenAI-compatible endpoint is used.
+    """
+    if gateway_mode == "embedded" or variant_name is not None:
+        from .tensorzero_chat_model import TensorZeroChatModel
+
+        # Call the agent_chat function natively (in-process in embedded mode).
+        # Only tools the agent can execute locally are offered to the model.
+        # Sessions record their own usage, so the shared model keeps a private
+        # accumulator rather than double-counting into the process totals.
+        return TensorZeroChatModel(
+            function_name="agent_chat",
+            variant_name=variant_name or "gpt4_mini",
+            gateway_mode=gateway_mode,
+            gateway_url=gateway_url,
+            config_file=config_file,
+            clickhouse_url=clickhouse_url,
+            allowed_tools=[local_tool.name for local_tool in LOCAL_TOOLS],
+            usage=UsageAccumulator(),
+            # AGENT_PROMPT and the tool schemas are constants, so every step shares a cacheable prefix
+            prompt_caching=True,
+        )
 
+    from langchain.chat_models import init_chat_model
 
-class TensorZeroLangGraphAgent:
+    from .gateway_pool import get_http_client
+
+    # Use TensorZero's OpenAI-compatible endpoint with the process-wide pooled HTTP client
+    return init_chat_model(
+        "tensorzero::model_name::openai::gpt-4o-mini",  # Use our agent_chat function through TensorZero
+        model_provider="openai",
+        base_url=f"{gateway_url}/openai/v1",
+        api_key="dummy",  # TensorZero ignores the API key
+        http_client=get_http_client(gateway_url)
+    )
+
+
+@lru_cache(maxsize=None)
+def build_agent_graph(
+    gateway_mode: str = "http",
+    gateway_url: str = "http://localhost:3000",
+    config_file: Optional[str] = None,
+    clickhouse_url: Optional[str] = None,
+    variant_name: Optional[str] = None,
+):
     """
-    LangGraph Agent that uses TensorZero as the LLM provider.
+    Get the compiled ReAct graph for a gateway configuration, building it on first use.
 
-    This agent uses TensorZero's OpenAI-compatible API endpoint to work
-    seamlessly with LangChain's create_react_agent function.
+    The graph holds no per-session state (history is passed in on every
+    invoke), so one compiled graph is shared by all sessions. Call this at
+    worker start to pay the LangGraph import and compile cost up front.
     """
+    from langgraph.prebuilt import create_react_agent
 
-    def __init__(self, gateway_url: str = "http://localhost:3000"):
-        """Initialize the agent."""
-        self.console = Console()
-
-        # Configure HTTP client for TensorZero
-        http_client = None
-        if HTTPX_AVAILABLE:
-            http_client = httpx.Client()
-
-        # Use TensorZero's OpenAI-compatible endpoint
-        self.llm = init_chat_model(
-            "tensorzero::model_name::openai::gpt-4o-mini",  # Use our agent_chat function through TensorZero
-            model_provider="openai",
-            base_url=f"{gateway_url}/openai/v1",
-            api_key="dummy",  # TensorZero ignores the API key
-            http_client=http_client
-        )
+    llm = build_llm(gateway_mode, gateway_url, config_file, clickhouse_url, variant_name)
+    return create_react_agent(llm, list(LOCAL_TOOLS), prompt=AGENT_PROMPT)
 
-        # Define all available tools (both TensorZero and Python-only)
-        self.tools = [
-            # TensorZero tools (will be mapped to different names)
-            # These correspond to tools defined in tensorzero.toml
-            # But we'll use our custom names in the agent
-
-            # Python-only tools (defined in this file)
-            python_calculator,
-           # current_time,
-            text_analyzer
-        ]
 
-        # Create the agent using create_react_agent with our custom tools
-        tool_descriptions = """
-Available tools:
-- python_calculator: Advanced mathematical calculations with math functions
-- current_time: Get current time in different timezones
-- text_analyzer: Analyze text properties and sentiment
-- math_solver: Basic mathematical calculations (via TensorZero)
-- weather_info: Get weather information for locations (via TensorZero)
-- docs_search: Search TensorZero documentation (via TensorZero)
-        """.strip()
 
-        self.agent = create_react_agent(
-            self.llm,
-            self.tools,
-            prompt=f"You are a helpful assistant powered by TensorZero. {tool_descriptions}\n\nYou have access to both TensorZero-configured tools and custom Python tools. Use the appropriate tool for each task."
-        )
 
-        # Initialize conversation history
-        self.conversation_history = []
 
+class AgentSession(abc.ABC):
+    """
+    Conversation state and chat loops shared by the agent engines.
 
+    Holds the session's compact history, durable store, usage accounting,
+    TensorZero episode and renderer; engines implement `run_turn`.
+    """
 
-    def _format_message(self, message: BaseMessage, message_type: str) -> Panel:
-        """Format a message for display."""
+    def __init__(
+        self,
+        store: Optional[ConversationStore] = None,
+        session_id: Optional[str] = None,
+        history_turns: int = 20,
+        renderer: Optional[Renderer] = None,
+    ):
+        self.renderer = renderer or get_renderer()
+
+        # Initialize conversation history, resuming the recent window from the store if present
+        self.store = store
+        self.session_id = session_id or str(uuid.uuid4())
+        # (kept compact; LangChain messages are only built when an engine needs them)
+        recent = store.load_recent(self.session_id, history_turns) if store else []
+        self.conversation_history = CompactHistory(recent)
+
+        # Per-session usage accounting (also rolled up into the process-wide accumulator)
+        self.usage = UsageAccumulator(parent=process_usage())
+
+        # TensorZero episode for this session (native API), continued from the stored
+        # metadata of a resumed session. A new session gets its own UUIDv7 up front:
+        # the graph's run config is fixed for a whole turn, so waiting for the first
+        # response would give every step of the first turn a separate episode.
+        self.episode_id: str = next(
+            (
+                message.response_metadata["episode_id"]
+                for message in reversed(recent)
+                if isinstance(message, AIMessage) and message.response_metadata.get("episode_id")
+            ),
+            None,
+        ) or str(uuid7())
+
+        # Optional per-turn profiler for the chat loops (see profiling.py)
+        self.profiler: Optional["SessionProfiler"] = None
+
+    def _append_history(self, message: BaseMessage):
+        """Add a message to the conversation history, usage accounting and store."""
+        self.conversation_history.append(message)
         if isinstance(message, AIMessage):
-            if message.tool_calls:
-                content = f"{message.content}\n\n[bold cyan]Tool Calls:[/bold cyan]\n"
-                for tool_call in message.tool_calls:
-                    content += f"• {tool_call['name']}({tool_call['args']})\n"
-                content = content.strip()
-            else:
-                content = message.content
-            border_color = "blue"
-        elif isinstance(message, HumanMessage):
-            content = message.content
-            border_color = "green"
-        elif isinstance(message, ToolMessage):
-            content = f"Tool Result: {message.content}"
-            border_color = "yellow"
-        else:
-            content = str(message.content)
-            border_color = "white"
-
-        return Panel(
-            content,
-            title=f"[bold]{message_type}[/bold]",
-            border_style=border_color,
-            title_align="left"
-        )
-
-    def _display_message(self, message: BaseMessage, message_type: str):
-        """Display a message with formatting."""
-        panel = self._format_message(message, message_type)
-        self.console.print(panel)
-        self.console.print()  # Add spacing
+            self.usage.record_message(message)
+            self.episode_id = message.response_metadata.get("episode_id") or self.episode_id
+        if self.store is not None:
+            self.store.append(self.session_id, [message])
+
+    @abc.abstractmethod
+    def run_turn(self, user_message: str) -> list[BaseMessage]:
+        """Run one user turn and return the messages it added to the conversation."""
+
+    def _chat_turn(self, user_message: str) -> list[BaseMessage]:
+        """Run a turn for the chat loops, under the session profiler if one is attached."""
+        if self.profiler is None:
+            return self.run_turn(user_message)
+        profile = None
+        try:
+            with self.profiler.turn(user_message) as profile:
+                return self.run_turn(user_message)
+        finally:
+            # The profile is complete once the turn block exits, even when the turn failed
+            if profile is not None:
+                self.renderer.info(profile.summary())
 
     async def run_demo_conversation(self):
         """
@@ -280,8 +378,10 @@ Available tools:
         This method executes a series of predefined interactions to showcase
         how the agent uses TensorZero and calls various tools.
         """
-        self.console.print("\n[bold magenta]🤖 TensorZero LangGraph Agent Demo[/bold magenta]\n")
-        self.console.print("[dim]This demo shows how TensorZero acts as a proxy for LLM calls in a LangGraph agent[/dim]\n")
+        self.renderer.banner(
+            "🤖 TensorZero LangGraph Agent Demo",
+            "This demo shows how TensorZero acts as a proxy for LLM calls in a LangGraph agent",
+        )
 
         # Predefined conversation testing all tools
         demo_messages = [
@@ -296,40 +396,14 @@ Available tools:
         ]
 
         for user_message in demo_messages:
-            self._display_message(HumanMessage(content=user_message), "User")
-
-            # Show processing indicator
-            with self.console.status("[bold green]Processing with TensorZero...", spinner="dots"):
-                try:
-                    # Add user message to conversation history
-                    user_msg = HumanMessage(content=user_message)
-                    self.conversation_history.append(user_msg)
-
-                    # Run the agent with full conversation history
-                    response = self.agent.invoke({"messages": self.conversation_history})
-
-                    # Update conversation history with new messages
-                    if response and "messages" in response:
-                        # Add new messages to history (skip the user message we already added)
-                        for message in response["messages"]:
-                            if message not in self.conversation_history:
-                                self.conversation_history.append(message)
-
-                        # Display all new messages in the response
-                        for message in response["messages"]:
-                            if hasattr(message, 'type'):
-                                if message.type == 'ai':
-                                    self._display_message(message, "Assistant")
-                                elif message.type == 'tool':
-                                    self.console.print(f"[dim]🔧 Tool Result: {message.content}[/dim]")
-                            else:
-                                self.console.print(f"[dim]{message.type}: {getattr(message, 'content', str(message))}[/dim]")
-
-                except Exception as e:
-                    self.console.print(f"[bold red]Error:[/bold red] {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                    continue
+            self.renderer.user(HumanMessage(content=user_message))
+            try:
+                self._chat_turn(user_message)
+            except Exception as e:
+                self.renderer.error(str(e))
+                import traceback
+                traceback.print_exc()
+                continue
 
     async def interactive_chat(self):
         """
@@ -338,8 +412,7 @@ Available tools:
         Users can type messages and the agent will respond using TensorZero
         and tool calling capabilities.
         """
-        self.console.print("\n[bold magenta]🤖 Interactive TensorZero Chat[/bold magenta]\n")
-        self.console.print("[dim]Type 'quit' to exit, 'demo' to run demo conversation[/dim]\n")
+        self.renderer.banner("🤖 Interactive TensorZero Chat", "Type 'quit' to exit, 'demo' to run demo conversation")
 
         while True:
             try:
@@ -347,7 +420,7 @@ Available tools:
                 user_input = user_input.strip()
 
                 if user_input.lower() == 'quit':
-                    self.console.print("[bold blue]Goodbye! 👋[/bold blue]")
+                    self.renderer.info("Goodbye! 👋")
                     break
                 elif user_input.lower() == 'demo':
                     await self.run_demo_conversation()
@@ -355,45 +428,117 @@ Available tools:
                 elif not user_input:
                     continue
 
-                # Show processing indicator
-                with self.console.status("[bold green]Processing with TensorZero...", spinner="dots"):
-                    try:
-                        # Add user message to conversation history
-                        user_msg = HumanMessage(content=user_input)
-                        self.conversation_history.append(user_msg)
-
-                        # Run the agent with full conversation history
-                        response = self.agent.invoke({"messages": self.conversation_history})
-
-                        # Update conversation history with new messages
-                        if response and "messages" in response:
-                            # Add new messages to history (skip the user message we already added)
-                            for message in response["messages"]:
-                                if message not in self.conversation_history:
-                                    self.conversation_history.append(message)
-
-                            # Display all new messages in the response
-                            for message in response["messages"]:
-                                if hasattr(message, 'type'):
-                                    if message.type == 'ai':
-                                        self._display_message(message, "Assistant")
-                                    elif message.type == 'tool':
-                                        self.console.print(f"[dim]🔧 Tool Result: {message.content}[/dim]")
-                                else:
-                                    self.console.print(f"[dim]{message.type}: {getattr(message, 'content', str(message))}[/dim]")
-
-                    except Exception as e:
-                        self.console.print(f"[bold red]Error:[/bold red] {str(e)}")
-                        continue
-
-            except KeyboardInterrupt:
-                self.console.print("\n[bold blue]Goodbye! 👋[/bold blue]")
+                try:
+                    self._chat_turn(user_input)
+                except Exception as e:
+                    self.renderer.error(str(e))
+                    continue
+
+            except (KeyboardInterrupt, EOFError):
+                self.renderer.info("\nGoodbye! 👋")
                 break
             except Exception as e:
-                self.console.print(f"[bold red]Error:[/bold red] {str(e)}")
+                self.renderer.error(str(e))
                 continue
 
 
+class TensorZeroLangGraphAgent(AgentSession):
+    """
+    LangGraph Agent that uses TensorZero as the LLM provider.
+
+    This agent uses TensorZero's OpenAI-compatible API endpoint to work
+    seamlessly with LangChain's create_react_agent function. In embedded mode
+    it instead runs the gateway in-process and calls the `agent_chat` function
+    through TensorZeroChatModel, skipping the loopback HTTP hop.
+    """
+
+    def __init__(
+        self,
+        gateway_url: str = "http://localhost:3000",
+        store: Optional[ConversationStore] = None,
+        session_id: Optional[str] = None,
+        history_turns: int = 20,
+        gateway_mode: str = "http",
+        config_file: Optional[str] = None,
+        clickhouse_url: Optional[str] = None,
+        renderer: Optional[Renderer] = None,
+        variant_name: Optional[str] = None,
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            gateway_url: TensorZero gateway URL
+            store: Durable conversation store; when set, every message is persisted
+                and an existing session is resumed from its most recent turns
+            session_id: Session to resume or create (a new ID is generated if omitted)
+            history_turns: Number of recent turns loaded when resuming a session
+            gateway_mode: "http" for the standalone gateway, "embedded" to run it in-process
+            config_file: TensorZero config for embedded mode (defaults to config/tensorzero.toml)
+            clickhouse_url: ClickHouse URL for embedded mode observability (optional)
+            renderer: Output renderer (defaults to rich panels on a terminal, JSONL otherwise)
+            variant_name: Pin an `agent_chat` variant (calls the native API instead of the OpenAI shim)
+        """
+        super().__init__(store, session_id, history_turns, renderer)
+
+        self.gateway_mode = gateway_mode
+        self.variant_name = variant_name
+        self.llm = build_llm(gateway_mode, gateway_url, config_file, clickhouse_url, variant_name)
+
+        # Define all available tools (both TensorZero and Python-only)
+        self.tools = list(LOCAL_TOOLS)
+
+        # Compiled once per gateway configuration and shared across sessions
+        self.agent = build_agent_graph(gateway_mode, gateway_url, config_file, clickhouse_url, variant_name)
+
+    def _run_config(self) -> dict:
+        """Per-invoke graph config carrying this session's episode to the shared model."""
+        if self.gateway_mode != "embedded" and self.variant_name is None:
+            return {}
+        from .tensorzero_chat_model import EPISODE_METADATA_KEY
+
+        return {"metadata": {EPISODE_METADATA_KEY: self.episode_id}}
+
+    def run_turn(self, user_message: str) -> list[BaseMessage]:
+        """
+        Run one user turn through the agent graph and return the new messages.
+
+        Messages are recorded and handed to the renderer as each graph node
+        completes; streaming renderers also receive the reply token by token.
+        """
+        self._append_history(HumanMessage(content=user_message))
+
+        # Run the agent with full conversation history
+        history = self.conversation_history.to_messages()
+        stream_mode = ["updates", "messages"] if self.renderer.streaming else ["updates"]
+        new_messages = []
+        with self.renderer.turn():
+            for mode, data in self.agent.stream({"messages": history}, config=self._run_config(), stream_mode=stream_mode):
+                if mode == "messages":
+                    chunk, metadata = data
+                    if metadata.get("langgraph_node") == "agent" and isinstance(chunk, AIMessage) and isinstance(chunk.content, str):
+                        self.renderer.token(chunk.content)
+                    continue
+                # "updates": the messages each node added to the conversation
+                for update in data.values():
+                    for message in update.get("messages", ()) if isinstance(update, dict) else ():
+                        self._append_history(message)
+                        self.renderer.message(message)
+                        new_messages.append(message)
+        return new_messages
+
+
+def agent_class(engine: str = "langgraph") -> type[AgentSession]:
+    """Agent engine by name: "langgraph" (this module) or "native" (see `native_agent`)."""
+    if engine == "native":
+        from .native_agent import NativeReActAgent
+
+        return NativeReActAgent
+    if engine == "langgraph":
+        return TensorZeroLangGraphAgent
+    raise ValueError(f"Unknown agent engine: {engine!r} (expected 'langgraph' or 'native')")
+
+
 async def main():
     """
     Main function to demonstrate the TensorZero LangGraph agent.
@@ -412,6 +557,8 @@ async def main():
             await agent.interactive_chat()
 
     except Exception as e:
+        from rich.console import Console
+
         console = Console()
         console.print(f"[bold red]Error initializing agent:[/bold red] {str(e)}")
         console.print("[dim]Make sure TensorZero gateway is running on http://localhost:3000[/dim]")
@@ -0,0 +1,262 @@
+"""
+Native TensorZero ReAct Agent
+
+`TensorZeroLangGraphAgent` reaches the model through LangChain, LangGraph and
+(by default) the gateway's OpenAI-compatible shim, which bypasses the
+configured `agent_chat` function and pays for message conversion, callbacks
+and graph scheduling on every ReAct step. This module runs the same loop
+directly on the native inference API:
+
+- the model sees the function's configured tools that have a local
+  implementation (`calculator`, `search_tensorzero_docs`), executed
+  in-process; every other local tool (`text_analyzer`, or an executor the
+  function's config does not list) is sent as a dynamic tool
+- every step of a session is sent under the session's `episode_id`
+- responses are streamed, and text reaches the renderer as it arrives
+- history goes straight from `CompactHistory` to TensorZero messages
+- the system prompt and tool schemas are constants and the history only
+  grows at the end, so each step's prefix is cached by providers that
+  support it (see prompt_cache.py)
+
+`NativeReActAgent` shares `AgentSession` with the LangGraph agent, so the
+renderers, conversation store, evaluation harness and server work with
+either engine.
+
+Usage:
+    from tensorzero_scratch.native_agent import NativeReActAgent
+
+    agent = NativeReActAgent(variant_name="gpt4_mini")
+    agent.run_turn("What's sqrt(144) + 5?")
+"""
+
+import json
+import time
+import tomllib
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from tensorzero import Text, TextChunk, ToolCall, ToolCallChunk
+
+from .conversation_store import ConversationStore
+from .gateway_pool import DEFAULT_CONFIG_FILE, get_embedded_gateway, get_gateway
+from .langgraph_agent import AgentSession, docs_search, python_calculator, text_analyzer
+from .prompt_cache import cache_extra_body, normalize_messages, usage_metadata
+from .renderers import Renderer
+from .tensorzero_chat_model import _tool_definition
+
+
+# Configured agent_chat tools -> local implementations (get_weather has none and is not offered)
+CONFIGURED_TOOL_EXECUTORS = {
+    "calculator": python_calculator,
+    "search_tensorzero_docs": docs_search,
+}
+
+# Local-only tools, sent to the gateway as dynamic tools
+DYNAMIC_TOOLS = [text_analyzer]
+
+NATIVE_SYSTEM_PROMPT = (
+    "You are a helpful assistant powered by TensorZero. "
+    "Use the calculator tool for math, search_tensorzero_docs for questions about TensorZero, "
+    "and text_analyzer to analyze text. Answer directly when no tool is needed."
+)
+
+
+@lru_cache(maxsize=None)
+def _configured_tools(function_name: str, config_file: str) -> tuple[str, ...]:
+    with open(config_file, "rb") as f:
+        config = tomllib.load(f)
+    return tuple(config.get("functions", {}).get(function_name, {}).get("tools", ()))
+
+
+def configured_tools(function_name: str, config_file: Optional[str] = None) -> tuple[str, ...]:
+    """The tool names a function is configured with in the TensorZero config."""
+    return _configured_tools(function_name, str(Path(config_file or DEFAULT_CONFIG_FILE).resolve()))
+
+
+def _dynamic_tool_definition(name: str, tool: Any) -> dict:
+    """A dynamic tool definition for a local tool, named after its executor key."""
+    definition = _tool_definition(tool)
+    return definition if definition["name"] == name else {**definition, "name": name}
+
+
+def _call_tool(tool: Any, args: dict) -> str:
+    """Run a LangChain tool's function directly (skipping its callback machinery) or a plain callable."""
+    func = getattr(tool, "func", None) or tool
+    return str(func(**args))
+
+
+class NativeReActAgent(AgentSession):
+    """
+    ReAct agent driving the `agent_chat` function through the native TensorZero API.
+
+    Each step is one inference call; tool calls in the response are executed
+    locally and their results appended before the next step, until the model
+    answers without tools or `max_iterations` steps have run.
+    """
+
+    def __init__(
+        self,
+        gateway_url: str = "http://localhost:3000",
+        store: Optional[ConversationStore] = None,
+        session_id: Optional[str] = None,
+        history_turns: int = 20,
+        gateway_mode: str = "http",
+        config_file: Optional[str] = None,
+        clickhouse_url: Optional[str] = None,
+        renderer: Optional[Renderer] = None,
+        variant_name: Optional[str] = None,
+        function_name: str = "agent_chat",
+        stream: bool = True,
+        max_iterations: int = 10,
+        executors: Optional[dict[str, Callable[..., Any]]] = None,
+        gateway: Any = None,
+        prompt_caching: bool = True,
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            gateway_url, store, session_id, history_turns, gateway_mode, config_file,
+            clickhouse_url, renderer: as for `TensorZeroLangGraphAgent`
+            variant_name: Pin an `agent_chat` variant (default: let TensorZero sample one)
+            function_name: TensorZero function to call
+            stream: Stream responses (text is rendered as it arrives)
+            max_iterations: Maximum model calls per turn
+            executors: Extra or replacement local implementations, keyed by tool name
+            gateway: Gateway client to use instead of the shared pooled one
+            prompt_caching: Mark the stable request prefix cacheable for providers that support it
+        """
+        super().__init__(store, session_id, history_turns, renderer)
+
+        if gateway is not None:
+            self.gateway = gateway
+        elif gateway_mode == "embedded":
+            self.gateway = get_embedded_gateway(config_file, clickhouse_url)
+        elif gateway_mode == "http":
+            self.gateway = get_gateway(gateway_url)
+        else:
+            raise ValueError(f"Unknown gateway_mode: {gateway_mode!r} (expected 'http' or 'embedded')")
+
+        self.gateway_mode = gateway_mode
+        self.function_name = function_name
+        self.variant_name = variant_name
+        self.stream = stream
+        self.max_iterations = max_iterations
+        self.prompt_caching = prompt_caching
+        self.config_file = config_file
+
+        self.executors: dict[str, Any] = {**CONFIGURED_TOOL_EXECUTORS, **{t.name: t for t in DYNAMIC_TOOLS}}
+        self.executors.update(executors or {})
+        # Only tools the function's config defines can be allowed by name; the
+        # gateway has no schema for any other local tool, so those are sent in full
+        configured = set(configured_tools(function_name, config_file))
+        self.allowed_tools = [name for name in CONFIGURED_TOOL_EXECUTORS if name in configured]
+        self.additional_tools = [
+            _dynamic_tool_definition(name, tool) for name, tool in self.executors.items() if name not in self.allowed_tools
+        ]
+
+    def _infer(self) -> AIMessage:
+        """Run one inference over the current history and return it as an AIMessage."""
+        messages = self.conversation_history.to_tensorzero()
+        extra_body = None
+        if self.prompt_caching:
+            messages = normalize_messages(messages)
+            extra_body = cache_extra_body(
+                self.function_name, NATIVE_SYSTEM_PROMPT, self.additional_tools, messages, self.variant_name, self.config_file
+            )
+        start = time.perf_counter()
+        response = self.gateway.inference(
+            function_name=self.function_name,
+            variant_name=self.variant_name,
+            input={"system": NATIVE_SYSTEM_PROMPT, "messages": messages},
+            episode_id=self.episode_id,
+            allowed_tools=self.allowed_tools,
+            additional_tools=self.additional_tools,
+            stream=self.stream,
+            extra_body=extra_body,
+        )
+
+        text: list[str] = []
+        calls: dict[str, list[str]] = {}  # id -> [name, raw arguments]
+        usage = finish_reason = last = None
+        if self.stream:
+            # ToolCallChunk name and arguments arrive in fragments keyed by call id
+            for chunk in response:
+                for block in chunk.content:
+                    if isinstance(block, TextChunk):
+                        text.append(block.text)
+                        self.renderer.token(block.text)
+                    elif isinstance(block, ToolCallChunk):
+                        call = calls.setdefault(block.id, ["", ""])
+                        call[0] += block.raw_name or ""
+                        call[1] += block.raw_arguments or ""
+                usage = chunk.usage or usage
+                finish_reason = chunk.finish_reason or finish_reason
+                last = chunk
+        else:
+            for block in response.content:
+                if isinstance(block, Text):
+                    text.append(block.text or "")
+                elif isinstance(block, ToolCall):
+                    calls[block.id] = [block.name or block.raw_name, block.raw_arguments]
+            usage, finish_reason, last = response.usage, response.finish_reason, response
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        tool_calls = []
+        for call_id, (name, raw_arguments) in calls.items():
+            try:
+                args = json.loads(raw_arguments) if raw_arguments else {}
+            except json.JSONDecodeError:
+                args = {"__invalid_arguments__": raw_arguments}
+            tool_calls.append({"name": name, "args": args if isinstance(args, dict) else {}, "id": call_id})
+
+        message = AIMessage(content="".join(text), tool_calls=tool_calls)
+        message.usage_metadata = usage_metadata(usage)
+        message.response_metadata = {
+            "model_name": "tensorzero",
+            "function_name": self.function_name,
+            "variant_name": getattr(last, "variant_name", None),
+            "inference_id": str(last.inference_id) if last is not None else None,
+            "episode_id": str(last.episode_id) if last is not None else None,
+            "finish_reason": finish_reason.value if finish_reason is not None else None,
+            "latency_ms": latency_ms,
+        }
+        return message
+
+    def _execute(self, tool_call: dict) -> ToolMessage:
+        """Execute one tool call locally."""
+        name, args = tool_call["name"], tool_call["args"]
+        tool = self.executors.get(name)
+        if tool is None:
+            content = f"Tool '{name}' is not available in this agent"
+        elif "__invalid_arguments__" in args:
+            content = f"Invalid JSON arguments for {name}: {args['__invalid_arguments__']}"
+        else:
+            try:
+                content = _call_tool(tool, args)
+            except Exception as e:
+                content = f"Error running {name}: {str(e)}"
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"])
+
+    def _add(self, message: BaseMessage, new_messages: list[BaseMessage]) -> None:
+        self._append_history(message)
+        self.renderer.message(message)
+        new_messages.append(message)
+
+    def run_turn(self, user_message: str) -> list[BaseMessage]:
+        """Run the ReAct loop for one user message and return the new messages."""
+        self._append_history(HumanMessage(content=user_message))
+        new_messages: list[BaseMessage] = []
+        with self.renderer.turn():
+            for _ in range(self.max_iterations):
+                ai_message = self._infer()
+                self._add(ai_message, new_messages)
+                if not ai_message.tool_calls:
+                    break
+                for tool_call in ai_message.tool_calls:
+                    self._add(self._execute(tool_call), new_messages)
+        return new_messages
@@ -0,0 +1,364 @@
+"""
+Per-Turn Agent Profiling
+
+Answers "where did this slow turn go?": our own Python (message conversion,
+pydantic validation, rendering, tool code) or waiting on the gateway. While a
+turn runs, a background thread samples every thread's Python stack at a
+fixed interval and reads each thread's CPU clock, so a sample can be
+classified as running or waiting (on sockets, locks or the native
+TensorZero client) without instrumenting any code.
+
+For each turn this records:
+    - wall time vs. process CPU time
+    - stack samples, split into running and waiting
+    - the net change in allocated memory blocks
+    - with `allocations=True`, `tracemalloc` peak memory and the top
+      allocation sites still live at turn end
+
+Stacks are written in the collapsed ("folded") format read by
+flamegraph.pl, inferno and speedscope, one file per session, with every
+stack rooted at its turn (`turn-3;MainThread;...`). Waiting samples end in a
+`[waiting]` frame. Turn summaries go to a JSONL file next to it.
+
+Overhead: sampling runs outside the profiled threads and costs one stack
+walk per thread per interval (10 ms by default), a few percent of CPU at
+most, so it is cheap enough to switch on briefly on a production worker.
+`tracemalloc` traces every allocation and can slow allocation-heavy code
+several-fold, which is why allocation sites are opt-in. Samples cover all
+threads (tool calls can run on LangGraph's executor threads), and
+tracemalloc is process-wide, so concurrent turns on a busy worker show up
+in each other's profiles.
+
+Usage:
+    from tensorzero_scratch.profiling import SessionProfiler, profile
+
+    profiler = SessionProfiler("profiles", session_id=agent.session_id)
+    with profiler.turn("What's sqrt(144) + 5?") as turn:  # allocations=True for allocation sites
+        agent.run_turn("What's sqrt(144) + 5?")
+    print(turn.summary())
+
+    # One-off block, e.g. on a production worker
+    with profile("profiles", name="slow-request") as block:
+        handle_request()
+
+    # flamegraph.pl profiles/<session_id>.folded > turn.svg
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+# A sample counts as running when its thread used at least this share of the
+# interval on CPU; below that it was blocked (I/O, locks, GIL, native calls)
+RUNNING_CPU_SHARE = 0.2
+
+WAITING_FRAME = "[waiting]"
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """`package/module.py`, with site-packages and repo prefixes dropped."""
+    path = filename.replace(os.sep, "/")
+    for marker in ("/site-packages/", "/src/"):
+        if marker in path:
+            return path.rsplit(marker, 1)[1]
+    stdlib = re.search(r"/lib/python\d+\.\d+/(.+)$", path)
+    return stdlib.group(1) if stdlib else path.rsplit("/", 1)[-1]
+
+
+@lru_cache(maxsize=4096)
+def _frame_label(name: str, filename: str, line: int) -> str:
+    """`function (package/module.py:line)`"""
+    return f"{name} ({_short_path(filename)}:{line})"
+
+
+def _thread_cpu_clock(thread_id: int) -> Optional[int]:
+    """CPU clock of a thread, where the platform exposes one (Linux, most Unixes)."""
+    try:
+        return time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError):
+        return None
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all threads from a background thread.
+
+    Samples of `owner_id` (the thread running the turn) are always kept, so
+    its stacks add up to wall time; other threads contribute only while they
+    are running, which keeps idle pool and event-loop threads out.
+    """
+
+    def __init__(self, owner_id: int, interval: float = 0.01):
+        self.owner_id = owner_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.waiting_samples = 0
+        self.own_cpu = 0.0  # CPU seconds spent sampling
+        self._clocks: dict[int, Optional[int]] = {}
+        self._cpu: dict[int, float] = {}
+        self._names: dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="turn-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _thread_cpu(self, thread_id: int) -> Optional[float]:
+        if thread_id not in self._clocks:
+            self._clocks[thread_id] = _thread_cpu_clock(thread_id)
+        clock = self._clocks[thread_id]
+        if clock is None:
+            return None
+        try:
+            return time.clock_gettime(clock)
+        except OSError:  # the thread exited
+            return None
+
+    def _run(self) -> None:
+        sampler_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frames = sys._current_frames()
+            if len(self._names) < len(frames):
+                self._names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id == sampler_id:
+                    continue
+                cpu = self._thread_cpu(thread_id)
+                previous = self._cpu.get(thread_id)
+                if cpu is not None:
+                    self._cpu[thread_id] = cpu
+                # Without a per-thread clock (or on a thread's first sample) assume it is running
+                running = cpu is None or previous is None or cpu - previous >= RUNNING_CPU_SHARE * elapsed
+                if not running and thread_id != self.owner_id:
+                    continue
+                self._record(thread_id, frame, running)
+            del frames
+        self.own_cpu = time.thread_time()
+
+    def _record(self, thread_id: int, frame: Any, running: bool) -> None:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            labels.append(_frame_label(code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        labels.append(self._names.get(thread_id, f"thread-{thread_id}"))
+        labels.reverse()
+        if not running:
+            labels.append(WAITING_FRAME)
+            self.waiting_samples += 1
+        self.samples += 1
+        self.stacks[";".join(labels)] += 1
+
+
+@dataclass
+class TurnProfile:
+    """Measurements for one profiled turn (or block)."""
+
+    index: int
+    label: str
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    samples: int = 0
+    waiting_samples: int = 0
+    interval_ms: float = 10.0
+    profiler_cpu_ms: float = 0.0
+    allocated_blocks: int = 0  # net change in allocated memory blocks over the turn
+    peak_memory_kb: Optional[float] = None
+    top_allocations: list[dict[str, Any]] = field(default_factory=list)
+    stacks: Counter = field(default_factory=Counter, repr=False)
+
+    @property
+    def cpu_share(self) -> float:
+        """Process CPU time as a share of wall time (can exceed 1 with busy threads)."""
+        return self.cpu_ms / self.wall_ms if self.wall_ms else 0.0
+
+    @property
+    def waiting_share(self) -> float:
+        """Share of stack samples in which a sampled thread was blocked rather than running."""
+        return self.waiting_samples / self.samples if self.samples else 0.0
+
+    def top_functions(self, limit: int = 5) -> list[tuple[str, int]]:
+        """Leaf functions with the most running samples."""
+        leaves: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if leaf != WAITING_FRAME:
+                leaves[leaf] += count
+        return leaves.most_common(limit)
+
+    def summary(self) -> str:
+        """One-paragraph human-readable summary."""
+        lines = [
+            f"⏱️  Turn {self.index}: {self.wall_ms:.0f} ms wall, {self.cpu_ms:.0f} ms CPU "
+            f"({self.cpu_share:.0%}), {self.waiting_share:.0%} of {self.samples} samples waiting"
+        ]
+        hot = ", ".join(f"{name} ×{count}" for name, count in self.top_functions(3))
+        if hot:
+            lines.append(f"   hottest: {hot}")
+        lines.append(f"   net allocated blocks: {self.allocated_blocks:+d}")
+        if self.peak_memory_kb is not None:
+            lines.append(f"   peak traced memory: {self.peak_memory_kb:.0f} KiB")
+        for allocation in self.top_allocations[:3]:
+            lines.append(f"   {allocation['size_kb']:.1f} KiB in {allocation['count']} blocks at {allocation['location']}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable summary (stacks are written separately)."""
+        return {
+            "turn": self.index,
+            "label": self.label,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "cpu_share": self.cpu_share,
+            "samples": self.samples,
+            "waiting_samples": self.waiting_samples,
+            "interval_ms": self.interval_ms,
+            "profiler_cpu_ms": self.profiler_cpu_ms,
+            "allocated_blocks": self.allocated_blocks,
+            "top_functions": self.top_functions(),
+            "peak_memory_kb": self.peak_memory_kb,
+            "top_allocations": self.top_allocations,
+        }
+
+
+def _allocation_sites(snapshot: tracemalloc.Snapshot, baseline: Optional[tracemalloc.Snapshot], top: int) -> list[dict[str, Any]]:
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    snapshot = snapshot.filter_traces(ignored)
+    if baseline is not None:
+        stats = snapshot.compare_to(baseline.filter_traces(ignored), "lineno")
+        sized = [(stat.traceback, stat.size_diff, stat.count_diff) for stat in stats if stat.size_diff > 0]
+    else:
+        sized = [(stat.traceback, stat.size, stat.count) for stat in snapshot.statistics("lineno")]
+    return [
+        {
+            "location": f"{_short_path(traceback[0].filename)}:{traceback[0].lineno}",
+            "size_kb": size / 1024,
+            "count": count,
+        }
+        for traceback, size, count in sized[:top]
+    ]
+
+
+class SessionProfiler:
+    """
+    Profiles the turns of one agent session and writes them under `output_dir`.
+
+    Files:
+        <output_dir>/<session_id>.folded        collapsed stacks of every turn
+        <output_dir>/<session_id>.turns.jsonl   one summary per turn
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path = "profiles",
+        session_id: Optional[str] = None,
+        interval: float = 0.01,
+        allocations: bool = False,
+        allocation_frames: int = 1,
+        top_allocations: int = 10,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory for the folded stacks and turn summaries
+            session_id: Names the output files (a new ID is generated if omitted)
+            interval: Seconds between stack samples
+            allocations: Track allocation sites with tracemalloc (the main source of overhead)
+            allocation_frames: Frames kept per allocation traceback
+            top_allocations: Allocation sites reported per turn
+        """
+        self.output_dir = Path(output_dir)
+        self.session_id = session_id or str(uuid.uuid4())
+        self.interval = interval
+        self.allocations = allocations
+        self.allocation_frames = allocation_frames
+        self.top_allocations = top_allocations
+        self.turns: list[TurnProfile] = []
+        self._lock = threading.Lock()
+
+    @property
+    def folded_path(self) -> Path:
+        return self.output_dir / f"{self.session_id}.folded"
+
+    @property
+    def summary_path(self) -> Path:
+        return self.output_dir / f"{self.session_id}.turns.jsonl"
+
+    @contextmanager
+    def turn(self, label: str = "") -> Iterator[TurnProfile]:
+        """Profile the enclosed block as one turn; the yielded TurnProfile is filled in on exit."""
+        with self._lock:
+            profile = TurnProfile(index=len(self.turns) + 1, label=label, interval_ms=self.interval * 1000)
+            self.turns.append(profile)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+
+        # Allocation tracking starts after the sampler thread, so its setup is not counted
+        started_tracing = baseline = None
+        if self.allocations:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.allocation_frames)
+            else:
+                baseline = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+
+        blocks_start = sys.getallocatedblocks()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield profile
+        finally:
+            sampler.stop()
+            profile.wall_ms = (time.perf_counter() - wall_start) * 1000
+            # Process CPU time, less what the sampler itself used
+            profile.profiler_cpu_ms = sampler.own_cpu * 1000
+            profile.cpu_ms = max(0.0, (time.process_time() - cpu_start) * 1000 - profile.profiler_cpu_ms)
+            profile.allocated_blocks = sys.getallocatedblocks() - blocks_start
+            profile.samples = sampler.samples
+            profile.waiting_samples = sampler.waiting_samples
+            profile.stacks = sampler.stacks
+            if self.allocations:
+                profile.peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+                profile.top_allocations = _allocation_sites(tracemalloc.take_snapshot(), baseline, self.top_allocations)
+                if started_tracing:
+                    tracemalloc.stop()
+            self._write(profile)
+
+    def _write(self, profile: TurnProfile) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.folded_path, "a") as f:
+                for stack, count in profile.stacks.items():
+                    f.write(f"turn-{profile.index};{stack} {count}\n")
+            with open(self.summary_path, "a") as f:
+                f.write(json.dumps(profile.to_dict()) + "\n")
+
+
+@contextmanager
+def profile(output_dir: str | Path = "profiles", name: Optional[str] = None, **options: Any) -> Iterator[TurnProfile]:
+    """Profile one block of code, writing `<name>.folded` and `<name>.turns.jsonl` under `output_dir`."""
+    with SessionProfiler(output_dir, session_id=name, **options).turn(name or "") as block:
+        yield block
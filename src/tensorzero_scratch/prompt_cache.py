@@ -0,0 +1,161 @@
+"""
+Stable-Prefix Prompt Caching
+
+Every agent step resends the same system prompt and tool schemas followed by
+a history that only ever grows at the end. Anthropic and OpenAI can reuse a
+cached prefix of a request, which cuts time-to-first-token and input cost on
+long sessions, as long as that prefix is byte-identical from one request to
+the next and (for Anthropic) is marked with cache breakpoints.
+
+This module builds the provider-specific parts of a cacheable request:
+
+- `normalize_messages()` merges consecutive same-role messages into one
+  message of content blocks, so the message indexes seen by the provider are
+  known to the caller
+- `cache_extra_body()` returns TensorZero `extra_body` entries, scoped per
+  variant using the provider each variant of the function is configured with:
+    - Anthropic: an ephemeral `cache_control` breakpoint on the system prompt
+      (which caches the tool definitions before it too) and on the last content
+      block of the last message (which caches the whole history prefix)
+    - OpenAI: a `prompt_cache_key` derived from the system prompt and tool
+      schemas, so requests sharing a prefix are routed to the same cache
+      (OpenAI caches prefixes automatically; there are no breakpoints)
+    - other providers are left alone
+
+Cached token counts come back as `Usage.provider_cache_read_input_tokens` /
+`provider_cache_write_input_tokens`; `usage_metadata()` reports them in
+LangChain's `input_token_details`.
+
+Usage:
+    from tensorzero_scratch.prompt_cache import cache_extra_body, normalize_messages, usage_metadata
+
+    messages = normalize_messages(history.to_tensorzero())
+    response = gateway.inference(
+        function_name="agent_chat",
+        input={"system": SYSTEM_PROMPT, "messages": messages},
+        additional_tools=tools,
+        extra_body=cache_extra_body("agent_chat", SYSTEM_PROMPT, tools, messages),
+    )
+    print(usage_metadata(response.usage))
+"""
+
+import hashlib
+import json
+import tomllib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from tensorzero import Message, Text
+
+from .gateway_pool import DEFAULT_CONFIG_FILE
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Providers whose requests take explicit cache breakpoints / a prefix routing key
+BREAKPOINT_PROVIDERS = {"anthropic"}
+CACHE_KEY_PROVIDERS = {"openai"}
+
+
+@lru_cache(maxsize=None)
+def _variant_providers(function_name: str, config_file: str) -> dict[str, Optional[str]]:
+    with open(config_file, "rb") as f:
+        config = tomllib.load(f)
+    models = config.get("models", {})
+    providers: dict[str, Optional[str]] = {}
+    for variant_name, variant in config.get("functions", {}).get(function_name, {}).get("variants", {}).items():
+        model = variant.get("model", "")
+        if "::" in model:
+            # Shorthand model names ("anthropic::claude-3-haiku-20240307") name the provider directly
+            providers[variant_name] = model.split("::", 1)[0]
+        else:
+            # Configured models: only a model served by a single provider type is unambiguous
+            types = {provider.get("type") for provider in models.get(model, {}).get("providers", {}).values()}
+            providers[variant_name] = types.pop() if len(types) == 1 else None
+    return providers
+
+
+def variant_providers(function_name: str, config_file: Optional[str] = None) -> dict[str, Optional[str]]:
+    """Map each variant of a function to its model provider type (None if unknown or mixed)."""
+    return _variant_providers(function_name, str(Path(config_file or DEFAULT_CONFIG_FILE).resolve()))
+
+
+def prefix_key(system: Optional[str], tools: Optional[list[dict]]) -> str:
+    """A short, stable hash of the cacheable request prefix."""
+    canonical = json.dumps([system or "", tools or []], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _blocks(content: Any) -> list[Any]:
+    return list(content) if isinstance(content, list) else [Text(text=content)]
+
+
+def normalize_messages(messages: list[Message]) -> list[Message]:
+    """
+    Merge runs of same-role messages (e.g. several tool results) into one message.
+
+    The request is otherwise unchanged, but message `i` of the result is
+    message `i` of the provider request, which breakpoint pointers rely on.
+    """
+    normalized: list[Message] = []
+    for message in messages:
+        if normalized and normalized[-1]["role"] == message["role"]:
+            previous = normalized[-1]
+            normalized[-1] = Message(role=message["role"], content=_blocks(previous["content"]) + _blocks(message["content"]))
+        else:
+            normalized.append(message)
+    return normalized
+
+
+def cache_extra_body(
+    function_name: str,
+    system: Optional[str],
+    tools: Optional[list[dict]],
+    messages: list[Message],
+    variant_name: Optional[str] = None,
+    config_file: Optional[str] = None,
+) -> list[dict]:
+    """
+    Build the `extra_body` entries that make a request's prefix cacheable.
+
+    `messages` must be the (normalized) messages being sent. With no
+    `variant_name`, entries are produced for every variant of the function,
+    each scoped to its variant, so whichever one TensorZero samples gets them.
+    """
+    providers = variant_providers(function_name, config_file)
+    variants = [variant_name] if variant_name is not None else list(providers)
+
+    breakpoints = []
+    if system:
+        breakpoints.append("/system/0/cache_control")
+    if messages and messages[-1]["content"]:
+        last = len(messages) - 1
+        breakpoints.append(f"/messages/{last}/content/{len(_blocks(messages[-1]['content'])) - 1}/cache_control")
+
+    extra_body: list[dict] = []
+    for variant in variants:
+        provider = providers.get(variant)
+        if provider in BREAKPOINT_PROVIDERS:
+            extra_body.extend({"variant_name": variant, "pointer": pointer, "value": CACHE_CONTROL} for pointer in breakpoints)
+        elif provider in CACHE_KEY_PROVIDERS and (system or tools):
+            extra_body.append({"variant_name": variant, "pointer": "/prompt_cache_key", "value": prefix_key(system, tools)})
+    return extra_body
+
+
+def usage_metadata(usage: Any) -> Optional[dict]:
+    """Convert a TensorZero `Usage` to LangChain `usage_metadata`, including cached input tokens."""
+    if usage is None:
+        return None
+    metadata = {
+        "input_tokens": usage.input_tokens or 0,
+        "output_tokens": usage.output_tokens or 0,
+        "total_tokens": (usage.input_tokens or 0) + (usage.output_tokens or 0),
+    }
+    details = {}
+    if getattr(usage, "provider_cache_read_input_tokens", None) is not None:
+        details["cache_read"] = usage.provider_cache_read_input_tokens
+    if getattr(usage, "provider_cache_write_input_tokens", None) is not None:
+        details["cache_creation"] = usage.provider_cache_write_input_tokens
+    if details:
+        metadata["input_token_details"] = details
+    return metadata
@@ -0,0 +1,272 @@
+"""
+Agent Output Renderers
+
+Building a rich `Panel` for every message and printing it synchronously is
+fine for a terminal demo but costs more than the work it shows once output
+goes to a file, a pipe or a service log. The agent therefore hands every
+event to a pluggable renderer:
+
+- "rich": a panel per message under a spinner (the interactive default)
+- "live": a `rich.Live` view that appends streamed tokens and tool progress
+  to a few `Text` objects instead of re-rendering whole panels
+- "jsonl": one JSON object per message, flushed once per turn (status lines
+  become `{"type": "info"}` objects)
+- "null": discards everything (batch runs and benchmarks)
+
+rich is only imported by the renderers that use it.
+
+Usage:
+    from tensorzero_scratch.renderers import get_renderer
+
+    agent = TensorZeroLangGraphAgent(renderer=get_renderer("jsonl"))
+    agent.run_turn("What's 2 ** 8?")
+"""
+
+import json
+import sys
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+
+def message_event(message: BaseMessage) -> dict[str, Any]:
+    """JSON-serializable event for a completed message (used by headless and network output)."""
+    event: dict[str, Any] = {"type": message.type, "content": message.content}
+    if isinstance(message, AIMessage):
+        if message.tool_calls:
+            event["tool_calls"] = [
+                {"name": tc["name"], "args": tc["args"], "id": tc["id"]} for tc in message.tool_calls
+            ]
+        if message.usage_metadata:
+            event["usage"] = dict(message.usage_metadata)
+    elif isinstance(message, ToolMessage):
+        event["name"] = message.name
+        event["tool_call_id"] = message.tool_call_id
+    return event
+
+
+class Renderer:
+    """
+    Receives agent events; every hook is a no-op by default.
+
+    `streaming` tells the agent whether to request token-level updates
+    (delivered through `token()`) in addition to completed messages.
+    """
+
+    streaming = False
+
+    def banner(self, title: str, subtitle: Optional[str] = None) -> None:
+        """Show a section title, e.g. at the start of a demo."""
+
+    def info(self, text: str) -> None:
+        """Show a status line."""
+
+    def user(self, message: HumanMessage) -> None:
+        """Show a user message the terminal has not already echoed."""
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        """Bracket the processing of one user turn."""
+        yield
+
+    def token(self, text: str) -> None:
+        """Show a streamed fragment of the assistant's reply."""
+
+    def message(self, message: BaseMessage) -> None:
+        """Show a completed AI or tool message."""
+
+    def error(self, text: str) -> None:
+        """Report an error."""
+
+
+class NullRenderer(Renderer):
+    """Discards all output."""
+
+
+class JsonlRenderer(Renderer):
+    """Writes one JSON object per message to a stream, flushing at the end of each turn."""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream or sys.stdout
+
+    def _write(self, event: dict[str, Any]) -> None:
+        self.stream.write(json.dumps(event, default=str) + "\n")
+
+    def info(self, text: str) -> None:
+        # Status lines (e.g. per-turn profile summaries) arrive outside a turn, so flush them right away
+        self._write({"type": "info", "content": text.strip()})
+        self.stream.flush()
+
+    def user(self, message: HumanMessage) -> None:
+        self._write({"type": "human", "content": message.content})
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        try:
+            yield
+        finally:
+            self.stream.flush()
+
+    def message(self, message: BaseMessage) -> None:
+        self._write(message_event(message))
+
+    def error(self, text: str) -> None:
+        self._write({"type": "error", "error": text})
+        self.stream.flush()
+
+
+class RichRenderer(Renderer):
+    """Prints a rich panel per message, with a spinner while a turn is processed."""
+
+    def __init__(self, console: Any = None):
+        from rich.console import Console
+
+        self.console = console or Console()
+
+    def banner(self, title: str, subtitle: Optional[str] = None) -> None:
+        self.console.print(f"\n[bold magenta]{title}[/bold magenta]\n")
+        if subtitle:
+            self.console.print(f"[dim]{subtitle}[/dim]\n")
+
+    def info(self, text: str) -> None:
+        self.console.print(f"[bold blue]{text}[/bold blue]")
+
+    def _format_message(self, message: BaseMessage, message_type: str):
+        """Format a message for display."""
+        from rich.panel import Panel
+
+        if isinstance(message, AIMessage):
+            if message.tool_calls:
+                content = f"{message.content}\n\n[bold cyan]Tool Calls:[/bold cyan]\n"
+                for tool_call in message.tool_calls:
+                    content += f"• {tool_call['name']}({tool_call['args']})\n"
+                content = content.strip()
+            else:
+                content = message.content
+            border_color = "blue"
+        elif isinstance(message, HumanMessage):
+            content = message.content
+            border_color = "green"
+        elif isinstance(message, ToolMessage):
+            content = f"Tool Result: {message.content}"
+            border_color = "yellow"
+        else:
+            content = str(message.content)
+            border_color = "white"
+
+        return Panel(
+            content,
+            title=f"[bold]{message_type}[/bold]",
+            border_style=border_color,
+            title_align="left"
+        )
+
+    def _display_message(self, message: BaseMessage, message_type: str) -> None:
+        """Display a message with formatting."""
+        self.console.print(self._format_message(message, message_type))
+        self.console.print()  # Add spacing
+
+    def user(self, message: HumanMessage) -> None:
+        self._display_message(message, "User")
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        with self.console.status("[bold green]Processing with TensorZero...", spinner="dots"):
+            yield
+
+    def message(self, message: BaseMessage) -> None:
+        if isinstance(message, ToolMessage):
+            self.console.print(f"[dim]🔧 Tool Result: {message.content}[/dim]")
+        elif isinstance(message, AIMessage):
+            self._display_message(message, "Assistant")
+
+    def error(self, text: str) -> None:
+        self.console.print(f"[bold red]Error:[/bold red] {text}")
+
+
+class LiveRenderer(RichRenderer):
+    """
+    Streams the assistant's reply and tool progress into a `rich.Live` view.
+
+    Tokens and tool events only append to two `Text` objects; `Live` redraws
+    them at a fixed refresh rate, so rendering cost does not grow with the
+    number of tokens.
+    """
+
+    streaming = True
+
+    def __init__(self, console: Any = None, refresh_per_second: float = 12.0, max_tool_chars: int = 120):
+        super().__init__(console)
+        self.refresh_per_second = refresh_per_second
+        self.max_tool_chars = max_tool_chars
+        self._live = None
+
+    def user(self, message: HumanMessage) -> None:
+        self.console.print(f"[bold green]User:[/bold green] {message.content}")
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        from rich.console import Group
+        from rich.live import Live
+        from rich.text import Text
+
+        self._progress = Text(style="dim")
+        self._reply = Text()
+        self._streamed = False
+        self._live = Live(
+            Group(self._progress, self._reply),
+            console=self.console,
+            refresh_per_second=self.refresh_per_second,
+        )
+        try:
+            with self._live:
+                yield
+        finally:
+            self._live = None
+        self.console.print()
+
+    def token(self, text: str) -> None:
+        if text and self._live is not None:
+            self._reply.append(text)
+            self._streamed = True
+
+    def message(self, message: BaseMessage) -> None:
+        if self._live is None:
+            return super().message(message)
+        if isinstance(message, AIMessage):
+            if not self._streamed and isinstance(message.content, str):
+                self._reply.append(message.content)
+            if self._reply.plain and not self._reply.plain.endswith("\n"):
+                self._reply.append("\n")
+            self._streamed = False
+            for tool_call in message.tool_calls:
+                self._progress.append(f"🔧 {tool_call['name']}({tool_call['args']}) …\n")
+        elif isinstance(message, ToolMessage):
+            result = str(message.content)
+            if len(result) > self.max_tool_chars:
+                result = result[:self.max_tool_chars].rstrip() + "…"
+            self._progress.append(f"✓ {message.name}: {result}\n")
+
+
+RENDERERS = {
+    "rich": RichRenderer,
+    "live": LiveRenderer,
+    "jsonl": JsonlRenderer,
+    "null": NullRenderer,
+}
+
+
+def get_renderer(name: Optional[str] = None) -> Renderer:
+    """
+    Create a renderer by name.
+
+    Without a name, uses "rich" when stdout is a terminal and "jsonl" otherwise,
+    so piped or redirected output is never spent on panel rendering.
+    """
+    if name is None:
+        name = "rich" if sys.stdout.isatty() else "jsonl"
+    try:
+        return RENDERERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown renderer: {name!r} (expected one of {', '.join(RENDERERS)})") from None
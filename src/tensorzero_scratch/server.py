@@ -0,0 +1,403 @@
+"""
+Agent Network Server
+
+Serves the LangGraph agent over HTTP so it can sit behind a load balancer:
+
+    POST /sessions                    create a session -> {"session_id": ...}
+    POST /sessions/{id}/turns         run a turn, streamed as Server-Sent Events
+    WS   /sessions/{id}/ws            run turns over a WebSocket, one JSON message each
+    GET  /healthz                     liveness
+    GET  /readyz                      readiness: gateway healthy and not draining
+
+Every turn streams `token` events as the reply is generated, one event per
+completed AI or tool message (see `renderers.message_event`), and a final
+`done` (or `error`) event.
+
+Sessions live in the durable `ConversationStore`, not in worker memory: each
+turn resumes its session from the store, which is cheap because the compiled
+agent graph is shared process-wide. Any worker can therefore serve any turn;
+workers share the store's SQLite file, and a turn holds a lease on its
+session in the store for as long as it runs. Leases are short (`lease_ttl`)
+and renewed in the background while their turns run, so a crashed worker
+only blocks its sessions briefly.
+
+Backpressure: each worker runs at most `max_inflight` turns at once and
+answers 429 (with Retry-After) beyond that, instead of queueing; a second
+concurrent turn on the same session gets 409, whichever worker it reaches
+(the session's lease is held by another turn). On shutdown the worker reports
+not-ready, finishes in-flight turns so their messages are persisted, then
+closes the store and pooled gateway clients.
+
+Needs the optional `serve` extra (starlette, uvicorn, websockets).
+
+Usage:
+    python run_agent.py serve --port=8080 --workers=4
+
+    curl -X POST localhost:8080/sessions
+    curl -N -X POST localhost:8080/sessions/<id>/turns -d '{"message": "What is 2 ** 8?"}'
+"""
+
+import asyncio
+import json
+import os
+import threading
+import uuid
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Optional
+
+import httpx
+
+from .conversation_store import DEFAULT_LEASE_TTL, ConversationStore
+from .gateway_pool import close_all, get_embedded_gateway
+from .renderers import Renderer, message_event
+
+try:
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route, WebSocketRoute
+    from starlette.websockets import WebSocket, WebSocketDisconnect
+    SERVE_AVAILABLE = True
+except ImportError:
+    SERVE_AVAILABLE = False
+
+
+ENV_PREFIX = "TENSORZERO_SERVE_"
+
+
+@dataclass(frozen=True)
+class ServeSettings:
+    """Settings for one server worker; passed to worker processes through environment variables."""
+
+    gateway_url: str = "http://localhost:3000"
+    gateway_mode: str = "http"
+    config_file: Optional[str] = None
+    clickhouse_url: Optional[str] = None
+    store_path: str = "conversations.db"
+    history_turns: int = 20
+    max_inflight: int = 16
+    health_interval: float = 5.0
+    engine: str = "langgraph"
+    lease_ttl: float = DEFAULT_LEASE_TTL
+
+    @classmethod
+    def from_env(cls) -> "ServeSettings":
+        """Read settings from TENSORZERO_SERVE_* variables, falling back to the defaults."""
+        values: dict[str, Any] = {}
+        for field in fields(cls):
+            raw = os.environ.get(ENV_PREFIX + field.name.upper())
+            if raw is not None:
+                values[field.name] = type(field.default)(raw) if field.default is not None else raw
+        return cls(**values)
+
+    def to_env(self) -> dict[str, str]:
+        """Environment variables that reproduce these settings in `from_env()`."""
+        return {ENV_PREFIX + name.upper(): str(value) for name, value in asdict(self).items() if value is not None}
+
+
+class _StreamRenderer(Renderer):
+    """Forwards agent events from the worker thread running a turn to an asyncio queue."""
+
+    streaming = True
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self._loop = loop
+        self._queue = queue
+
+    def put(self, event: Optional[dict]) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    def token(self, text: str) -> None:
+        if text:
+            self.put({"type": "token", "content": text})
+
+    def message(self, message) -> None:
+        self.put(message_event(message))
+
+    def error(self, text: str) -> None:
+        self.put({"type": "error", "error": text})
+
+
+class Overloaded(Exception):
+    """The worker is already running `max_inflight` turns."""
+
+
+class SessionBusy(Exception):
+    """The session already has a turn in progress (on this or another worker)."""
+
+
+class AgentServer:
+    """Per-worker state: the conversation store, turn admission and gateway readiness."""
+
+    def __init__(self, settings: ServeSettings):
+        self.settings = settings
+        self.store: Optional[ConversationStore] = None
+        self.executor = ThreadPoolExecutor(max_workers=settings.max_inflight, thread_name_prefix="agent-turn")
+        self.inflight = 0
+        self.gateway_healthy = False
+        self.draining = False
+        self._busy_sessions: set[str] = set()
+        self._leased_sessions: set[str] = set()
+        self._lock = threading.Lock()
+        # Owner of this worker's session leases in the shared store
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._health_task: Optional[asyncio.Task] = None
+        self._lease_task: Optional[asyncio.Task] = None
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Open the store, build the shared agent graph and start watching gateway health."""
+        from .langgraph_agent import agent_class, build_agent_graph
+
+        self.store = ConversationStore(self.settings.store_path)
+        s = self.settings
+        self.agent_class = agent_class(s.engine)
+        if s.engine == "langgraph":
+            await asyncio.to_thread(build_agent_graph, s.gateway_mode, s.gateway_url, s.config_file, s.clickhouse_url, None)
+        elif s.gateway_mode == "embedded":
+            await asyncio.to_thread(get_embedded_gateway, s.config_file, s.clickhouse_url)
+        if s.gateway_mode == "embedded":
+            self.gateway_healthy = True  # the in-process gateway was built above
+        else:
+            self._health_task = asyncio.create_task(self._watch_gateway())
+        self._lease_task = asyncio.create_task(self._renew_leases())
+
+    async def stop(self) -> None:
+        """Stop taking turns, let in-flight turns finish, then release resources."""
+        self.draining = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.to_thread(self.executor.shutdown, wait=True)
+        # Draining turns keep their leases renewed until they finish
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+        if self.store is not None:
+            self.store.close()
+        close_all()
+
+    async def _watch_gateway(self) -> None:
+        url = f"{self.settings.gateway_url.rstrip('/')}/health"
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            while True:
+                try:
+                    self.gateway_healthy = (await client.get(url)).status_code == 200
+                except httpx.HTTPError:
+                    self.gateway_healthy = False
+                await asyncio.sleep(self.settings.health_interval)
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.lease_ttl / 3)
+            with self._lock:
+                sessions = list(self._leased_sessions)
+            if sessions:
+                await asyncio.to_thread(self._renew, sessions)
+
+    def _renew(self, sessions: list[str]) -> None:
+        for session_id in sessions:
+            self.store.renew_lease(session_id, self.worker_id, self.settings.lease_ttl)
+
+    @property
+    def ready(self) -> bool:
+        return self.gateway_healthy and not self.draining
+
+    # Turns
+
+    def _acquire(self, session_id: str) -> None:
+        with self._lock:
+            if self.draining or self.inflight >= self.settings.max_inflight:
+                raise Overloaded()
+            if session_id in self._busy_sessions:
+                raise SessionBusy()
+            self.inflight += 1
+            self._busy_sessions.add(session_id)
+        # Other workers share the store: the lease keeps the session to one turn at a time across them
+        if self.store is not None:
+            if not self.store.acquire_lease(session_id, self.worker_id, self.settings.lease_ttl):
+                self._release(session_id, leased=False)
+                raise SessionBusy()
+            with self._lock:
+                self._leased_sessions.add(session_id)
+
+    def _release(self, session_id: str, leased: bool = True) -> None:
+        if leased and self.store is not None:
+            # Stop renewing before releasing, so the renewer never extends a released lease
+            with self._lock:
+                self._leased_sessions.discard(session_id)
+            self.store.release_lease(session_id, self.worker_id)
+        with self._lock:
+            self.inflight -= 1
+            self._busy_sessions.discard(session_id)
+
+    def _run_turn(self, session_id: str, user_message: str, renderer: _StreamRenderer) -> None:
+        s = self.settings
+        try:
+            agent = self.agent_class(
+                gateway_url=s.gateway_url,
+                store=self.store,
+                session_id=session_id,
+                history_turns=s.history_turns,
+                gateway_mode=s.gateway_mode,
+                config_file=s.config_file,
+                clickhouse_url=s.clickhouse_url,
+                renderer=renderer,
+            )
+            agent.run_turn(user_message)
+            renderer.put({"type": "done", "session_id": session_id, "usage": agent.usage.totals().to_dict()})
+        except Exception as e:
+            renderer.error(str(e))
+        finally:
+            # Free the slot before ending the stream, so a client may start its next turn right away
+            self._release(session_id)
+            renderer.put(None)
+
+    async def start_turn(self, session_id: str, user_message: str) -> AsyncIterator[dict]:
+        """
+        Admit a turn and return its event stream.
+
+        Raises `Overloaded` or `SessionBusy` as soon as the turn cannot be
+        admitted. The turn runs to completion (and is persisted) even if the
+        client stops reading.
+        """
+        # Taking the lease is a SQLite write that may wait on other workers; keep it off the loop
+        await asyncio.to_thread(self._acquire, session_id)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        renderer = _StreamRenderer(loop, queue)
+        try:
+            loop.run_in_executor(self.executor, self._run_turn, session_id, user_message, renderer)
+        except RuntimeError:  # executor shut down while draining
+            await asyncio.to_thread(self._release, session_id)
+            raise Overloaded() from None
+
+        async def events() -> AsyncIterator[dict]:
+            while (event := await queue.get()) is not None:
+                yield event
+
+        return events()
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def _rejection(error: Exception) -> tuple[dict, int, dict[str, str]]:
+    if isinstance(error, SessionBusy):
+        return {"error": "session has a turn in progress"}, 409, {}
+    return {"error": "worker at capacity"}, 429, {"Retry-After": "1"}
+
+
+def create_app(settings: Optional[ServeSettings] = None) -> "Starlette":
+    """Build the ASGI app for one worker (settings default to `ServeSettings.from_env()`)."""
+    if not SERVE_AVAILABLE:
+        raise ImportError("starlette and uvicorn are required to serve the agent; install with `uv sync --extra serve`")
+
+    server = AgentServer(settings or ServeSettings.from_env())
+
+    async def healthz(request: Request) -> Response:
+        return JSONResponse({"status": "ok"})
+
+    async def readyz(request: Request) -> Response:
+        body = {"ready": server.ready, "gateway_healthy": server.gateway_healthy, "draining": server.draining,
+                "inflight": server.inflight, "max_inflight": server.settings.max_inflight}
+        return JSONResponse(body, status_code=200 if server.ready else 503)
+
+    async def create_session(request: Request) -> Response:
+        return JSONResponse({"session_id": str(uuid.uuid4())}, status_code=201)
+
+    async def post_turn(request: Request) -> Response:
+        session_id = request.path_params["session_id"]
+        try:
+            user_message = (await request.json())["message"]
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": 'expected a JSON body {"message": "..."}'}, status_code=400)
+        try:
+            events = await server.start_turn(session_id, user_message)
+        except (Overloaded, SessionBusy) as e:
+            body, status, headers = _rejection(e)
+            return JSONResponse(body, status_code=status, headers=headers)
+
+        async def stream() -> AsyncIterator[str]:
+            async for event in events:
+                yield _sse(event)
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def session_socket(websocket: WebSocket) -> None:
+        session_id = websocket.path_params["session_id"]
+        await websocket.accept()
+        try:
+            while True:
+                request = await websocket.receive_json()
+                user_message = request.get("message") if isinstance(request, dict) else None
+                if not isinstance(user_message, str):
+                    await websocket.send_json({"type": "error", "status": 400, "error": 'expected {"message": "..."}'})
+                    continue
+                try:
+                    events = await server.start_turn(session_id, user_message)
+                except (Overloaded, SessionBusy) as e:
+                    body, status, _ = _rejection(e)
+                    await websocket.send_json({"type": "error", "status": status, **body})
+                    continue
+                async for event in events:
+                    await websocket.send_json(event)
+        except WebSocketDisconnect:
+            pass
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        await server.start()
+        try:
+            yield
+        finally:
+            await server.stop()
+
+    app = Starlette(
+        routes=[
+            Route("/healthz", healthz),
+            Route("/readyz", readyz),
+            Route("/sessions", create_session, methods=["POST"]),
+            Route("/sessions/{session_id}/turns", post_turn, methods=["POST"]),
+            WebSocketRoute("/sessions/{session_id}/ws", session_socket),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.server = server
+    return app
+
+
+def serve(
+    settings: ServeSettings,
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    workers: int = 1,
+    graceful_timeout: float = 30.0,
+) -> None:
+    """
+    Run the agent server with `workers` processes.
+
+    Workers are separate uvicorn processes that rebuild the app from the
+    environment; on SIGTERM/SIGINT each stops accepting connections and
+    waits up to `graceful_timeout` seconds for open requests to finish.
+    """
+    if not SERVE_AVAILABLE:
+        raise ImportError("starlette and uvicorn are required to serve the agent; install with `uv sync --extra serve`")
+    os.environ.update(settings.to_env())
+    uvicorn.run(
+        "tensorzero_scratch.server:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=graceful_timeout,
+        log_level="info",
+    )
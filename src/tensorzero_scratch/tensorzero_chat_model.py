@@ -18,24 +18,91 @@ Usage:
         variant_name="gpt4_mini"
     )
 
-    # Use in LangGraph agents
+    # Or run the gateway in-process from config/tensorzero.toml
+    chat_model = TensorZeroChatModel(gateway_mode="embedded")
+
+    # Use in LangGraph agents (bound tools are sent as dynamic tool definitions)
     from langgraph.prebuilt import create_react_agent
     agent = create_react_agent(chat_model, tools)
+
+    # Share one model across sessions, passing each session's episode per run
+    agent.invoke({"messages": messages}, config={"metadata": {"tensorzero_episode_id": episode_id}})
+
+    # Offer only a subset of configured and bound tools for one request
+    chat_model.bind_tools(tools).invoke(messages, allowed_tools=["python_calculator"])
+
+    # Mark the system prompt, tools and history prefix cacheable (see prompt_cache.py)
+    chat_model = TensorZeroChatModel(prompt_caching=True)
 """
 
 import asyncio
+import json
+import time
+import weakref
 from typing import Any, Optional
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_core.utils.utils import from_env
 from pydantic import Field, model_validator
 from typing_extensions import Self
 
 from tensorzero import TensorZeroGateway, Message, Text, ToolCall, ToolResult
 
+from .compact_messages import CompactHistory, CompactMessage
+from .gateway_pool import get_embedded_gateway, get_gateway
+from .prompt_cache import cache_extra_body, normalize_messages, usage_metadata
+from .usage import UsageAccumulator, process_usage
+
+
+# Run metadata key carrying a per-session episode ID (see `_generate`)
+EPISODE_METADATA_KEY = "tensorzero_episode_id"
+
+# Serialized tool definitions, keyed by tool object identity. LangChain tools
+# are unhashable pydantic models, so this is a plain dict holding only a weak
+# reference to each tool, whose callback drops the entry when the tool is
+# garbage collected (before its id can be reused).
+_TOOL_DEFINITION_CACHE: dict[int, tuple[weakref.ref, dict]] = {}
+
+
+def _tool_definition(tool: Any) -> dict:
+    """Serialize a LangChain tool to a TensorZero dynamic tool definition, once per tool."""
+    cached = _TOOL_DEFINITION_CACHE.get(id(tool))
+    if cached is not None and cached[0]() is tool:
+        return cached[1]
+
+    function = convert_to_openai_tool(tool)["function"]
+    # Only the summary paragraph: argument docs are already in the parameter schema
+    description = function.get("description", "").split("\n\n", 1)[0].strip()
+    definition = {
+        "name": function["name"],
+        "description": description,
+        "parameters": function.get("parameters", {"type": "object", "properties": {}}),
+        "strict": False,
+    }
+    key = id(tool)
+    try:
+        ref = weakref.ref(tool, lambda _, key=key: _TOOL_DEFINITION_CACHE.pop(key, None))
+    except TypeError:
+        # Not weakly referenceable (e.g. a tool given as a dict): not cached
+        return definition
+    _TOOL_DEFINITION_CACHE[key] = (ref, definition)
+    return definition
+
+
+def _tool_choice(tool_choice: str | dict) -> str | dict:
+    """Map LangChain tool_choice values onto TensorZero's."""
+    if isinstance(tool_choice, dict):
+        return tool_choice
+    if tool_choice in ("auto", "none", "required"):
+        return tool_choice
+    if tool_choice == "any":
+        return "required"
+    return {"specific": tool_choice}
+
 
 class TensorZeroChatModel(BaseChatModel):
     """
@@ -55,20 +122,46 @@ class TensorZeroChatModel(BaseChatModel):
     function_name: str = Field(default="agent_chat", description="TensorZero function name to use")
     variant_name: str = Field(default="gpt4_mini", description="TensorZero variant name to use")
     gateway_url: Optional[str] = Field(
-        default_factory=lambda: from_env("TENSORZERO_GATEWAY_URL", default="http://localhost:3000"),
+        default_factory=from_env("TENSORZERO_GATEWAY_URL", default="http://localhost:3000"),
         description="TensorZero gateway URL"
     )
 
+    # Embedded (in-process) gateway configuration
+    gateway_mode: str = Field(default="http", description="'http' for a standalone gateway, 'embedded' to run it in-process")
+    config_file: Optional[str] = Field(
+        default_factory=from_env("TENSORZERO_CONFIG_FILE", default=None),
+        description="TensorZero config file for embedded mode (defaults to config/tensorzero.toml)"
+    )
+    clickhouse_url: Optional[str] = Field(
+        default_factory=from_env("TENSORZERO_CLICKHOUSE_URL", default=None),
+        description="ClickHouse URL for embedded mode observability (disabled if unset)"
+    )
+
+    # Tool subsetting: names of configured and bound tools allowed per request (None = all)
+    allowed_tools: Optional[list[str]] = Field(default=None, description="Default subset of tool names to offer the model")
+
     # Episode management
     episode_id: Optional[str] = Field(default=None, description="Current episode ID for conversation continuity")
 
     model_name: str = Field(default="tensorzero", description="Model identifier for LangChain")
 
+    # Provider prompt caching of the stable request prefix (system prompt, tools, history)
+    prompt_caching: bool = Field(default=False, description="Mark cache breakpoints / prompt cache keys for providers that support them")
+
+    # Usage accounting: records go to this accumulator, or to the process-wide one if unset
+    # (a given accumulator only rolls up into the process totals if built with parent=process_usage())
+    usage: Optional[UsageAccumulator] = Field(default=None, exclude=True)
+
     @model_validator(mode="after")
     def validate_environment(self) -> Self:
-        """Validate and initialize TensorZero gateway."""
+        """Validate and initialize TensorZero gateway (shared process-wide per gateway URL)."""
         if self.gateway is None:
-            self.gateway = TensorZeroGateway.build_http(gateway_url=self.gateway_url)
+            if self.gateway_mode == "embedded":
+                self.gateway = get_embedded_gateway(self.config_file, self.clickhouse_url)
+            elif self.gateway_mode == "http":
+                self.gateway = get_gateway(self.gateway_url)
+            else:
+                raise ValueError(f"Unknown gateway_mode: {self.gateway_mode!r} (expected 'http' or 'embedded')")
         return self
 
     def _generate(
@@ -80,32 +173,76 @@ class TensorZeroChatModel(BaseChatModel):
     ) -> ChatResult:
         """Generate a response using TensorZero."""
 
+        # A shared model serves many sessions, so callers can pass their episode
+        # through run metadata instead of relying on the model-level episode_id
+        metadata = run_manager.metadata if run_manager else {}
+        track_episode = EPISODE_METADATA_KEY not in metadata
+        episode_id = self.episode_id if track_episode else metadata[EPISODE_METADATA_KEY]
+
         # Convert messages and make inference call
-        tensorzero_messages = self._convert_messages_to_tensorzero(messages)
+        tensorzero_input = self._build_input(messages)
+        params = self._tool_params(**kwargs)
+        if self.prompt_caching:
+            tensorzero_input["messages"] = normalize_messages(tensorzero_input["messages"])
+            params["extra_body"] = cache_extra_body(
+                self.function_name,
+                tensorzero_input.get("system"),
+                params.get("additional_tools"),
+                tensorzero_input["messages"],
+                self.variant_name,
+                self.config_file,
+            )
+        start = time.perf_counter()
         response = self.gateway.inference(
             function_name=self.function_name,
             variant_name=self.variant_name,
-            input={"messages": tensorzero_messages},
-            episode_id=self.episode_id
+            input=tensorzero_input,
+            episode_id=episode_id,
+            **params,
         )
+        latency_ms = (time.perf_counter() - start) * 1000
 
         # Store episode ID for future calls
-        if hasattr(response, 'episode_id'):
+        if track_episode and hasattr(response, 'episode_id'):
             self.episode_id = response.episode_id
 
         # Extract content and create response
         content, tool_calls = self._extract_response_content(response)
         ai_message = self._create_ai_message(content, tool_calls)
+        ai_message.usage_metadata, ai_message.response_metadata = self._extract_response_metadata(
+            response, latency_ms
+        )
+        (self.usage or process_usage()).record_message(ai_message)
 
         generation = ChatGeneration(message=ai_message)
         return ChatResult(generations=[generation])
 
-    def _convert_messages_to_tensorzero(self, messages: list[BaseMessage]) -> list[Message]:
-        """Convert LangChain messages to TensorZero format."""
+    def _build_input(self, messages: list[BaseMessage | CompactMessage] | CompactHistory) -> dict[str, Any]:
+        """Build the inference input, sending system messages (e.g. a ReAct prompt) as the system prompt."""
+        system = [
+            msg.content
+            for msg in messages
+            if isinstance(msg, SystemMessage) or (isinstance(msg, CompactMessage) and msg.role == "system")
+        ]
+        tensorzero_input: dict[str, Any] = {"messages": self._convert_messages_to_tensorzero(messages)}
+        if system:
+            tensorzero_input["system"] = "\n\n".join(
+                content if isinstance(content, str) else str(content) for content in system
+            )
+        return tensorzero_input
+
+    def _convert_messages_to_tensorzero(
+        self, messages: list[BaseMessage | CompactMessage] | CompactHistory
+    ) -> list[Message]:
+        """Convert LangChain (or compact) messages to TensorZero format."""
         tensorzero_messages = []
 
         for msg in messages:
-            if isinstance(msg, HumanMessage):
+            if isinstance(msg, CompactMessage):
+                converted = msg.to_tensorzero()
+                if converted is not None:
+                    tensorzero_messages.append(converted)
+            elif isinstance(msg, HumanMessage):
                 tensorzero_messages.append(self._convert_human_message(msg))
             elif isinstance(msg, AIMessage):
                 tensorzero_messages.append(self._convert_ai_message(msg))
@@ -124,11 +261,22 @@ class TensorZeroChatModel(BaseChatModel):
 
     def _convert_ai_message(self, msg: AIMessage) -> Message:
         """Convert AIMessage to TensorZero format."""
-        content = msg.content
-        if isinstance(content, str):
+        content = msg.content if isinstance(msg.content, str) else str(msg.content)
+        if not msg.tool_calls:
             return Message(role="assistant", content=content)
-        else:
-            return Message(role="assistant", content=str(content))
+
+        # Tool results sent back later must follow the tool calls that requested them
+        blocks: list[Any] = [Text(text=content)] if content else []
+        for tool_call in msg.tool_calls:
+            raw_arguments = json.dumps(tool_call["args"], separators=(",", ":"))
+            blocks.append(ToolCall(
+                id=tool_call["id"] or "unknown_id",
+                raw_name=tool_call["name"],
+                raw_arguments=raw_arguments,
+                name=tool_call["name"],
+                arguments=tool_call["args"],
+            ))
+        return Message(role="assistant", content=blocks)
 
     def _convert_tool_message(self, msg: ToolMessage) -> Message:
         """Convert ToolMessage to TensorZero format."""
@@ -163,6 +311,22 @@ class TensorZeroChatModel(BaseChatModel):
 
         return content, tool_calls
 
+    def _extract_response_metadata(self, response, latency_ms: float) -> tuple[Optional[dict], dict]:
+        """Extract LangChain usage and response metadata from TensorZero response."""
+        metadata = usage_metadata(getattr(response, 'usage', None))
+
+        finish_reason = getattr(response, 'finish_reason', None)
+        response_metadata = {
+            "model_name": self.model_name,
+            "function_name": self.function_name,
+            "variant_name": getattr(response, 'variant_name', None),
+            "inference_id": str(response.inference_id) if hasattr(response, 'inference_id') else None,
+            "episode_id": str(response.episode_id) if hasattr(response, 'episode_id') else None,
+            "finish_reason": finish_reason.value if finish_reason is not None else None,
+            "latency_ms": latency_ms,
+        }
+        return metadata, response_metadata
+
     def _create_tool_call_dict(self, content_block: ToolCall, call_index: int) -> dict:
         """Create a tool call dictionary from a ToolCall object."""
         return {
@@ -188,13 +352,50 @@ class TensorZeroChatModel(BaseChatModel):
         else:
             return AIMessage(content=content)
 
-    def bind_tools(self, tools: list, **kwargs: Any):
-        """Bind tools to the model for tool calling."""
-        # For TensorZero, tools are configured at the function level
-        # in the tensorzero.toml file, not dynamically bound
-        # So we just return self with tool information stored
-        self._bound_tools = tools
-        return self
+    def bind_tools(
+        self,
+        tools: list,
+        *,
+        tool_choice: Optional[str | dict] = None,
+        allowed_tools: Optional[list[str]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Bind tools to the model for tool calling.
+
+        Python tools are sent to TensorZero as dynamic `additional_tools`,
+        alongside the tools configured for the function in tensorzero.toml.
+        `allowed_tools` restricts a binding to a subset of bound and configured
+        tool names; it can also be passed per request to `invoke`.
+        """
+        additional_tools = [_tool_definition(tool) for tool in tools]
+        bind_kwargs: dict[str, Any] = {"additional_tools": additional_tools, **kwargs}
+        if allowed_tools is not None:
+            bind_kwargs["allowed_tools"] = allowed_tools
+        if tool_choice is not None:
+            bind_kwargs["tool_choice"] = _tool_choice(tool_choice)
+        return self.bind(**bind_kwargs)
+
+    def _tool_params(self, **kwargs: Any) -> dict[str, Any]:
+        """Build the tool-related inference arguments for one request."""
+        params: dict[str, Any] = {}
+        additional_tools = kwargs.get("additional_tools")
+        allowed_tools = kwargs.get("allowed_tools", self.allowed_tools)
+
+        if allowed_tools is not None:
+            allowed = set(allowed_tools)
+            if additional_tools:
+                additional_tools = [tool for tool in additional_tools if tool["name"] in allowed]
+            dynamic_names = {tool["name"] for tool in additional_tools or ()}
+            # Configured tools not named here are left out of the request entirely
+            params["allowed_tools"] = [name for name in allowed_tools if name not in dynamic_names]
+
+        if additional_tools:
+            params["additional_tools"] = additional_tools
+        for key in ("tool_choice", "parallel_tool_calls"):
+            if kwargs.get(key) is not None:
+                params[key] = kwargs[key]
+        return params
 
     @property
     def _llm_type(self) -> str:
@@ -208,5 +409,6 @@ class TensorZeroChatModel(BaseChatModel):
             "function_name": self.function_name,
             "variant_name": self.variant_name,
             "gateway_url": self.gateway_url,
+            "gateway_mode": self.gateway_mode,
             "episode_id": self.episode_id
         }
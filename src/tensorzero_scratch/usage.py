@@ -0,0 +1,198 @@
+"""
+Usage Accounting for TensorZero Inferences
+
+This module aggregates token usage (including provider prompt-cache reads and
+writes), call counts and latency histograms per variant, so callers can
+attribute cost and latency without querying ClickHouse.
+
+Two scopes are supported:
+    - a per-session accumulator, owned by an agent or a chat model instance
+    - a per-process accumulator, shared by everything in the interpreter
+
+Usage:
+    from tensorzero_scratch.usage import UsageAccumulator, process_usage
+
+    session_usage = UsageAccumulator()
+    session_usage.record("gpt4_mini", input_tokens=120, output_tokens=40, latency_ms=850.0)
+
+    print(session_usage.snapshot())
+    print(process_usage().latency_percentile("gpt4_mini", 0.95))
+"""
+
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+UNKNOWN_VARIANT = "unknown"
+
+
+@dataclass
+class VariantUsage:
+    """Aggregated usage for a single variant."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0  # input tokens served from the provider's prompt cache
+    cache_write_input_tokens: int = 0
+    total_latency_ms: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of input tokens read from the provider's prompt cache."""
+        return self.cache_read_input_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return self.total_latency_ms / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_write_input_tokens": self.cache_write_input_tokens,
+            "cache_hit_rate": self.cache_hit_rate,
+            "mean_latency_ms": self.mean_latency_ms,
+            "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.latency_buckets)),
+        }
+
+
+class UsageAccumulator:
+    """
+    Thread-safe accumulator of token usage and latency, keyed by variant name.
+
+    Recording is O(1) and never blocks on I/O, so it is safe to call on the
+    request path of every inference.
+    """
+
+    def __init__(self, parent: Optional["UsageAccumulator"] = None):
+        """Initialize an empty accumulator, optionally forwarding records to `parent`."""
+        self._lock = threading.Lock()
+        self._variants: dict[str, VariantUsage] = {}
+        self._parent = parent
+
+    def record(
+        self,
+        variant_name: Optional[str],
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        latency_ms: Optional[float] = None,
+        cache_read_input_tokens: int = 0,
+        cache_write_input_tokens: int = 0,
+    ) -> None:
+        """Record a single inference call."""
+        variant = variant_name or UNKNOWN_VARIANT
+        with self._lock:
+            stats = self._variants.get(variant)
+            if stats is None:
+                stats = self._variants[variant] = VariantUsage()
+            stats.calls += 1
+            stats.input_tokens += input_tokens or 0
+            stats.output_tokens += output_tokens or 0
+            stats.cache_read_input_tokens += cache_read_input_tokens or 0
+            stats.cache_write_input_tokens += cache_write_input_tokens or 0
+            if latency_ms is not None:
+                stats.total_latency_ms += latency_ms
+                stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+        if self._parent is not None:
+            self._parent.record(
+                variant_name, input_tokens, output_tokens, latency_ms, cache_read_input_tokens, cache_write_input_tokens
+            )
+
+    def record_message(self, message: "AIMessage") -> None:
+        """Record usage from an AIMessage's `usage_metadata` and `response_metadata`."""
+        usage = message.usage_metadata or {}
+        details = usage.get("input_token_details") or {}
+        metadata = message.response_metadata or {}
+        # Without a variant the usage goes under UNKNOWN_VARIANT, not the LangChain model name
+        self.record(
+            metadata.get("variant_name"),
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            latency_ms=metadata.get("latency_ms"),
+            cache_read_input_tokens=details.get("cache_read", 0),
+            cache_write_input_tokens=details.get("cache_creation", 0),
+        )
+
+    def variant(self, variant_name: str) -> VariantUsage:
+        """Get a copy of the aggregated usage for a variant."""
+        with self._lock:
+            stats = self._variants.get(variant_name, VariantUsage())
+            return VariantUsage(
+                calls=stats.calls,
+                input_tokens=stats.input_tokens,
+                output_tokens=stats.output_tokens,
+                cache_read_input_tokens=stats.cache_read_input_tokens,
+                cache_write_input_tokens=stats.cache_write_input_tokens,
+                total_latency_ms=stats.total_latency_ms,
+                latency_buckets=list(stats.latency_buckets),
+            )
+
+    def latency_percentile(self, variant_name: str, quantile: float) -> Optional[float]:
+        """
+        Estimate a latency percentile (ms) for a variant from its histogram.
+
+        Returns the upper bound of the bucket containing the quantile, or None
+        if no latencies were recorded. The open-ended bucket reports infinity.
+        """
+        buckets = self.variant(variant_name).latency_buckets
+        total = sum(buckets)
+        if not total:
+            return None
+
+        target = quantile * total
+        seen = 0
+        for i, count in enumerate(buckets):
+            seen += count
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def totals(self) -> VariantUsage:
+        """Get usage summed across all variants."""
+        total = VariantUsage()
+        with self._lock:
+            for stats in self._variants.values():
+                total.calls += stats.calls
+                total.input_tokens += stats.input_tokens
+                total.output_tokens += stats.output_tokens
+                total.cache_read_input_tokens += stats.cache_read_input_tokens
+                total.cache_write_input_tokens += stats.cache_write_input_tokens
+                total.total_latency_ms += stats.total_latency_ms
+                total.latency_buckets = [a + b for a, b in zip(total.latency_buckets, stats.latency_buckets)]
+        return total
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Get a JSON-serializable view of usage, keyed by variant name."""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._variants.items()}
+
+    def reset(self) -> None:
+        """Clear all recorded usage."""
+        with self._lock:
+            self._variants.clear()
+
+
+_process_usage = UsageAccumulator()
+
+
+def process_usage() -> UsageAccumulator:
+    """Get the process-wide usage accumulator."""
+    return _process_usage
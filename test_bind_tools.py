@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that bound tools reach TensorZero as dynamic tools.
+"""
+
+import gc
+import sys
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero_scratch.langgraph_agent import current_time, python_calculator, text_analyzer
+from langchain_core.tools import tool
+
+from tensorzero_scratch import tensorzero_chat_model
+from tensorzero_scratch.tensorzero_chat_model import TensorZeroChatModel, _tool_definition
+
+
+def test_bind_tools():
+    """Test tool serialization, caching and per-request subsetting."""
+    print("🧪 Testing bind_tools")
+    print("=" * 40)
+
+    model = TensorZeroChatModel(function_name="agent_chat")
+    bound = model.bind_tools([python_calculator, current_time, text_analyzer], tool_choice="any")
+
+    additional_tools = bound.kwargs["additional_tools"]
+    assert [t["name"] for t in additional_tools] == ["python_calculator", "current_time", "text_analyzer"]
+    assert additional_tools[0]["parameters"]["required"] == ["expression"]
+    assert "Args:" not in additional_tools[0]["description"]
+    assert bound.kwargs["tool_choice"] == "required"
+
+    # Serialized once and reused
+    assert _tool_definition(python_calculator) is additional_tools[0]
+
+    # The cache does not keep tools alive, and drops a tool's entry once it is collected
+    @tool
+    def scratch_tool(text: str) -> str:
+        """Echo a text."""
+        return text
+
+    assert _tool_definition(scratch_tool)["name"] == "scratch_tool"
+    key = id(scratch_tool)
+    assert key in tensorzero_chat_model._TOOL_DEFINITION_CACHE
+    del scratch_tool
+    gc.collect()
+    assert key not in tensorzero_chat_model._TOOL_DEFINITION_CACHE
+
+    # All bound and configured tools by default
+    params = model._tool_params(**bound.kwargs)
+    assert len(params["additional_tools"]) == 3
+    assert "allowed_tools" not in params
+
+    # Per-request subset mixing a bound tool and a configured tool
+    params = model._tool_params(**bound.kwargs, allowed_tools=["python_calculator", "get_weather"])
+    assert [t["name"] for t in params["additional_tools"]] == ["python_calculator"]
+    assert params["allowed_tools"] == ["get_weather"]
+
+    # Model-level default excludes every configured tool
+    local_only = TensorZeroChatModel(function_name="agent_chat", allowed_tools=["text_analyzer"])
+    params = local_only._tool_params(**bound.kwargs)
+    assert [t["name"] for t in params["additional_tools"]] == ["text_analyzer"]
+    assert params["allowed_tools"] == []
+
+    print(f"Tool definitions: {[t['name'] for t in additional_tools]}")
+    print("\n✅ bind_tools testing completed!")
+
+
+if __name__ == "__main__":
+    test_bind_tools()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the durable conversation store.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from tensorzero_scratch.conversation_store import ConversationStore
+
+
+def _turn(i: int) -> list:
+    return [
+        HumanMessage(content=f"question {i}"),
+        AIMessage(content="", tool_calls=[{"name": "python_calculator", "args": {"expression": f"{i} + 1"}, "id": f"call_{i}"}]),
+        ToolMessage(content=f"{i + 1}", name="python_calculator", tool_call_id=f"call_{i}"),
+        AIMessage(content=f"answer {i}"),
+    ]
+
+
+def test_conversation_store():
+    """Test incremental appends, windowed resume and lazy paging."""
+    print("🧪 Testing Conversation Store")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "conversations.db"
+
+        with ConversationStore(path) as store:
+            for i in range(1000):
+                for message in _turn(i):
+                    store.append("long-session", [message])
+            store.append("other-session", _turn(0))
+
+        # Simulate a worker restart
+        with ConversationStore(path) as store:
+            start = time.perf_counter()
+            recent = store.load_recent("long-session", turns=5)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            assert len(recent) == 20
+            assert isinstance(recent[0], HumanMessage)
+            assert recent[0].content == "question 995"
+            assert recent[-1].content == "answer 999"
+            assert recent[2].tool_call_id == "call_995"
+            assert store.count("long-session") == 4000
+            assert sorted(store.sessions()) == ["long-session", "other-session"]
+
+            older = store.iter_older("long-session", turns=5, page_size=8)
+            assert next(older).content == "answer 994"
+            assert sum(1 for _ in older) == 3980 - 1
+
+            # Appends continue the sequence after resume
+            store.append("long-session", [HumanMessage(content="question 1000")])
+            assert store.load_recent("long-session", turns=1)[0].content == "question 1000"
+
+            store.delete("other-session")
+            assert store.sessions() == ["long-session"]
+
+    print(f"Resumed 5 of 1000 turns in {elapsed_ms:.2f} ms")
+    print("\n✅ Conversation store testing completed!")
+
+
+def test_shared_store_file():
+    """Test two stores (e.g. two server workers) appending to one session, and session leases."""
+    print("\n🧪 Testing Shared Store File")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "conversations.db"
+        with ConversationStore(path) as first, ConversationStore(path) as second:
+            # A session's turns alternate between workers
+            for i in range(3):
+                first.append("s", _turn(2 * i))
+                second.append("s", _turn(2 * i + 1))
+            assert first.count("s") == second.count("s") == 24
+            assert [m.content for m in second.load_recent("s", turns=2)][::4] == ["question 4", "question 5"]
+
+            # Only one worker at a time may run a session's turn
+            assert first.acquire_lease("s", "worker-1")
+            assert not second.acquire_lease("s", "worker-2")
+            assert first.acquire_lease("s", "worker-1")  # renewal
+            assert first.renew_lease("s", "worker-1")
+            assert not second.renew_lease("s", "worker-2")
+            first.release_lease("s", "worker-1")
+            # Renewing never re-creates a released lease
+            assert not first.renew_lease("s", "worker-1")
+            assert second.acquire_lease("s", "worker-2")
+            # Expired leases (e.g. from a crashed worker) can be taken over
+            assert second.acquire_lease("t", "worker-2", ttl=-1)
+            assert first.acquire_lease("t", "worker-1")
+
+    print("\n✅ Shared store testing completed!")
+
+
+if __name__ == "__main__":
+    test_conversation_store()
+    test_shared_store_file()
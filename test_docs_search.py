@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local documentation search index.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero_scratch.docs_search import DocsIndex, chunk_markdown, default_docs_dir, default_index_path
+
+DOC = """# Guide
+
+## Feedback
+
+Submit feedback with `client.feedback` for the user_rating metric.
+
+```python
+# Not a heading
+client.feedback(metric_name="user_rating", value=0.9)
+```
+
+## Variants
+
+Variants route traffic between providers like OpenAI and Anthropic.
+"""
+
+
+def test_docs_search():
+    """Test chunking, BM25 ranking, persistence and incremental reindexing."""
+    print("🧪 Testing Docs Search")
+    print("=" * 40)
+
+    chunks = chunk_markdown(DOC)
+    assert [heading for heading, _ in chunks] == ["Guide > Feedback", "Guide > Variants"]
+    assert "# Not a heading" in chunks[0][1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_dir = Path(tmp) / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "guide.md").write_text(DOC)
+        index_path = Path(tmp) / "index.bin"
+
+        index = DocsIndex(docs_dir, index_path)
+        hits = index.search("how do I send feedback", k=2)
+        assert hits[0].heading == "Guide > Feedback"
+        assert hits[0].source == "guide.md"
+        assert index.search("nonexistentterm") == []
+
+        # Reopening maps the persisted index without rebuilding it
+        reopened = DocsIndex(docs_dir, index_path)
+        assert not reopened.refresh()
+        start = time.perf_counter()
+        for _ in range(1000):
+            reopened.search("anthropic providers variants")
+        per_query_ms = (time.perf_counter() - start)
+        assert per_query_ms < 1.0, f"{per_query_ms:.3f} ms per query"
+
+        # Adding a file only indexes the new file; existing chunks come from the manifest
+        (docs_dir / "embedded.md").write_text("# Embedded\n\nRun the gateway in-process with build_embedded.\n")
+        assert reopened.refresh()
+        assert reopened.search("build_embedded")[0].source == "embedded.md"
+        assert reopened.num_docs == 3
+
+        (docs_dir / "embedded.md").unlink()
+        assert reopened.refresh()
+        assert reopened.search("build_embedded") == []
+
+        # Chunk text is stored once, in the chunks block, not again in the manifest
+        assert "text" not in json.dumps(reopened._snapshot.manifest)
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["docs", "index.bin"]
+
+        # Searches keep working on their snapshot while other threads refresh
+        errors = []
+
+        def search_loop():
+            try:
+                for _ in range(300):
+                    assert reopened.search("feedback")[0].heading == "Guide > Feedback"
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=search_loop) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(20):
+            (docs_dir / "extra.md").write_text(f"# Extra {i}\n\nMore words about variants {i}.\n")
+            assert reopened.refresh()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+        # The tool path re-checks the docs at most once per refresh interval
+        edited = DocsIndex(docs_dir, index_path, refresh_interval=0.05)
+        (docs_dir / "guide.md").write_text(DOC + "\n## Episodes\n\nGroup inferences with an episode_id.\n")
+        assert not edited.refresh_if_due()
+        time.sleep(0.06)
+        assert edited.refresh_if_due()
+        assert edited.search("episode_id")[0].heading == "Guide > Episodes"
+
+        # Paths come from the environment when not given, and a missing docs dir fails clearly
+        os.environ["TENSORZERO_DOCS_DIR"] = str(docs_dir)
+        try:
+            assert default_index_path(default_docs_dir()) == Path(tmp).resolve() / ".cache" / "docs_index.bin"
+        finally:
+            del os.environ["TENSORZERO_DOCS_DIR"]
+        try:
+            DocsIndex(Path(tmp) / "missing", index_path)
+            raise AssertionError("expected FileNotFoundError")
+        except FileNotFoundError as e:
+            assert "TENSORZERO_DOCS_DIR" in str(e)
+
+        index.close()
+        reopened.close()
+        edited.close()
+
+    print(f"Average query time: {per_query_ms:.4f} ms")
+    print("\n✅ Docs search testing completed!")
+
+
+if __name__ == "__main__":
+    test_docs_search()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the background feedback queue.
+"""
+
+import asyncio
+import atexit
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero_scratch.feedback import FeedbackQueue
+
+
+class FakeFeedbackClient:
+    """Async stand-in for AsyncTensorZeroGateway that can fail on demand."""
+
+    def __init__(self, failures: int = 0, status_code: int = 503):
+        self.failures = failures
+        self.status_code = status_code
+        self.received = []
+
+    async def feedback(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            error = RuntimeError("gateway unavailable")
+            error.status_code = self.status_code
+            raise error
+        self.received.append(kwargs)
+
+
+def test_feedback_queue():
+    """Test batched delivery with retries."""
+    print("🧪 Testing Feedback Queue")
+    print("=" * 40)
+
+    client = FakeFeedbackClient(failures=2)
+    with FeedbackQueue(client=client, flush_interval=0.01, retry_backoff=0.001) as feedback:
+        for i in range(100):
+            assert feedback.submit("user_rating", i / 100, inference_id=uuid4())
+        assert feedback.flush(timeout=5)
+
+    assert len(client.received) == 100
+    assert feedback.stats.delivered == 100
+    print(f"Stats: {feedback.stats.to_dict()}")
+    print("\n✅ Feedback queue testing completed!")
+
+
+def test_feedback_spool():
+    """Test that overflow and undeliverable feedback survive a restart."""
+    print("\n🧪 Testing Feedback Spool")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = Path(tmp) / "spool.jsonl"
+
+        # Gateway is down for longer than the retry budget
+        down = FakeFeedbackClient(failures=1000)
+        with FeedbackQueue(client=down, spool_path=spool, max_queue_size=5, flush_interval=0.01, max_retries=1, retry_backoff=0.001) as feedback:
+            queued = [feedback.submit("helpful", True, inference_id=uuid4()) for _ in range(20)]
+        assert queued.count(False) > 0
+        assert len(spool.read_text().splitlines()) == 20
+
+        # Gateway recovers: spooled feedback is delivered on the next start
+        up = FakeFeedbackClient()
+        with FeedbackQueue(client=up, spool_path=spool, max_queue_size=50, flush_interval=0.01) as feedback:
+            assert feedback.flush(timeout=5)
+        assert len(up.received) == 20
+        assert not spool.exists()
+
+        # Client errors are permanent and are not spooled
+        bad = FakeFeedbackClient(failures=1, status_code=400)
+        with FeedbackQueue(client=bad, spool_path=spool, flush_interval=0.01) as feedback:
+            feedback.submit("user_rating", 2.0, inference_id=uuid4())
+        assert feedback.stats.rejected == 1
+        assert not spool.exists()
+
+    print("\n✅ Feedback spool testing completed!")
+
+
+def test_feedback_failures():
+    """Test that dropped feedback is counted and a failed sender does not block flush()."""
+    print("\n🧪 Testing Feedback Failures")
+    print("=" * 40)
+
+    # Without a spool, overflow is counted as dropped and reported
+    down = FakeFeedbackClient(failures=1000)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with FeedbackQueue(client=down, max_queue_size=2, flush_interval=0.01, max_retries=0) as feedback:
+            queued = [feedback.submit("helpful", True, inference_id=uuid4()) for _ in range(10)]
+    assert queued.count(False) > 0
+    assert feedback.stats.dropped == 10
+    assert any("Dropped" in str(w.message) for w in caught)
+
+    # The sender cannot build its client: the failure is recorded and queued feedback is spooled
+    with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        spool = Path(tmp) / "spool.jsonl"
+        feedback = FeedbackQueue(gateway_url="not a url", spool_path=spool).start()
+        for _ in range(3):
+            feedback.submit("user_rating", 0.5, inference_id=uuid4())
+        start = time.perf_counter()
+        assert feedback.flush(timeout=5)
+        assert time.perf_counter() - start < 1
+        feedback.close()
+        assert isinstance(feedback.error, ValueError)
+        assert len(spool.read_text().splitlines()) == 3
+        assert feedback.stats.submitted == feedback.stats.spooled == 3
+
+    print(f"Sender error: {feedback.error!r}")
+    print("\n✅ Feedback failure testing completed!")
+
+
+def test_feedback_restore_crash_safety():
+    """Test that restored feedback stays on disk until sent, and that closed queues do not queue."""
+    print("\n🧪 Testing Feedback Restore Crash Safety")
+    print("=" * 40)
+
+    class HangingClient:
+        async def feedback(self, **kwargs):
+            await asyncio.Event().wait()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = Path(tmp) / "spool.jsonl"
+        restoring = Path(tmp) / "spool.jsonl.restoring"
+        with FeedbackQueue(client=FakeFeedbackClient(failures=1000), spool_path=spool, max_retries=0, flush_interval=0.01) as feedback:
+            for _ in range(3):
+                feedback.submit("helpful", True, inference_id=uuid4())
+        assert len(spool.read_text().splitlines()) == 3
+
+        # The worker "crashes" while the restored items are in flight: they are still on disk
+        crashed = FeedbackQueue(client=HangingClient(), spool_path=spool, flush_interval=0.01).start()
+        atexit.unregister(crashed.close)
+        assert not crashed.flush(timeout=0.2)
+        assert not spool.exists()
+        assert len(restoring.read_text().splitlines()) == 3
+
+        # The next start picks them up again and removes them once delivered
+        up = FakeFeedbackClient()
+        with FeedbackQueue(client=up, spool_path=spool, flush_interval=0.01) as feedback:
+            assert feedback.flush(timeout=5)
+            assert not restoring.exists()
+        assert len(up.received) == 3
+        assert not spool.exists()
+
+        # Feedback submitted after close() is spooled, not left in memory
+        assert not feedback.submit("helpful", False, inference_id=uuid4())
+        assert feedback.pending == 0
+        assert len(spool.read_text().splitlines()) == 1
+
+    # Without a spool it is dropped and counted
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with FeedbackQueue(client=FakeFeedbackClient(), flush_interval=0.01) as feedback:
+            pass
+        assert not feedback.submit("helpful", True)
+    assert feedback.stats.dropped == 1 and feedback.pending == 0
+
+    print("\n✅ Feedback restore testing completed!")
+
+
+if __name__ == "__main__":
+    test_feedback_queue()
+    test_feedback_spool()
+    test_feedback_failures()
+    test_feedback_restore_crash_safety()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the process-wide gateway client registry.
+"""
+
+import http.server
+import sys
+import threading
+import warnings
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero_scratch import gateway_pool
+from tensorzero_scratch.tensorzero_chat_model import TensorZeroChatModel
+
+
+def test_gateway_pool():
+    """Test that models share clients per gateway URL and mode."""
+    print("🧪 Testing Gateway Pool")
+    print("=" * 40)
+
+    # Start from an empty registry so the clients below are built with this config
+    gateway_pool.close_all()
+    config = gateway_pool.configure_pool(max_connections=50, max_keepalive_connections=10)
+    assert config.max_connections == 50
+
+    # The native clients cannot honor connection limits, so they warn about them
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        first = TensorZeroChatModel(gateway_url="http://localhost:3000")
+    assert any("max_connections" in str(w.message) for w in caught)
+    second = TensorZeroChatModel(gateway_url="http://localhost:3000/")
+    other = TensorZeroChatModel(gateway_url="http://localhost:3001")
+    assert first.gateway is second.gateway
+    assert first.gateway is not other.gateway
+
+    http_client = gateway_pool.get_http_client("http://localhost:3000")
+    assert http_client is gateway_pool.get_http_client("http://localhost:3000")
+    assert http_client is not first.gateway
+
+    # Embedded gateways are keyed by config file, not URL
+    embedded = TensorZeroChatModel(gateway_mode="embedded")
+    assert embedded.gateway is gateway_pool.get_embedded_gateway(gateway_pool.DEFAULT_CONFIG_FILE)
+    assert embedded.gateway is not first.gateway
+
+    # Nothing listens on this port, so warm-up reports it unhealthy without raising
+    assert gateway_pool.warm_up(["http://127.0.0.1:9"], connections=2) == {"http://127.0.0.1:9": False}
+
+    gateway_pool.close_all()
+    assert gateway_pool.get_http_client("http://localhost:3000") is not http_client
+    gateway_pool.configure_pool(max_connections=100, max_keepalive_connections=20)
+    assert gateway_pool.pool_config().unsupported_by_native() == []
+
+    # Warm-up reaches the gateway over both the pooled httpx client and the native client
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(("GET", self.path))
+            self.send_response(200)
+            self.end_headers()
+
+        def do_POST(self):
+            requests.append(("POST", self.path))
+            self.send_response(404)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert gateway_pool.warm_up([url], connections=2) == {url: True}
+    finally:
+        server.shutdown()
+        gateway_pool.close_all()
+    assert requests.count(("GET", "/health")) == 2
+    assert any(method == "POST" for method, _ in requests)
+
+    print("\n✅ Gateway pool testing completed!")
+
+
+if __name__ == "__main__":
+    test_gateway_pool()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script to verify incremental JSON parsing of streamed json functions.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero import Usage
+from tensorzero.types import JsonChunk
+
+from tensorzero_scratch.json_stream import IncrementalJsonParser, OutputValidationError, load_output_schema, stream_json_function
+
+
+class FakeGateway:
+    """Streams a fixed analyze_sentiment output a few characters at a time."""
+
+    def __init__(self, output, size=4):
+        self.output = output
+        self.size = size
+        self.sent = 0
+        self.closed = False
+        self.calls = []
+
+    def inference(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._chunks()
+
+    def _chunks(self):
+        ids = dict(inference_id=uuid4(), episode_id=uuid4(), variant_name="gpt4_json")
+        try:
+            for start in range(0, len(self.output), self.size):
+                self.sent = start + self.size
+                yield JsonChunk(**ids, raw=self.output[start:start + self.size])
+            yield JsonChunk(**ids, raw="", usage=Usage(input_tokens=40, output_tokens=30))
+        except GeneratorExit:
+            self.closed = True
+            raise
+
+
+OUTPUT = '{"sentiment": "positive", "confidence": 0.92, "explanation": "The reviewer loved the \\"quiet\\" motor."}'
+
+
+def test_json_stream():
+    """Test field-by-field parsing, schema validation and early cancellation."""
+    print("🧪 Testing Streaming JSON Functions")
+    print("=" * 40)
+
+    # Fields complete as soon as their value does, whatever the chunking
+    for size in (1, 3, len(OUTPUT)):
+        parser = IncrementalJsonParser()
+        fields = [field for start in range(0, len(OUTPUT), size) for field in parser.feed(OUTPUT[start:start + size])]
+        assert fields == [("sentiment", "positive"), ("confidence", 0.92), ("explanation", 'The reviewer loved the "quiet" motor.')]
+        assert parser.done
+    parser = IncrementalJsonParser()
+    assert parser.feed('```json\n{"tags": ["a", {"b": "}"}], "n": 1') == [("tags", ["a", {"b": "}"}])]
+    assert parser.feed("}") == [("n", 1)]
+
+    schema = load_output_schema("analyze_sentiment")
+    assert schema["required"] == ["sentiment", "confidence", "explanation"]
+
+    # A full stream yields every field and validates the finished object
+    gateway = FakeGateway(OUTPUT)
+    stream = stream_json_function("analyze_sentiment", {"system": {"text": "hi"}, "messages": []}, gateway=gateway)
+    assert [field.name for field in stream] == ["sentiment", "confidence", "explanation"]
+    assert stream.result["confidence"] == 0.92 and stream.usage.output_tokens == 30
+    assert gateway.calls[0]["stream"] is True and not stream.cancelled
+
+    # stop_after cancels the generation once the needed fields have arrived
+    gateway = FakeGateway(OUTPUT)
+    stream = stream_json_function("analyze_sentiment", {"messages": []}, stop_after={"sentiment"}, gateway=gateway)
+    assert stream.collect() == {"sentiment": "positive"}
+    assert stream.cancelled and gateway.closed and gateway.sent < len(OUTPUT) / 2
+
+    # Fields are validated against output_schema.json as they complete
+    for bad in ('{"sentiment": "ecstatic", ', '{"sentiment": "positive", "confidence": 1.5,', '{"mood": "ok",'):
+        gateway = FakeGateway(bad)
+        stream = stream_json_function("analyze_sentiment", {"messages": []}, gateway=gateway)
+        try:
+            stream.collect()
+            raise AssertionError(f"{bad!r} should not validate")
+        except OutputValidationError as e:
+            print(f"Rejected: {e}")
+        assert stream.cancelled and gateway.closed
+
+    # A complete object missing a required field fails at the end
+    stream = stream_json_function("analyze_sentiment", {"messages": []}, gateway=FakeGateway('{"sentiment": "neutral", "confidence": 0.5}'))
+    try:
+        stream.collect()
+        raise AssertionError("missing explanation should not validate")
+    except OutputValidationError as e:
+        assert "explanation" in str(e)
+
+    print("\n✅ Streaming JSON testing completed!")
+
+
+if __name__ == "__main__":
+    test_json_stream()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that the LangGraph agent keeps a session in one TensorZero episode.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero import ChatInferenceResponse, Text, ToolCall, ToolResult, Usage
+
+from tensorzero_scratch.conversation_store import ConversationStore
+from tensorzero_scratch.langgraph_agent import TensorZeroLangGraphAgent
+from tensorzero_scratch.renderers import NullRenderer
+
+
+class FakeGateway:
+    """Asks for the calculator once per turn, then answers; continues whatever episode it is sent."""
+
+    def __init__(self):
+        self.episode_ids = []
+
+    def inference(self, input, episode_id=None, **kwargs):
+        self.episode_ids.append(episode_id)
+        last = input["messages"][-1]
+        answered = isinstance(last["content"], list) and isinstance(last["content"][0], ToolResult)
+        ids = dict(inference_id=uuid4(), episode_id=episode_id or uuid4(), variant_name="gpt4_mini")
+        if answered:
+            content = [Text(text="The answer is 17.")]
+        else:
+            content = [ToolCall(id="call_1", raw_name="python_calculator", raw_arguments='{"expression": "sqrt(144) + 5"}',
+                                name="python_calculator", arguments={"expression": "sqrt(144) + 5"})]
+        return ChatInferenceResponse(**ids, content=content, usage=Usage(input_tokens=50, output_tokens=5))
+
+
+def test_langgraph_episode():
+    """Test that every step of every turn, starting with the first, shares the session's episode."""
+    print("🧪 Testing LangGraph Agent Episodes")
+    print("=" * 40)
+
+    gateway = FakeGateway()
+    store = ConversationStore(":memory:")
+    agent = TensorZeroLangGraphAgent(variant_name="gpt4_mini", renderer=NullRenderer(), store=store)
+    # The compiled graph shares this (cached) model, so swapping its client is enough
+    agent.llm.gateway = gateway
+
+    assert [m.type for m in agent.run_turn("What's sqrt(144) + 5?")] == ["ai", "tool", "ai"]
+    assert [m.type for m in agent.run_turn("And again?")] == ["ai", "tool", "ai"]
+    assert len(gateway.episode_ids) == 4
+    assert set(gateway.episode_ids) == {agent.episode_id}
+
+    # A resumed session continues the stored episode instead of starting a new one
+    resumed = TensorZeroLangGraphAgent(variant_name="gpt4_mini", renderer=NullRenderer(), store=store, session_id=agent.session_id)
+    assert resumed.episode_id == agent.episode_id
+    # A new session starts a new one
+    assert TensorZeroLangGraphAgent(variant_name="gpt4_mini", renderer=NullRenderer()).episode_id != agent.episode_id
+
+    print(f"Episode: {agent.episode_id}")
+    print("\n✅ LangGraph agent episode testing completed!")
+
+
+if __name__ == "__main__":
+    test_langgraph_episode()
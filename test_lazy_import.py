@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script to verify lazy package imports and the shared agent graph.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+import tensorzero_scratch
+from tensorzero_scratch.langgraph_agent import TensorZeroLangGraphAgent, build_agent_graph
+
+
+def test_lazy_import():
+    """Test that importing the package defers its heavy dependencies."""
+    print("🧪 Testing Lazy Package Import")
+    print("=" * 40)
+
+    script = (
+        f"import sys; sys.path.insert(0, {str(src_path)!r}); import tensorzero_scratch; "
+        "print(sorted(m for m in ('langchain', 'langchain_core', 'langgraph', 'pandas', 'rich') if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout.strip()
+    assert loaded == "[]", loaded
+
+    # Public names resolve on first access and are then cached on the module
+    assert tensorzero_scratch.CompactHistory.__module__ == "tensorzero_scratch.compact_messages"
+    assert "CompactHistory" in vars(tensorzero_scratch)
+    assert "TensorZeroLangGraphAgent" in dir(tensorzero_scratch)
+    try:
+        tensorzero_scratch.DoesNotExist
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
+
+    print(f"Heavy modules loaded by import: {loaded}")
+    print("\n✅ Lazy import testing completed!")
+
+
+def test_shared_agent_graph():
+    """Test that sessions reuse one compiled graph per gateway configuration."""
+    print("🧪 Testing Shared Agent Graph")
+    print("=" * 40)
+
+    first = TensorZeroLangGraphAgent(gateway_url="http://localhost:3000")
+    second = TensorZeroLangGraphAgent(gateway_url="http://localhost:3000")
+    assert first.agent is second.agent
+    assert first.agent is build_agent_graph("http", "http://localhost:3000", None, None, None)
+    assert first.session_id != second.session_id
+    assert first.conversation_history is not second.conversation_history
+
+    other = TensorZeroLangGraphAgent(gateway_url="http://localhost:3001")
+    assert other.agent is not first.agent
+
+    print(f"Cached graphs: {build_agent_graph.cache_info().currsize}")
+    print("\n✅ Shared graph testing completed!")
+
+
+if __name__ == "__main__":
+    test_lazy_import()
+    test_shared_agent_graph()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the native TensorZero ReAct agent.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero import ChatInferenceResponse, Text, TextChunk, ToolCall, ToolCallChunk, ToolResult, Usage
+from tensorzero.types import ChatChunk
+
+from tensorzero_scratch.conversation_store import ConversationStore
+from tensorzero_scratch.langgraph_agent import AgentSession
+from tensorzero_scratch.native_agent import NativeReActAgent
+from tensorzero_scratch.renderers import Renderer
+
+
+class FakeGateway:
+    """Asks for the calculator until a tool result comes back, then answers."""
+
+    def __init__(self):
+        self.calls = []
+        self.episode_id = uuid4()
+
+    def inference(self, **kwargs):
+        self.calls.append(kwargs)
+        last = kwargs["input"]["messages"][-1]
+        answered = isinstance(last["content"], list) and isinstance(last["content"][0], ToolResult)
+        # Like the gateway, continue the episode a request names
+        ids = dict(inference_id=uuid4(), episode_id=kwargs["episode_id"] or self.episode_id, variant_name="gpt4_mini")
+        usage = Usage(input_tokens=50, output_tokens=5)
+        if kwargs["stream"]:
+            if answered:
+                content = [[TextChunk(id="0", text="The answer ")], [TextChunk(id="0", text="is 17.")]]
+            else:
+                content = [
+                    [ToolCallChunk(id="call_1", raw_name="calculator", raw_arguments='{"expr')],
+                    [ToolCallChunk(id="call_1", raw_name="", raw_arguments='ession": "sqrt(144) + 5"}')],
+                ]
+            return iter([ChatChunk(**ids, content=blocks) for blocks in content] + [ChatChunk(**ids, content=[], usage=usage)])
+        if answered:
+            return ChatInferenceResponse(**ids, content=[Text(text="The answer is 17.")], usage=usage)
+        call = ToolCall(id="call_1", raw_name="calculator", raw_arguments='{"expression": "sqrt(144) + 5"}',
+                        name="calculator", arguments={"expression": "sqrt(144) + 5"})
+        return ChatInferenceResponse(**ids, content=[call], usage=usage)
+
+
+class RecordingRenderer(Renderer):
+    streaming = True
+
+    def __init__(self):
+        self.tokens, self.messages = [], []
+
+    def token(self, text):
+        self.tokens.append(text)
+
+    def message(self, message):
+        self.messages.append(message.type)
+
+
+def test_native_agent():
+    """Test the ReAct loop: streamed tool calls, local execution and episode continuity."""
+    print("🧪 Testing Native ReAct Agent")
+    print("=" * 40)
+
+    gateway = FakeGateway()
+    renderer = RecordingRenderer()
+    store = ConversationStore(":memory:")
+    agent = NativeReActAgent(gateway=gateway, renderer=renderer, store=store, variant_name="gpt4_mini")
+
+    new_messages = agent.run_turn("What's sqrt(144) + 5?")
+    assert [m.type for m in new_messages] == ["ai", "tool", "ai"]
+    assert new_messages[0].tool_calls[0]["args"] == {"expression": "sqrt(144) + 5"}
+    assert new_messages[1].content == "Python Calculator Result: sqrt(144) + 5 = 17.0"
+    assert new_messages[2].content == "The answer is 17."
+    assert renderer.tokens == ["The answer ", "is 17."]
+    assert renderer.messages == ["ai", "tool", "ai"]
+
+    # Every step, from the first, is sent under the session's episode
+    assert {call["episode_id"] for call in gateway.calls} == {agent.episode_id}
+    first = gateway.calls[0]
+    assert first["function_name"] == "agent_chat" and first["variant_name"] == "gpt4_mini"
+    assert first["allowed_tools"] == ["calculator", "search_tensorzero_docs"]
+    assert [t["name"] for t in first["additional_tools"]] == ["text_analyzer"]
+    assert agent.usage.totals().input_tokens == 100
+
+    # A resumed session continues the stored episode
+    resumed = NativeReActAgent(gateway=gateway, renderer=RecordingRenderer(), store=store, session_id=agent.session_id, stream=False)
+    assert resumed.episode_id == agent.episode_id
+    assert [m.type for m in resumed.run_turn("Again?")] == ["ai", "tool", "ai"]
+    assert store.count(agent.session_id) == 8
+
+    # Executors the function's config does not define are sent as dynamic tools
+    def word_count(text: str) -> int:
+        """Count the words in a text."""
+        return len(text.split())
+
+    extended = NativeReActAgent(gateway=gateway, renderer=RecordingRenderer(), executors={"count_words": word_count})
+    assert extended.allowed_tools == ["calculator", "search_tensorzero_docs"]
+    assert [t["name"] for t in extended.additional_tools] == ["text_analyzer", "count_words"]
+    assert NativeReActAgent(gateway=gateway, function_name="missing").allowed_tools == []
+
+    # The shared session base cannot run turns on its own
+    try:
+        AgentSession()
+        raise AssertionError("expected TypeError")
+    except TypeError:
+        pass
+
+    # Unknown tools and invalid arguments come back to the model as tool results
+    assert "not available" in agent._execute({"name": "get_weather", "args": {}, "id": "x"}).content
+    assert "Invalid JSON" in agent._execute({"name": "calculator", "args": {"__invalid_arguments__": "{"}, "id": "y"}).content
+
+    print(f"Gateway calls: {len(gateway.calls)}")
+    print("\n✅ Native agent testing completed!")
+
+
+if __name__ == "__main__":
+    test_native_agent()
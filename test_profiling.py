@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-turn CPU and allocation profiling.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tensorzero import ChatInferenceResponse, Text, Usage
+
+from tensorzero_scratch.native_agent import NativeReActAgent
+from tensorzero_scratch.profiling import WAITING_FRAME, SessionProfiler, profile
+from tensorzero_scratch.renderers import Renderer
+
+
+class SlowGateway:
+    """Blocks like a network call, then answers."""
+
+    def inference(self, **kwargs):
+        time.sleep(0.15)
+        return ChatInferenceResponse(
+            inference_id=uuid4(),
+            episode_id=uuid4(),
+            variant_name="gpt4_mini",
+            content=[Text(text="Hello!")],
+            usage=Usage(input_tokens=10, output_tokens=2),
+        )
+
+
+class InfoRenderer(Renderer):
+    def __init__(self):
+        self.infos = []
+
+    def info(self, text):
+        self.infos.append(text)
+
+
+def burn_cpu(seconds):
+    """Busy loop that also keeps some allocations alive."""
+    kept, end = [], time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        kept.append(str(len(kept)) * 10)
+    return kept
+
+
+def test_turn_profiling():
+    """Test that a profiled turn separates waiting from running and writes folded stacks."""
+    print("🧪 Testing Turn Profiling")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        renderer = InfoRenderer()
+        agent = NativeReActAgent(gateway=SlowGateway(), renderer=renderer, stream=False)
+        agent.profiler = SessionProfiler(output_dir, session_id=agent.session_id, interval=0.005)
+        agent._chat_turn("Hi")
+        agent._chat_turn("Hi again")
+
+        turn = agent.profiler.turns[0]
+        assert turn.wall_ms >= 150 and turn.cpu_ms < turn.wall_ms / 2
+        assert turn.samples > 0 and turn.waiting_share > 0.5
+        assert any(stack.endswith(WAITING_FRAME) and "inference (test_profiling.py" in stack for stack in turn.stacks)
+        assert turn.peak_memory_kb is None  # allocation sites are opt-in
+        assert len(renderer.infos) == 2 and renderer.infos[0].startswith("⏱️  Turn 1:")
+
+        # Folded stacks: "frame;frame;... count", rooted at the turn
+        lines = agent.profiler.folded_path.read_text().splitlines()
+        assert {line.split(";", 1)[0] for line in lines} == {"turn-1", "turn-2"}
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert len(agent.profiler.summary_path.read_text().splitlines()) == 2
+
+        # A CPU-bound block is mostly running, and allocation sites point at the code
+        with profile(output_dir, name="cpu", interval=0.005, allocations=True) as block:
+            kept = burn_cpu(0.2)
+        assert block.cpu_share > 0.5 and block.waiting_share < 0.5
+        assert block.peak_memory_kb > 0 and "test_profiling.py" in block.top_allocations[0]["location"]
+        assert any("burn_cpu" in name for name, _ in block.top_functions())
+        assert (Path(output_dir) / "cpu.folded").exists()
+        del kept
+
+        print(turn.summary())
+        print(block.summary())
+    print("\n✅ Profiling testing completed!")
+
+
+if __name__ == "__main__":
+    test_turn_profiling()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script to verify stable-prefix prompt caching support.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from tensorzero import ChatInferenceResponse, Message, Text, ToolResult, Usage
+
+from tensorzero_scratch.compact_messages import CompactHistory
+from tensorzero_scratch.langgraph_agent import python_calculator
+from tensorzero_scratch.prompt_cache import cache_extra_body, normalize_messages, prefix_key, usage_metadata, variant_providers
+from tensorzero_scratch.tensorzero_chat_model import TensorZeroChatModel, _tool_definition
+from tensorzero_scratch.usage import UsageAccumulator
+
+
+class FakeGateway:
+    """Records requests and reports a cache hit on every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def inference(self, **kwargs):
+        self.calls.append(kwargs)
+        return ChatInferenceResponse(
+            inference_id=uuid4(),
+            episode_id=uuid4(),
+            variant_name=kwargs["variant_name"],
+            content=[Text(text="Hi!")],
+            usage=Usage(input_tokens=3000, output_tokens=5, provider_cache_read_input_tokens=2048, provider_cache_write_input_tokens=0),
+        )
+
+
+def test_cache_markers():
+    """Test per-provider cache breakpoints and prompt cache keys."""
+    print("🧪 Testing Prompt Cache Markers")
+    print("=" * 40)
+
+    providers = variant_providers("agent_chat")
+    assert providers == {"gpt4": "openai", "gpt4_mini": "openai", "claude3_haiku": "anthropic"}
+
+    # Consecutive tool results become one message, so message indexes are known
+    messages = normalize_messages([
+        Message(role="user", content="Compute two things"),
+        Message(role="user", content=[ToolResult(name="calculator", result="2", id="a")]),
+        Message(role="user", content=[ToolResult(name="calculator", result="3", id="b")]),
+    ])
+    assert len(messages) == 1 and len(messages[0]["content"]) == 3
+
+    tools = [_tool_definition(python_calculator)]
+    anthropic = cache_extra_body("agent_chat", "You are helpful.", tools, messages, "claude3_haiku")
+    assert [entry["pointer"] for entry in anthropic] == ["/system/0/cache_control", "/messages/0/content/2/cache_control"]
+    assert all(entry["variant_name"] == "claude3_haiku" and entry["value"] == {"type": "ephemeral"} for entry in anthropic)
+
+    openai = cache_extra_body("agent_chat", "You are helpful.", tools, messages, "gpt4_mini")
+    assert openai == [{"variant_name": "gpt4_mini", "pointer": "/prompt_cache_key", "value": prefix_key("You are helpful.", tools)}]
+    assert prefix_key("You are helpful.", tools) != prefix_key("You are helpful!", tools)
+
+    # Without a pinned variant every variant gets its own scoped entries
+    sampled = cache_extra_body("agent_chat", "You are helpful.", tools, messages)
+    assert {entry["variant_name"] for entry in sampled} == set(providers)
+
+    print(f"Anthropic: {anthropic}")
+    print("\n✅ Prompt cache marker testing completed!")
+
+
+def test_cached_usage():
+    """Test that the chat model sends the system prompt and reports cached tokens."""
+    print("\n🧪 Testing Cached Token Reporting")
+    print("=" * 40)
+
+    assert usage_metadata(Usage(input_tokens=10, output_tokens=2)) == {"input_tokens": 10, "output_tokens": 2, "total_tokens": 12}
+
+    usage = UsageAccumulator()
+    model = TensorZeroChatModel(variant_name="claude3_haiku", prompt_caching=True, usage=usage)
+    model.gateway = gateway = FakeGateway()
+    history = [SystemMessage(content="You are helpful."), HumanMessage(content="Hi"), AIMessage(content="Hello"), HumanMessage(content="Again")]
+    message = model.invoke(history)
+
+    request = gateway.calls[0]
+    assert request["input"]["system"] == "You are helpful."
+    assert len(request["input"]["messages"]) == 3
+    assert [entry["pointer"] for entry in request["extra_body"]] == ["/system/0/cache_control", "/messages/2/content/0/cache_control"]
+    assert message.usage_metadata["input_token_details"] == {"cache_read": 2048, "cache_creation": 0}
+
+    stats = usage.variant("claude3_haiku")
+    assert stats.cache_read_input_tokens == 2048 and round(stats.cache_hit_rate, 3) == 0.683
+    assert usage.snapshot()["claude3_haiku"]["cache_read_input_tokens"] == 2048
+
+    # A compact history passed in directly keeps its system prompt too
+    compact_input = model._build_input(CompactHistory(history))
+    assert compact_input["system"] == "You are helpful."
+    assert compact_input == model._build_input(history)
+
+    # Caching is opt-in on the model
+    model = TensorZeroChatModel(variant_name="claude3_haiku")
+    model.gateway = gateway = FakeGateway()
+    model.invoke(history)
+    assert "extra_body" not in gateway.calls[0]
+
+    print(f"Usage: {message.usage_metadata}")
+    print("\n✅ Cached token testing completed!")
+
+
+if __name__ == "__main__":
+    test_cache_markers()
+    test_cached_usage()
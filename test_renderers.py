@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the agent output renderers.
+"""
+
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from rich.console import Console
+
+from tensorzero_scratch.langgraph_agent import TensorZeroLangGraphAgent
+from tensorzero_scratch.profiling import SessionProfiler
+from tensorzero_scratch.renderers import JsonlRenderer, LiveRenderer, NullRenderer, get_renderer
+
+
+class ScriptedGraph:
+    """Stands in for the compiled graph, replaying one tool-calling turn."""
+
+    def stream(self, input, config=None, stream_mode=("updates",)):
+        call = {"name": "python_calculator", "args": {"expression": "2 ** 8"}, "id": "call_1"}
+        yield "updates", {"agent": {"messages": [AIMessage(content="", tool_calls=[call])]}}
+        yield "updates", {"tools": {"messages": [ToolMessage(content="256", name="python_calculator", tool_call_id="call_1")]}}
+        if "messages" in stream_mode:
+            for token in ("2 ** 8 ", "is ", "256."):
+                yield "messages", (AIMessageChunk(content=token), {"langgraph_node": "agent"})
+        yield "updates", {"agent": {"messages": [AIMessage(content="2 ** 8 is 256.")]}}
+
+
+def make_agent(renderer):
+    agent = TensorZeroLangGraphAgent(renderer=renderer)
+    agent.agent = ScriptedGraph()
+    return agent
+
+
+def test_jsonl_renderer():
+    """Test one JSON line per new message, in order."""
+    print("🧪 Testing JSONL Renderer")
+    print("=" * 40)
+
+    stream = io.StringIO()
+    agent = make_agent(JsonlRenderer(stream))
+    new_messages = agent.run_turn("What's 2 ** 8?")
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["type"] for event in events] == ["ai", "tool", "ai"]
+    assert events[0]["tool_calls"][0]["name"] == "python_calculator"
+    assert events[1]["tool_call_id"] == "call_1"
+    assert events[2]["content"] == "2 ** 8 is 256."
+    assert len(new_messages) == 3
+    assert len(agent.conversation_history) == 4
+
+    # Status lines, such as per-turn profile summaries, are records too
+    with tempfile.TemporaryDirectory() as tmp:
+        stream = io.StringIO()
+        agent = make_agent(JsonlRenderer(stream))
+        agent.profiler = SessionProfiler(tmp, session_id="jsonl")
+        agent._chat_turn("What's 2 ** 8?")
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["type"] for event in events] == ["ai", "tool", "ai", "info"]
+    assert events[-1]["content"]
+
+    print(f"Events: {[event['type'] for event in events]}")
+    print("\n✅ JSONL renderer testing completed!")
+
+
+def test_live_renderer():
+    """Test that streamed tokens and tool progress end up in the live view."""
+    print("🧪 Testing Live Renderer")
+    print("=" * 40)
+
+    output = io.StringIO()
+    renderer = LiveRenderer(console=Console(file=output, force_terminal=False, width=100))
+    agent = make_agent(renderer)
+    agent.run_turn("What's 2 ** 8?")
+
+    assert renderer._reply.plain == "2 ** 8 is 256.\n"  # streamed once, not repeated
+    assert "🔧 python_calculator" in renderer._progress.plain
+    assert "✓ python_calculator: 256" in renderer._progress.plain
+    assert "2 ** 8 is 256." in output.getvalue()
+
+    # Null renderer and the factory
+    assert make_agent(NullRenderer()).run_turn("again")[-1].content == "2 ** 8 is 256."
+    assert isinstance(get_renderer("live"), LiveRenderer)
+    try:
+        get_renderer("fancy")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+    print(f"Progress: {renderer._progress.plain.strip()!r}")
+    print("\n✅ Live renderer testing completed!")
+
+
+if __name__ == "__main__":
+    test_jsonl_renderer()
+    test_live_renderer()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the agent HTTP server (sessions, SSE turns, backpressure, readiness).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# The server lives behind the optional `serve` extra
+pytest.importorskip("starlette")
+
+from starlette.testclient import TestClient
+
+from tensorzero_scratch import langgraph_agent
+from tensorzero_scratch.server import ServeSettings, create_app
+
+
+class ScriptedGraph:
+    """Stands in for the compiled graph; optionally blocks until released."""
+
+    def __init__(self, release: threading.Event | None = None):
+        self.release = release
+
+    def stream(self, input, config=None, stream_mode=("updates",)):
+        if self.release is not None:
+            self.release.wait(5)
+        turn = sum(1 for m in input["messages"] if m.type == "human")
+        for token in ("Reply ", str(turn)):
+            yield "messages", (AIMessageChunk(content=token), {"langgraph_node": "agent"})
+        yield "updates", {"agent": {"messages": [AIMessage(content=f"Reply {turn}")]}}
+
+
+def sse_events(body: str) -> list[dict]:
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def make_client(graph, tmp_dir, **settings):
+    original = langgraph_agent.build_agent_graph
+    langgraph_agent.build_agent_graph = lambda *args: graph
+    settings = ServeSettings(gateway_url="http://127.0.0.1:9", store_path=f"{tmp_dir}/conversations.db", **settings)
+    return TestClient(create_app(settings)), lambda: setattr(langgraph_agent, "build_agent_graph", original)
+
+
+def test_sessions_and_turns():
+    """Test session creation, SSE turns resumed from the store, and WebSocket turns."""
+    print("🧪 Testing Agent Server Turns")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client, restore = make_client(ScriptedGraph(), tmp_dir)
+        try:
+            with client:
+                session_id = client.post("/sessions").json()["session_id"]
+
+                first = client.post(f"/sessions/{session_id}/turns", json={"message": "hi"})
+                assert first.headers["content-type"].startswith("text/event-stream")
+                events = sse_events(first.text)
+                assert [e["type"] for e in events] == ["token", "token", "ai", "done"]
+                assert events[-1]["session_id"] == session_id
+
+                # The next turn resumes the session from the store
+                events = sse_events(client.post(f"/sessions/{session_id}/turns", json={"message": "again"}).text)
+                assert events[2]["content"] == "Reply 2"
+
+                with client.websocket_connect(f"/sessions/{session_id}/ws") as ws:
+                    ws.send_json({"message": "third"})
+                    received = []
+                    while not received or received[-1]["type"] != "done":
+                        received.append(ws.receive_json())
+                    assert received[-2]["content"] == "Reply 3"
+
+                assert client.post(f"/sessions/{session_id}/turns", json={}).status_code == 400
+                assert client.app.state.server.store.count(session_id) == 6
+        finally:
+            restore()
+
+    print(f"Final events: {[e['type'] for e in received]}")
+    print("\n✅ Server turn testing completed!")
+
+
+def test_backpressure_and_readiness():
+    """Test 429 when a worker is full, 409 for a busy session, and gateway-based readiness."""
+    print("🧪 Testing Backpressure and Readiness")
+    print("=" * 40)
+
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client, restore = make_client(ScriptedGraph(release), tmp_dir, max_inflight=1, health_interval=0.05, lease_ttl=0.3)
+        try:
+            with client:
+                server = client.app.state.server
+                blocked = threading.Thread(target=client.post, args=("/sessions/a/turns",), kwargs={"json": {"message": "hi"}})
+                blocked.start()
+                while server.inflight == 0:
+                    time.sleep(0.01)
+
+                overloaded = client.post("/sessions/b/turns", json={"message": "hi"})
+                assert overloaded.status_code == 429
+                assert overloaded.headers["retry-after"] == "1"
+
+                # A turn outlasting the lease TTL keeps its lease renewed
+                time.sleep(0.6)
+                assert not server.store.acquire_lease("a", "other-worker")
+
+                release.set()
+                blocked.join()
+                while server.inflight:
+                    time.sleep(0.01)
+                assert client.post("/sessions/b/turns", json={"message": "hi"}).status_code == 200
+
+                # Nothing listens on the configured gateway port
+                assert client.get("/healthz").status_code == 200
+                time.sleep(0.1)
+                readiness = client.get("/readyz")
+                assert readiness.status_code == 503
+                assert readiness.json()["gateway_healthy"] is False
+
+                server.gateway_healthy = True
+                server._busy_sessions.add("c")
+                assert client.post("/sessions/c/turns", json={"message": "hi"}).status_code == 409
+                # A turn running on another worker holds the session's lease
+                server.store.acquire_lease("d", "other-worker")
+                assert client.post("/sessions/d/turns", json={"message": "hi"}).status_code == 409
+        finally:
+            restore()
+
+    print("\n✅ Backpressure testing completed!")
+
+
+def test_settings_round_trip():
+    """Test that settings survive the trip to worker processes through the environment."""
+    settings = ServeSettings(gateway_mode="embedded", config_file="/tmp/tensorzero.toml", max_inflight=4, health_interval=2.5)
+    saved = dict(os.environ)
+    try:
+        os.environ.update(settings.to_env())
+        assert ServeSettings.from_env() == settings
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+if __name__ == "__main__":
+    test_sessions_and_turns()
+    test_backpressure_and_readiness()
+    test_settings_round_trip()
@@ -13,7 +13,8 @@ sys.path.insert(0, str(src_path))
 from src.tensorzero_scratch.langgraph_agent import (
     python_calculator,
     current_time,
-    text_analyzer
+    text_analyzer,
+    docs_search
 )
 
 def test_tools():
@@ -45,6 +46,14 @@ def test_tools():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+    # Test docs_search
+    print("\n📚 Testing Docs Search:")
+    try:
+        result = docs_search.invoke({"query": "How do I collect feedback?"})
+        print(f"Result: {result}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
     print("\n✅ Tool testing completed!")
 
 if __name__ == "__main__":
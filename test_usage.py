@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script to verify usage accounting on TensorZero responses.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add src to path to import our package
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from langchain_core.messages import AIMessage
+from tensorzero import ChatInferenceResponse, Text, Usage
+
+from tensorzero_scratch.tensorzero_chat_model import TensorZeroChatModel
+from tensorzero_scratch.usage import UNKNOWN_VARIANT, UsageAccumulator, process_usage
+
+
+def test_usage_accumulator():
+    """Test per-session accumulation and rollup into the process accumulator."""
+    print("🧪 Testing Usage Accumulator")
+    print("=" * 40)
+
+    process_before = process_usage().variant("gpt4_mini").calls
+    session = UsageAccumulator(parent=process_usage())
+    session.record("gpt4_mini", input_tokens=100, output_tokens=20, latency_ms=80.0)
+    session.record("gpt4_mini", input_tokens=50, output_tokens=10, latency_ms=900.0)
+    session.record("claude3_haiku", input_tokens=10, output_tokens=5, latency_ms=40000.0)
+
+    stats = session.variant("gpt4_mini")
+    assert stats.calls == 2
+    assert stats.total_tokens == 180
+    assert stats.mean_latency_ms == 490.0
+    assert session.latency_percentile("gpt4_mini", 0.5) == 100.0
+    assert session.latency_percentile("gpt4_mini", 0.99) == 1000.0
+    assert session.latency_percentile("missing", 0.5) is None
+    assert process_usage().variant("gpt4_mini").calls == process_before + 2
+
+    # Messages without a variant (e.g. from the OpenAI-compatible endpoint) are not filed under the model name
+    session.record_message(AIMessage(content="Hi", usage_metadata={"input_tokens": 4, "output_tokens": 1, "total_tokens": 5},
+                                     response_metadata={"model_name": "tensorzero"}))
+    assert session.variant(UNKNOWN_VARIANT).calls == 1
+    assert "tensorzero" not in session.snapshot()
+    assert session.totals().calls == 4
+
+    print(f"Snapshot: {session.snapshot()}")
+    print("\n✅ Usage accumulator testing completed!")
+
+
+def test_response_metadata():
+    """Test that usage and variant metadata land on the returned AIMessage."""
+    print("\n🧪 Testing AIMessage Metadata")
+    print("=" * 40)
+
+    model = TensorZeroChatModel(usage=UsageAccumulator())
+    response = ChatInferenceResponse(
+        inference_id=uuid4(),
+        episode_id=uuid4(),
+        variant_name="gpt4_mini",
+        content=[Text(text="Hello!")],
+        usage=Usage(input_tokens=12, output_tokens=3),
+    )
+
+    usage_metadata, response_metadata = model._extract_response_metadata(response, 42.0)
+    assert usage_metadata == {"input_tokens": 12, "output_tokens": 3, "total_tokens": 15}
+    assert response_metadata["variant_name"] == "gpt4_mini"
+    assert response_metadata["inference_id"] == str(response.inference_id)
+    assert response_metadata["latency_ms"] == 42.0
+
+    print(f"Usage: {usage_metadata}")
+    print(f"Response metadata: {response_metadata}")
+    print("\n✅ Metadata testing completed!")
+
+
+if __name__ == "__main__":
+    test_usage_accumulator()
+    test_response_metadata()